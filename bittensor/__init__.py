@@ -1,3 +1,19 @@
 name = "bittensor"
 from bittensor.proto import bittensor_pb2
 from bittensor.proto import bittensor_pb2_grpc
+from bittensor import serializer
+from bittensor import vocabulary
+from bittensor import streams
+from bittensor import identifiers
+from bittensor import collector
+from bittensor import peer_stats
+from bittensor import hedging
+from bittensor import channel_pool
+from bittensor import circuit_breaker
+from bittensor import admission
+from bittensor import scheduler
+from bittensor import batcher
+from bittensor import accumulator
+from bittensor import memory
+from bittensor import slab
+from bittensor import coalescer
@@ -0,0 +1,145 @@
+""" Accumulation of local gradients between optimizer steps.
+
+Neurons compute a gradient of every variable for each Grade they answer
+and apply them on a timer. Queueing each gradient keeps a dense copy of
+every variable per message and costs one session run per message. An
+Accumulator sums gradients as they arrive instead, so a single step
+applies all of them and memory holds one sum.
+
+Gradients are either dense arrays or, for embedding variables of which a
+message touches a few rows, (indices, values) pairs of rows. Sparse rows
+are kept as they arrive and rows with the same index are summed when the
+sum grows past max_bytes and when it is taken.
+
+Gradients of messages spiked more than max_staleness seconds ago are
+dropped, as is a sum whose latest contribution is that old. Contributions
+that would take the sum over max_bytes are dropped.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+
+def _nbytes(gradient):
+    if isinstance(gradient, tuple):
+        return sum(np.asarray(part).nbytes for part in gradient)
+    return np.asarray(gradient).nbytes
+
+
+def _combine(chunks):
+    # Sums the rows of (indices, values) chunks by index.
+    indices = np.concatenate([indices for indices, _ in chunks])
+    values = np.concatenate([values for _, values in chunks])
+    unique, inverse = np.unique(indices, return_inverse=True)
+    summed = np.zeros((len(unique),) + values.shape[1:], dtype=np.float32)
+    np.add.at(summed, inverse, values)
+    return unique, summed
+
+
+class Accumulator():
+
+    def __init__(self, max_staleness=10.0, max_bytes=256 * 1024 * 1024):
+        """ Sums gradients.
+        Args:
+            max_staleness: seconds after which a contribution is dropped.
+            max_bytes: size the sum may not exceed.
+        """
+        self.max_staleness = max_staleness
+        self.max_bytes = max_bytes
+        self.added = 0
+        self.stale = 0
+        self.dropped = 0
+        self.steps = 0
+        # Per variable, a dense array or a list of (indices, values) chunks.
+        self._sum = None
+        self._nbytes = 0
+        self._count = 0
+        self._updated = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, gradients, create_time):
+        """ Adds the gradients of a message spiked at create_time.
+        Args:
+            gradients: list of arrays or (indices, values) pairs, one per
+                variable.
+            create_time: time the message was spiked.
+        Returns:
+            True if the gradients were added.
+        """
+        now = time.time()
+        if now - create_time > self.max_staleness:
+            with self._lock:
+                self.stale += 1
+            return False
+        with self._lock:
+            if self._sum is None:
+                nbytes = sum(_nbytes(g) for g in gradients)
+            else:
+                # Dense gradients are summed in place, sparse rows appended.
+                nbytes = self._nbytes + sum(
+                    _nbytes(g) for g in gradients if isinstance(g, tuple))
+                if nbytes > self.max_bytes:
+                    self._compact()
+                    nbytes = self._nbytes + sum(
+                        _nbytes(g) for g in gradients if isinstance(g, tuple))
+            if nbytes > self.max_bytes:
+                self.dropped += 1
+                return False
+            if self._sum is None:
+                self._sum = [
+                    [g] if isinstance(g, tuple) else np.array(
+                        g, dtype=np.float32) for g in gradients
+                ]
+            else:
+                for total, g in zip(self._sum, gradients):
+                    if isinstance(g, tuple):
+                        total.append(g)
+                    else:
+                        np.add(total, g, out=total)
+            self._nbytes = nbytes
+            self._count += 1
+            self._updated = now
+            self.added += 1
+            return True
+
+    def take(self):
+        """ Returns the summed gradients and the number of contributions,
+        (None, 0) if there are none, and starts a new sum.
+        """
+        with self._lock:
+            gradients, count = self._sum, self._count
+            self._sum = None
+            self._nbytes = 0
+            self._count = 0
+            if gradients is None:
+                return None, 0
+            if time.time() - self._updated > self.max_staleness:
+                self.stale += count
+                return None, 0
+            self.steps += 1
+        return [
+            _combine(g) if isinstance(g, list) else g for g in gradients
+        ], count
+
+    def _compact(self):
+        # Requires self._lock. Sums sparse rows sharing an index.
+        for i, total in enumerate(self._sum):
+            if isinstance(total, list) and len(total) > 1:
+                self._sum[i] = [_combine(total)]
+        self._nbytes = sum(
+            sum(_nbytes(chunk) for chunk in total)
+            if isinstance(total, list) else _nbytes(total)
+            for total in self._sum)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': self._count,
+                'bytes': self._nbytes,
+                'added': self.added,
+                'stale': self.stale,
+                'dropped': self.dropped,
+                'steps': self.steps,
+            }
@@ -0,0 +1,344 @@
+""" Server side admission control.
+
+Spike and Grade calls from parents run on the same nucleus as our own
+training. Admission is a server interceptor that rejects calls early with
+RESOURCE_EXHAUSTED when:
+
+    - the parent has used up its token bucket, refilled at rate calls per
+      second up to burst calls. Limits can be weighted by the parent's
+      stake relative to the mean stake of the metagraph.
+    - max_inflight Spike and Grade calls are already being handled.
+
+Batch calls charge each parent one token per request of its own, and
+take an in-flight slot per request up to max_inflight. Requests of a
+parent beyond its tokens are answered with RESOURCE_EXHAUSTED responses
+in the batch, the others are handled.
+
+A stream is admitted message by message. Its messages wait up to
+stream_wait seconds for an in-flight slot, so a burst is served as slots
+free up. A message rejected by its parent's bucket, or still without a
+slot, is answered with a RESOURCE_EXHAUSTED response and the stream
+carries on.
+"""
+
+import collections
+import grpc
+from loguru import logger
+import queue
+import threading
+import time
+
+import bittensor.proto.bittensor_pb2 as proto_pb2
+from bittensor import streams
+
+# Calls subject to admission, by method name, with the response type of
+# their requests.
+_ADMITTED = {
+    'Spike': proto_pb2.SpikeResponse,
+    'Grade': proto_pb2.GradeResponse,
+    'SpikeStream': proto_pb2.SpikeResponse,
+    'GradeStream': proto_pb2.GradeResponse,
+    'SpikeBatch': proto_pb2.SpikeResponse,
+    'GradeBatch': proto_pb2.GradeResponse,
+}
+
+_REJECTED = 'Too many calls.'
+
+# Buckets kept before idle ones are dropped.
+_MAX_BUCKETS = 1024
+
+
+class _Bucket():
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.updated = time.time()
+
+
+def stake_weights(metagraph, min_weight=0.1):
+    """ Returns a function weighting a parent's limits by its stake over
+    the mean stake of the metagraph's nodes, at least min_weight. Parents
+    missing from the metagraph get min_weight.
+
+    Weights are computed once per metagraph update: pull_metagraph replaces
+    the nodes, and a parent whose node differs from the one weighted
+    recomputes the weights of all nodes.
+    """
+    # identity -> (node, weight), replaced whole on recompute.
+    cache = {}
+
+    def _recompute():
+        nodes = dict(metagraph.nodes)
+        mean_stake = sum(float(n.stake)
+                         for n in nodes.values()) / max(len(nodes), 1)
+        weights = {}
+        for identity, node in nodes.items():
+            if mean_stake <= 0:
+                weight = 1.0
+            else:
+                weight = max(min_weight, float(node.stake) / mean_stake)
+            weights[identity] = (node, weight)
+        return weights
+
+    def _weight(parent_id):
+        nonlocal cache
+        node = metagraph.nodes.get(parent_id)
+        if node is None:
+            return min_weight
+        entry = cache.get(parent_id)
+        if entry is None or entry[0] is not node:
+            cache = _recompute()
+            entry = cache.get(parent_id)
+            if entry is None:
+                return min_weight
+        return entry[1]
+
+    return _weight
+
+
+class Admission(grpc.ServerInterceptor):
+
+    def __init__(self,
+                 rate=50.0,
+                 burst=100,
+                 max_inflight=8,
+                 weight=None,
+                 stream_wait=1.0):
+        """ Admission control of Spike and Grade calls.
+        Args:
+            rate: calls per second allowed per parent, 0 disables rate
+                limiting.
+            burst: calls a parent may make at once.
+            max_inflight: calls handled at once, 0 disables the cap.
+            weight: function of parent_id scaling its rate and burst,
+                e.g. stake_weights(metagraph). None treats parents equally.
+            stream_wait: seconds a streamed message waits for an in-flight
+                slot.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_inflight = max_inflight
+        self.weight = weight
+        self.stream_wait = stream_wait
+        self.inflight = 0
+        self.admitted = 0
+        self.rate_limited = 0
+        self.overloaded = 0
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+
+    def admit(self, parent_id, cost=1, wait=0):
+        """ Takes cost tokens from the parent's bucket and cost in-flight
+        slots, waiting up to wait seconds for the slots. Admitted calls must
+        be released.
+        Returns:
+            True if the call is admitted.
+        """
+        weight = self.weight(parent_id) if self.weight else 1.0
+        deadline = time.time() + wait
+        with self._condition:
+            while self.max_inflight > 0 and self.inflight + cost > self.max_inflight:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self.overloaded += 1
+                    return False
+                self._condition.wait(remaining)
+            if self.rate > 0:
+                bucket = self._bucket(parent_id, weight, time.time())
+                if bucket.tokens < cost:
+                    self.rate_limited += 1
+                    return False
+                bucket.tokens -= cost
+            self.inflight += cost
+            self.admitted += 1
+            return True
+
+    def admit_batch(self, counts):
+        """ Admits a batch call carrying counts[parent_id] requests of each
+        parent. Each parent's requests beyond its tokens are rejected, and
+        the batch takes an in-flight slot per admitted request, at most
+        max_inflight, so a batch larger than max_inflight still fits an idle
+        server. Admitted batches must be released with their cost.
+        Returns:
+            ({parent_id: requests admitted}, cost), cost 0 if none are.
+        """
+        weights = {
+            parent_id: self.weight(parent_id) if self.weight else 1.0
+            for parent_id in counts
+        }
+        with self._condition:
+            now = time.time()
+            admitted = dict(counts)
+            if self.rate > 0:
+                for parent_id, count in counts.items():
+                    bucket = self._bucket(parent_id, weights[parent_id], now)
+                    admitted[parent_id] = min(count, int(bucket.tokens))
+                if admitted != counts:
+                    self.rate_limited += 1
+            cost = sum(admitted.values())
+            if self.max_inflight > 0:
+                cost = min(cost, self.max_inflight)
+                if self.inflight + cost > self.max_inflight:
+                    self.overloaded += 1
+                    return {}, 0
+            if cost == 0:
+                return {}, 0
+            if self.rate > 0:
+                for parent_id, count in admitted.items():
+                    self._buckets[parent_id].tokens -= count
+            self.inflight += cost
+            self.admitted += 1
+            return admitted, cost
+
+    def release(self, cost=1):
+        with self._condition:
+            self.inflight -= cost
+            self._condition.notify_all()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'inflight': self.inflight,
+                'admitted': self.admitted,
+                'rate_limited': self.rate_limited,
+                'overloaded': self.overloaded,
+            }
+
+    def _bucket(self, parent_id, weight, now):
+        # Requires self._lock. Refills the parent's bucket.
+        burst = self.burst * weight
+        bucket = self._buckets.get(parent_id)
+        if bucket is None:
+            if len(self._buckets) >= _MAX_BUCKETS:
+                self._drop_full(now)
+            bucket = self._buckets[parent_id] = _Bucket(burst)
+        elapsed = max(0.0, now - bucket.updated)
+        bucket.tokens = min(burst,
+                            bucket.tokens + elapsed * self.rate * weight)
+        bucket.updated = max(now, bucket.updated)
+        return bucket
+
+    def _drop_full(self, now):
+        # Buckets idle long enough to have refilled equal new ones.
+        idle = self.burst / self.rate
+        for parent_id in list(self._buckets):
+            if now - self._buckets[parent_id].updated > idle:
+                del self._buckets[parent_id]
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+        if handler is None or method not in _ADMITTED:
+            return handler
+        if handler.unary_unary:
+            return grpc.unary_unary_rpc_method_handler(
+                self._unary(handler.unary_unary, _ADMITTED[method]),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer)
+        if handler.stream_stream:
+            return grpc.stream_stream_rpc_method_handler(
+                self._stream(handler.stream_stream, _ADMITTED[method]),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer)
+        return handler
+
+    def _unary(self, behavior, response_type):
+
+        def _admitted(request, context):
+            requests = getattr(request, 'requests', None)
+            if requests is None:
+                if not self.admit(request.parent_id):
+                    logger.debug('Rejected call from {}.', request.parent_id)
+                    context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                                  _REJECTED)
+                try:
+                    return behavior(request, context)
+                finally:
+                    self.release()
+
+            # Batches charge each parent for its own requests.
+            counts = collections.Counter(r.parent_id for r in requests)
+            if not counts:
+                return behavior(request, context)
+            admitted, cost = self.admit_batch(counts)
+            if cost == 0:
+                logger.debug('Rejected batch from {}.', list(counts))
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, _REJECTED)
+            if admitted == counts:
+                try:
+                    return behavior(request, context)
+                finally:
+                    self.release(cost)
+
+            # Handle the first admitted requests of each parent and answer
+            # the others with errors, in request order.
+            logger.debug('Rejected batch requests from {}.',
+                         [p for p in counts if admitted[p] < counts[p]])
+            accepted = []
+            for r in requests:
+                accepted.append(admitted[r.parent_id] > 0)
+                admitted[r.parent_id] -= 1
+            try:
+                result = behavior(
+                    type(request)(requests=[
+                        r for r, accept in zip(requests, accepted) if accept
+                    ]), context)
+            finally:
+                self.release(cost)
+            answered = iter(result.responses)
+            return type(result)(responses=[
+                next(answered) if accept else streams.error_response(
+                    response_type, r, grpc.StatusCode.RESOURCE_EXHAUSTED,
+                    _REJECTED) for r, accept in zip(requests, accepted)
+            ])
+
+        return _admitted
+
+    def _stream(self, behavior, response_type):
+
+        def _admitted(request_iterator, context):
+            # Responses of the handler and of rejected messages, then None.
+            responses = queue.Queue()
+            lock = threading.Lock()
+            state = {'unanswered': 0, 'error': None}
+
+            def _requests():
+                for request in request_iterator:
+                    if self.admit(request.parent_id, wait=self.stream_wait):
+                        with lock:
+                            state['unanswered'] += 1
+                        yield request
+                    else:
+                        logger.debug('Rejected message from {}.',
+                                     request.parent_id)
+                        responses.put(
+                            streams.error_response(
+                                response_type, request,
+                                grpc.StatusCode.RESOURCE_EXHAUSTED, _REJECTED))
+
+            def _handle():
+                try:
+                    for response in behavior(_requests(), context):
+                        with lock:
+                            state['unanswered'] -= 1
+                        self.release()
+                        responses.put(response)
+                except Exception as error:
+                    state['error'] = error
+                finally:
+                    with lock:
+                        self.release(state['unanswered'])
+                        state['unanswered'] = 0
+                    responses.put(None)
+
+            threading.Thread(target=_handle, daemon=True).start()
+            while True:
+                response = responses.get()
+                if response is None:
+                    break
+                yield response
+            if state['error'] is not None:
+                raise state['error']
+
+        return _admitted
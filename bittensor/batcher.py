@@ -0,0 +1,94 @@
+""" Dynamic micro-batching of concurrent calls.
+
+Concurrent Spike handlers each running the model on a few rows serialize
+on many small session runs. A Batcher gathers the items submitted within
+window seconds of each other, or until max_rows rows are gathered, and
+runs them through one call of run. The first handler of a batch waits out
+the window and runs it; the others block until it is done and take their
+share of the results.
+"""
+
+import threading
+
+
+class _Batch():
+
+    def __init__(self):
+        self.items = []
+        self.rows = 0
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+
+class Batcher():
+
+    def __init__(self, run, window=0.005, max_rows=512):
+        """ Batches items for run.
+        Args:
+            run: function of a list of items returning the list of their
+                results.
+            window: seconds a batch stays open for more items.
+            max_rows: rows after which a batch runs without waiting out
+                the window.
+        """
+        self.run = run
+        self.window = window
+        self.max_rows = max_rows
+        self.batches = 0
+        self.items = 0
+        self.rows = 0
+        self._open = None
+        self._lock = threading.Lock()
+
+    def submit(self, item, rows):
+        """ Runs item, of rows rows, in the next batch.
+        Returns:
+            the result of item.
+        Raises:
+            the exception raised by run for the batch.
+        """
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            index = len(batch.items)
+            batch.items.append(item)
+            batch.rows += rows
+            if batch.rows >= self.max_rows:
+                self._open = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+                self.batches += 1
+                self.items += len(batch.items)
+                self.rows += batch.rows
+            try:
+                batch.results = self.run(batch.items)
+            except Exception as error:
+                batch.error = error
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[index]
+
+    def stats(self):
+        """ Returns the number of batches run and their mean items and rows.
+        """
+        with self._lock:
+            batches = max(self.batches, 1)
+            return {
+                'batches': self.batches,
+                'items': self.items / batches,
+                'rows': self.rows / batches,
+            }
@@ -0,0 +1,184 @@
+""" Shared pool of gRPC channels keyed by peer address.
+
+Neurons acquire the channel of a peer when it becomes a child and release
+it when the peer is replaced. Channels carry keepalive, flow control,
+message size and reconnect backoff options, and cache their stubs and
+Streams. A released channel stays open for idle_timeout seconds, so a
+peer selected again soon reuses its connection, and is then closed.
+Servers take SERVER_OPTIONS so they accept the keepalive pings of pooled
+channels instead of closing their connections for pinging too often.
+
+Synchronous and asyncio (grpc.aio) channels are pooled separately. An
+asyncio pool must be used from the event loop its channels run on.
+"""
+
+import asyncio
+import grpc
+from loguru import logger
+import threading
+import time
+
+import bittensor.proto.bittensor_pb2_grpc as proto_pb2_grpc
+from bittensor import streams as bittensor_streams
+
+# Messages carry a batch of embeddings; allow up to 64MB.
+_MAX_MESSAGE_LENGTH = 64 * 1024 * 1024
+
+OPTIONS = [
+    # Ping idle connections so dead peers are noticed between steps.
+    ('grpc.keepalive_time_ms', 10000),
+    ('grpc.keepalive_timeout_ms', 5000),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.max_pings_without_data', 0),
+    # Size the HTTP/2 flow control window from the measured bandwidth
+    # delay product.
+    ('grpc.http2.bdp_probe', 1),
+    ('grpc.max_send_message_length', _MAX_MESSAGE_LENGTH),
+    ('grpc.max_receive_message_length', _MAX_MESSAGE_LENGTH),
+    # Back off reconnecting to unreachable peers.
+    ('grpc.initial_reconnect_backoff_ms', 1000),
+    ('grpc.min_reconnect_backoff_ms', 1000),
+    ('grpc.max_reconnect_backoff_ms', 30000),
+]
+
+SERVER_OPTIONS = [
+    # Accept the keepalive pings of OPTIONS, on idle connections too.
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.min_ping_interval_without_data_ms', 5000),
+    ('grpc.max_send_message_length', _MAX_MESSAGE_LENGTH),
+    ('grpc.max_receive_message_length', _MAX_MESSAGE_LENGTH),
+]
+
+
+class _Connection():
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.stubs = {}
+        self.streams = None
+        self.refs = 0
+        self.released = time.time()
+
+
+class ChannelPool():
+
+    def __init__(self, options=None, idle_timeout=300, aio=False):
+        """ Pool of channels.
+        Args:
+            options: grpc channel options, defaults to OPTIONS.
+            idle_timeout: seconds a released channel stays open.
+            aio: pool grpc.aio channels instead of synchronous ones.
+        """
+        self.options = OPTIONS if options is None else options
+        self.idle_timeout = idle_timeout
+        self.aio = aio
+        self._connections = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, address):
+        """ Returns the channel to address, opening it if needed. Each
+        acquire must be matched by a release.
+        """
+        with self._lock:
+            connection = self._connection(address)
+            connection.refs += 1
+            channel = connection.channel
+        self.evict_idle()
+        return channel
+
+    def release(self, address):
+        """ Releases a channel acquired from the pool.
+        """
+        with self._lock:
+            connection = self._connections.get(address)
+            if connection is None or connection.refs == 0:
+                return
+            connection.refs -= 1
+            if connection.refs == 0:
+                connection.released = time.time()
+        self.evict_idle()
+
+    def stub(self, address, stub_class=proto_pb2_grpc.BittensorStub):
+        """ Acquires the channel to address and returns its cached
+        stub_class stub. Each stub must be matched by a release.
+        """
+        with self._lock:
+            connection = self._connection(address)
+            connection.refs += 1
+            if stub_class not in connection.stubs:
+                connection.stubs[stub_class] = stub_class(connection.channel)
+            stub = connection.stubs[stub_class]
+        self.evict_idle()
+        return stub
+
+    def streams(self, address):
+        """ Acquires the channel to address and returns its Streams. Each
+        streams must be matched by a release.
+        """
+        assert not self.aio, 'Streams need a synchronous channel.'
+        with self._lock:
+            connection = self._connection(address)
+            connection.refs += 1
+            if connection.streams is None:
+                connection.streams = bittensor_streams.Streams(
+                    connection.channel)
+            streams = connection.streams
+        self.evict_idle()
+        return streams
+
+    def evict_idle(self):
+        """ Closes channels released more than idle_timeout seconds ago.
+        """
+        now = time.time()
+        evicted = []
+        with self._lock:
+            for address, connection in list(self._connections.items()):
+                if connection.refs == 0 and now - connection.released > self.idle_timeout:
+                    evicted.append(connection)
+                    del self._connections[address]
+        for connection in evicted:
+            self._close(connection)
+
+    def close(self):
+        """ Closes all channels.
+        """
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections = {}
+        for connection in connections:
+            self._close(connection)
+
+    def _connection(self, address):
+        # Requires self._lock.
+        if address not in self._connections:
+            if self.aio:
+                channel = grpc.aio.insecure_channel(address,
+                                                    options=self.options)
+            else:
+                channel = grpc.insecure_channel(address, options=self.options)
+            self._connections[address] = _Connection(channel)
+        return self._connections[address]
+
+    def _close(self, connection):
+        try:
+            if connection.streams is not None:
+                connection.streams.close()
+            closing = connection.channel.close()
+            if asyncio.iscoroutine(closing):
+                asyncio.ensure_future(closing)
+        except Exception as error:
+            logger.debug('Failed to close channel: {}', error)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """ Returns the synchronous channel pool shared by this process.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ChannelPool()
+        return _pool
@@ -0,0 +1,135 @@
+""" Per peer circuit breakers.
+
+A breaker is closed while its peer answers. After failure_threshold
+consecutive failed calls it opens: calls to the peer are skipped and
+callers substitute zeros for its output. After reset_timeout seconds the
+breaker turns half-open and lets a single probe call through. A successful
+probe closes the breaker, a failed one opens it again.
+
+State changes are counted and logged so that neurons can export them.
+"""
+
+import threading
+import time
+
+from loguru import logger
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class _Breaker():
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0.0
+        # Start time of the probe in flight while half-open, None if none.
+        self.probe = None
+
+
+class CircuitBreaker():
+
+    def __init__(self, failure_threshold=5, reset_timeout=10.0):
+        """ Circuit breakers of downstream peers.
+        Args:
+            failure_threshold: consecutive failures that open a breaker.
+            reset_timeout: seconds a breaker stays open before probing.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        # Number of transitions into each state, and of skipped calls.
+        self.transitions = {CLOSED: 0, OPEN: 0, HALF_OPEN: 0}
+        self.rejected = 0
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def _breaker(self, peer_id):
+        if peer_id not in self._breakers:
+            self._breakers[peer_id] = _Breaker()
+        return self._breakers[peer_id]
+
+    def _set_state(self, peer_id, breaker, state):
+        # Requires self._lock.
+        logger.info('Circuit to {} {}.', peer_id, state)
+        breaker.state = state
+        self.transitions[state] += 1
+
+    def allow(self, peer_id):
+        """ Returns True if a call to peer_id may be made.
+        """
+        now = time.time()
+        with self._lock:
+            breaker = self._breaker(peer_id)
+            if breaker.state == OPEN and now - breaker.opened >= self.reset_timeout:
+                self._set_state(peer_id, breaker, HALF_OPEN)
+                breaker.probe = None
+            if breaker.state == HALF_OPEN:
+                # A probe lost without completing is replaced after
+                # reset_timeout.
+                if breaker.probe is None or now - breaker.probe >= self.reset_timeout:
+                    breaker.probe = now
+                    return True
+            if breaker.state == CLOSED:
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, peer_id, success):
+        """ Records the outcome of a call to peer_id.
+        """
+        with self._lock:
+            breaker = self._breaker(peer_id)
+            if success:
+                breaker.failures = 0
+                if breaker.state != CLOSED:
+                    self._set_state(peer_id, breaker, CLOSED)
+                return
+            breaker.failures += 1
+            if breaker.state == HALF_OPEN or (
+                    breaker.state == CLOSED and
+                    breaker.failures >= self.failure_threshold):
+                breaker.opened = time.time()
+                self._set_state(peer_id, breaker, OPEN)
+
+    def track(self, peer_id, future, timeout=None):
+        """ Records the call behind future when it completes. Calls taking
+        longer than timeout seconds count as failures.
+        Returns:
+            future.
+        """
+        start = time.time()
+
+        def _done(call):
+            if call.cancelled():
+                # Dropped by the caller, e.g. a hedged call that lost.
+                return
+            try:
+                call.result()
+                success = timeout is None or time.time() - start <= timeout
+            except Exception:
+                success = False
+            self.record(peer_id, success)
+
+        future.add_done_callback(_done)
+        return future
+
+    def state(self, peer_id):
+        with self._lock:
+            breaker = self._breakers.get(peer_id)
+            return CLOSED if breaker is None else breaker.state
+
+    def stats(self):
+        """ Returns the state of each peer, transition counts and the number
+        of skipped calls.
+        """
+        with self._lock:
+            return {
+                'states': {
+                    peer_id: breaker.state
+                    for peer_id, breaker in self._breakers.items()
+                },
+                'transitions': dict(self.transitions),
+                'rejected': self.rejected,
+            }
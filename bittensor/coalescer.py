@@ -0,0 +1,118 @@
+""" Single-flight coalescing of duplicate messages.
+
+With loops and diamonds in the graph a neuron receives the same
+message_id from several parents. Answering each copy wastes a nucleus
+pass, and answering copies with zeros gives those parents nothing. A
+Coalescer lets the first copy lead a flight for its message_id: copies
+arriving while it is in flight wait for its result, up to timeout
+seconds or the deadline of their call, and copies arriving after it
+finished are served its result for ttl seconds.
+
+A copy arriving through a loop waits on a flight that itself waits on
+the loop, so timeout should be well under the spike timeout of parents.
+"""
+
+import collections
+import threading
+import time
+
+
+class _Flight():
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.finished = None
+
+
+class Coalescer():
+
+    def __init__(self, ttl=1.0, timeout=0.5, capacity=10000):
+        """ Coalesces calls by key.
+        Args:
+            ttl: seconds results are served after their flight finished.
+            timeout: seconds a copy waits on a flight in progress.
+            capacity: results kept before the oldest are evicted.
+        """
+        self.ttl = ttl
+        self.timeout = timeout
+        self.capacity = capacity
+        self.led = 0
+        self.shared = 0
+        self.cached = 0
+        self.timeouts = 0
+        self._inflight = {}
+        # key -> finished flight, oldest first.
+        self._results = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def lead(self, key):
+        """ Starts a flight for key unless one is in flight or finished
+        within ttl seconds.
+        Returns:
+            None if the caller leads the new flight and must finish it,
+            else the existing flight to wait on.
+        """
+        with self._lock:
+            self._expire(time.monotonic())
+            flight = self._results.get(key)
+            if flight is not None:
+                self.cached += 1
+                return flight
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.shared += 1
+                return flight
+            self._inflight[key] = _Flight()
+            self.led += 1
+            return None
+
+    def finish(self, key, result):
+        """ Finishes the flight of key with result, None if it failed.
+        Failed flights are not kept.
+        """
+        with self._lock:
+            flight = self._inflight.pop(key, None)
+            if flight is None:
+                return
+            flight.result = result
+            flight.finished = time.monotonic()
+            if result is not None:
+                self._results[key] = flight
+                while len(self._results) > self.capacity:
+                    self._results.popitem(last=False)
+        flight.done.set()
+
+    def wait(self, flight, timeout=None):
+        """ Returns the result of flight, None if it failed or did not
+        finish within the lesser of self.timeout and timeout seconds, e.g.
+        the time remaining of the copy's call.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        else:
+            timeout = max(0.0, min(self.timeout, timeout))
+        if not flight.done.wait(timeout):
+            with self._lock:
+                self.timeouts += 1
+            return None
+        return flight.result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'inflight': len(self._inflight),
+                'results': len(self._results),
+                'led': self.led,
+                'shared': self.shared,
+                'cached': self.cached,
+                'timeouts': self.timeouts,
+            }
+
+    def _expire(self, now):
+        # Requires self._lock. Results are ordered by finish time.
+        while self._results:
+            flight = next(iter(self._results.values()))
+            if now - flight.finished <= self.ttl:
+                break
+            self._results.popitem(last=False)
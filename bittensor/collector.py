@@ -0,0 +1,94 @@
+""" Event driven collection of call futures.
+
+Neurons wait on the Spike and Grade futures of a step before using
+whatever came back. A Collector registers a done callback on each future
+and sleeps on a condition variable until all are done or the step's
+deadline passes, instead of polling future.done() in a loop. Futures
+still running at the deadline count as missing and are left running.
+
+Works with grpc call futures and concurrent.futures.Future alike.
+"""
+
+import functools
+import threading
+import time
+
+
+class Collector():
+
+    def __init__(self, futures):
+        """ Collects futures.
+        Args:
+            futures: list of futures, None entries count as done and failed.
+        """
+        self._futures = list(futures)
+        self._start = time.time()
+        self._condition = threading.Condition()
+        # Seconds from collection start to each future completing, None
+        # while running.
+        self.times = [None for _ in self._futures]
+        self._remaining = sum(1 for f in self._futures if f is not None)
+        for i, future in enumerate(self._futures):
+            if future is not None:
+                future.add_done_callback(functools.partial(self._on_done, i))
+
+    def _on_done(self, i, future):
+        with self._condition:
+            self.times[i] = time.time() - self._start
+            self._remaining -= 1
+            self._condition.notify_all()
+
+    def wait(self, timeout=None):
+        """ Blocks until all futures are done or timeout seconds passed.
+        Returns:
+            True if all futures are done.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._remaining == 0,
+                                            timeout)
+
+    def done(self, i):
+        return self.times[i] is not None
+
+    def results(self):
+        """ Returns the result of each future, None if it failed or is not
+        done.
+        """
+        return [
+            self._futures[i].result() if self._succeeded(i) else None
+            for i in range(len(self._futures))
+        ]
+
+    def exceptions(self):
+        """ Returns the exception of each future, None if it succeeded or is
+        not done.
+        """
+        exceptions = []
+        for i, future in enumerate(self._futures):
+            exception = None
+            if self.done(i):
+                try:
+                    exception = future.exception()
+                except Exception as error:
+                    # Cancelled.
+                    exception = error
+            exceptions.append(exception)
+        return exceptions
+
+    def _succeeded(self, i):
+        if not self.done(i):
+            return False
+        try:
+            return self._futures[i].exception() is None
+        except Exception:
+            return False
+
+
+def collect(futures, timeout=None):
+    """ Waits up to timeout seconds on futures.
+    Returns:
+        results: result of each future, None if it failed or timed out.
+    """
+    collector = Collector(futures)
+    collector.wait(timeout)
+    return collector.results()
@@ -0,0 +1,135 @@
+""" Hedged calls.
+
+A step waits on its slowest child. A hedged call sends the same request to
+a standby peer when the child has not answered within a delay, usually
+the child's observed p95 latency. The first successful answer completes
+the call and the other call is cancelled. Cancelling a Streams future
+only drops its response; the peer still sees the request.
+
+Hedges are capped by a budget: at most budget hedges per call made, e.g.
+0.05 allows one extra request per twenty calls.
+"""
+
+from concurrent import futures
+import heapq
+import itertools
+from loguru import logger
+import threading
+import time
+
+
+class HedgedFuture(futures.Future):
+    """ Future of a hedged call.
+    Attributes:
+        hedged: True once the backup request was sent.
+        won: True if the backup answered first.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.hedged = False
+        self.won = False
+
+
+class Hedger():
+
+    def __init__(self, budget):
+        """ Hedges calls within budget.
+        Args:
+            budget: maximum hedges per call, 0 disables hedging.
+        """
+        self.budget = budget
+        self.calls = 0
+        self.fired = 0
+        self.won = 0
+        self._lock = threading.Lock()
+        # Pending hedges, heap of (deadline, sequence, fire).
+        self._timers = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition(self._lock)
+        self._thread = None
+
+    def hedge(self, primary, delay, backup):
+        """ Hedges primary with backup after delay seconds.
+        Args:
+            primary: future of the call to the child.
+            delay: seconds to wait on primary before hedging.
+            backup: callable sending the request to a standby peer,
+                returns its future or None if no standby is available.
+        Returns:
+            HedgedFuture completed by the first successful call.
+        """
+        result = HedgedFuture()
+        state = {'backup': None, 'pending': 1}
+        state_lock = threading.Lock()
+
+        def _done(call, is_backup):
+            with state_lock:
+                state['pending'] -= 1
+                if result.done() or call.cancelled():
+                    return
+                error = call.exception()
+                if error is not None and state['pending'] > 0:
+                    # The other call may still succeed.
+                    return
+                other = primary if is_backup else state['backup']
+                if error is None:
+                    result.won = is_backup
+                    if is_backup:
+                        with self._lock:
+                            self.won += 1
+                    result.set_result(call.result())
+                else:
+                    result.set_exception(error)
+            if other is not None:
+                other.cancel()
+
+        def _fire():
+            with state_lock:
+                if result.done():
+                    return
+                with self._lock:
+                    if self.fired >= self.budget * self.calls:
+                        return
+                future = backup()
+                if future is None:
+                    return
+                with self._lock:
+                    self.fired += 1
+                result.hedged = True
+                state['backup'] = future
+                state['pending'] += 1
+            future.add_done_callback(lambda call: _done(call, True))
+
+        with self._lock:
+            self.calls += 1
+        primary.add_done_callback(lambda call: _done(call, False))
+        if self.budget > 0:
+            self._schedule(delay, _fire)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {'calls': self.calls, 'fired': self.fired, 'won': self.won}
+
+    def _schedule(self, delay, fire):
+        with self._condition:
+            heapq.heappush(self._timers,
+                           (time.time() + delay, next(self._sequence), fire))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._timers or self._timers[0][0] > time.time():
+                    timeout = self._timers[0][0] - time.time(
+                    ) if self._timers else None
+                    self._condition.wait(timeout)
+                _, _, fire = heapq.heappop(self._timers)
+            try:
+                fire()
+            except Exception as error:
+                logger.error('Hedge failed: {}', error)
@@ -0,0 +1,82 @@
+""" Message identifiers.
+
+A message id names a Spike and its later Grades across every hop of the
+network. Ids used to be a SHA256 over a nounce, the source id and the
+serialized payload, computed again for each message. MessageIds builds
+ids from a per-source prefix and a counter or nounce instead, so no
+payload is hashed:
+
+    prefix = BLAKE2b(salt + source_id)[:16]
+    message_id = prefix + nounce
+
+The salt is random per MessageIds, so counters restarting with the
+process do not repeat ids. Where the id must follow from the payload,
+content() hashes the raw tensor bytes with BLAKE2b keyed by the prefix.
+
+sha256() keeps the payload hash, for the source and parent proof fields
+reserved in the proto.
+"""
+
+import hashlib
+import itertools
+import os
+import struct
+import threading
+
+from bittensor import serializer
+
+_PREFIX_SIZE = 16
+_COUNTER = struct.Struct('>Q')
+
+
+class MessageIds():
+
+    def __init__(self, source_id, salt=None):
+        """ Issues message ids for messages sourced at source_id.
+        Args:
+            source_id: identity of the source neuron.
+            salt: bytes mixed into the prefix, random by default.
+        """
+        salt = os.urandom(_PREFIX_SIZE) if salt is None else salt
+        self.prefix = hashlib.blake2b(salt + source_id.encode('utf-8'),
+                                      digest_size=_PREFIX_SIZE).digest()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def next(self):
+        """ Returns a new message id.
+        """
+        with self._lock:
+            count = next(self._counter)
+        return self.prefix + _COUNTER.pack(count)
+
+    def of(self, nounce):
+        """ Returns the message id of nounce. Calls with equal nounces
+        return equal ids.
+        Args:
+            nounce: int or str, unique per message.
+        """
+        if isinstance(nounce, int):
+            return self.prefix + _COUNTER.pack(nounce)
+        return self.prefix + nounce.encode('utf-8')
+
+    def content(self, array):
+        """ Returns the message id of a payload. Calls with equal payloads
+        return equal ids.
+        Args:
+            array: numpy array or array-like of floats, ints or strings.
+        """
+        return hashlib.blake2b(serializer.serialize(array),
+                               key=self.prefix,
+                               digest_size=2 * _PREFIX_SIZE).digest()
+
+
+def sha256(nounce, source_id, payload):
+    """ SHA256 over a nounce, the source id and the payload bytes, the id
+    the proof fields are computed over.
+    """
+    hash = hashlib.sha256()
+    hash.update(nounce.encode('utf-8'))
+    hash.update(source_id.encode('utf-8'))
+    hash.update(payload)
+    return hash.digest()
@@ -0,0 +1,140 @@
+""" Message memory with expiry and a capacity bound.
+
+Neurons remember the buffer of each Spike they answer until its Grade
+arrives. The store is split into lock striped shards, each an insertion
+ordered dict, so insert, lookup and removal are O(1) and entries expire
+from the front of their shard in arrival order. A full shard evicts its
+oldest entry. Entries older than ttl seconds are expired as new entries
+arrive and on expire().
+"""
+
+import collections
+import threading
+import time
+
+
+class _Stripe():
+
+    def __init__(self):
+        # message_id -> (insert time, buffer), oldest first.
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+
+class MessageStore():
+
+    def __init__(self, ttl=10.0, capacity=10000, stripes=16):
+        """ Store of message buffers by message_id.
+        Args:
+            ttl: seconds an entry is kept.
+            capacity: entries kept before the oldest are evicted.
+            stripes: number of independently locked shards.
+        """
+        self.ttl = ttl
+        self.capacity = capacity
+        self._stripes = [_Stripe() for _ in range(stripes)]
+        self._stripe_capacity = max(1, capacity // stripes)
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _stripe(self, message_id):
+        return self._stripes[hash(message_id) % len(self._stripes)]
+
+    def add(self, message_id, buffer):
+        """ Inserts buffer unless message_id is already stored.
+        Returns:
+            True if inserted.
+        """
+        stripe = self._stripe(message_id)
+        now = time.monotonic()
+        evicted = 0
+        with stripe.lock:
+            expired = self._expire(stripe, now)
+            if message_id in stripe.entries:
+                inserted = False
+            else:
+                while len(stripe.entries) >= self._stripe_capacity:
+                    stripe.entries.popitem(last=False)
+                    evicted += 1
+                stripe.entries[message_id] = (now, buffer)
+                inserted = True
+        self._count(expirations=expired, evictions=evicted)
+        return inserted
+
+    def get(self, message_id):
+        """ Returns the buffer of message_id, None if missing or expired.
+        """
+        stripe = self._stripe(message_id)
+        with stripe.lock:
+            entry = stripe.entries.get(message_id)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+    def pop(self, message_id):
+        """ Removes and returns the buffer of message_id, None if missing or
+        expired. Counts as a hit or a miss.
+        """
+        stripe = self._stripe(message_id)
+        with stripe.lock:
+            entry = stripe.entries.pop(message_id, None)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            self._count(misses=1)
+            return None
+        self._count(hits=1)
+        return entry[1]
+
+    def remove(self, message_id):
+        stripe = self._stripe(message_id)
+        with stripe.lock:
+            stripe.entries.pop(message_id, None)
+
+    def expire(self):
+        """ Drops expired entries of all shards.
+        """
+        now = time.monotonic()
+        for stripe in self._stripes:
+            with stripe.lock:
+                expired = self._expire(stripe, now)
+            self._count(expirations=expired)
+
+    def __len__(self):
+        return sum(len(stripe.entries) for stripe in self._stripes)
+
+    def __contains__(self, message_id):
+        return self.get(message_id) is not None
+
+    def stats(self):
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def _expire(self, stripe, now):
+        # Requires stripe.lock. Entries are ordered by insert time.
+        expired = 0
+        while stripe.entries:
+            inserted, _ = next(iter(stripe.entries.values()))
+            if now - inserted <= self.ttl:
+                break
+            stripe.entries.popitem(last=False)
+            expired += 1
+        return expired
+
+    def _count(self, hits=0, misses=0, evictions=0, expirations=0):
+        if not (hits or misses or evictions or expirations):
+            return
+        with self._stats_lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += evictions
+            self.expirations += expirations
@@ -0,0 +1,176 @@
+""" Per peer call statistics and child selection.
+
+PeerStats records the outcome, latency and size of the Spike and Grade
+calls made to each peer over a sliding window of recent calls. Calls that
+fail or outlive their deadline count as failures.
+
+Neurons pick their children with select(). Healthy children are kept;
+children failing most recent calls are replaced. Free slots are filled
+with the best ranked candidates. Peers are ranked by success rate over
+one plus median latency. Unknown peers rank first so that new nodes get
+tried. Stats of peers without calls for forget_after seconds are dropped,
+so replaced peers can be tried again later.
+"""
+
+import collections
+import threading
+import time
+
+import numpy as np
+
+
+class _Peer():
+
+    def __init__(self, window):
+        # (latency, success) of recent calls.
+        self.calls = collections.deque(maxlen=window)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.last_call = time.time()
+
+
+class PeerStats():
+
+    def __init__(self, window=100, min_calls=10, min_success=0.5,
+                 forget_after=600):
+        """ Call statistics of downstream peers.
+        Args:
+            window: number of recent calls kept per peer.
+            min_calls: calls recorded before a peer can be judged failing.
+            min_success: success rate under which a peer is failing.
+            forget_after: seconds without calls before a peer's stats are
+                dropped.
+        """
+        self.window = window
+        self.min_calls = min_calls
+        self.min_success = min_success
+        self.forget_after = forget_after
+        self._peers = {}
+        self._lock = threading.Lock()
+
+    def _peer(self, peer_id):
+        if peer_id not in self._peers:
+            self._peers[peer_id] = _Peer(self.window)
+        return self._peers[peer_id]
+
+    def record(self, peer_id, latency, success, bytes_sent=0,
+               bytes_received=0):
+        """ Records one call to peer_id.
+        """
+        with self._lock:
+            peer = self._peer(peer_id)
+            peer.calls.append((latency, success))
+            peer.bytes_sent += bytes_sent
+            peer.bytes_received += bytes_received
+            peer.last_call = time.time()
+
+    def track(self, peer_id, future, bytes_sent=0, timeout=None):
+        """ Records the call behind future when it completes. Calls taking
+        longer than timeout seconds count as failures.
+        Returns:
+            future.
+        """
+        start = time.time()
+
+        def _done(call):
+            if call.cancelled():
+                # Dropped by the caller, e.g. a hedged call that lost.
+                return
+            latency = time.time() - start
+            try:
+                response = call.result()
+                success = timeout is None or latency <= timeout
+                bytes_received = response.ByteSize()
+            except Exception:
+                success = False
+                bytes_received = 0
+            self.record(peer_id, latency, success, bytes_sent, bytes_received)
+
+        future.add_done_callback(_done)
+        return future
+
+    def calls(self, peer_id):
+        """ Number of recent calls recorded for peer_id.
+        """
+        with self._lock:
+            peer = self._peers.get(peer_id)
+            return 0 if peer is None else len(peer.calls)
+
+    def success_rate(self, peer_id):
+        """ Fraction of recent calls that succeeded, 1.0 for unknown peers.
+        """
+        with self._lock:
+            peer = self._peers.get(peer_id)
+            if peer is None or not peer.calls:
+                return 1.0
+            return sum(success for _, success in peer.calls) / len(peer.calls)
+
+    def latency(self, peer_id, percentile=50):
+        """ Latency percentile in seconds over recent calls, 0.0 for unknown
+        peers.
+        """
+        with self._lock:
+            peer = self._peers.get(peer_id)
+            if peer is None or not peer.calls:
+                return 0.0
+            return float(
+                np.percentile([latency for latency, _ in peer.calls],
+                              percentile))
+
+    def score(self, peer_id):
+        return self.success_rate(peer_id) / (1.0 + self.latency(peer_id))
+
+    def is_failing(self, peer_id):
+        with self._lock:
+            peer = self._peers.get(peer_id)
+            if peer is None or len(peer.calls) < self.min_calls:
+                return False
+        return self.success_rate(peer_id) < self.min_success
+
+    def select(self, channel_ids, candidates):
+        """ Chooses the peer of each child slot.
+        Args:
+            channel_ids: current peer of each slot, None for free slots.
+            candidates: peers available as children.
+        Returns:
+            peer of each slot. Failing peers are kept while no healthy
+            candidate is left to replace them.
+        """
+        self._forget_stale()
+        selected = list(channel_ids)
+        ranked = sorted((c for c in candidates if c not in selected),
+                        key=self.score,
+                        reverse=True)
+        ranked = [c for c in ranked if not self.is_failing(c)]
+        for i, peer_id in enumerate(selected):
+            if peer_id is not None and not self.is_failing(peer_id):
+                continue
+            if ranked:
+                selected[i] = ranked.pop(0)
+        return selected
+
+    def summary(self):
+        """ Returns per peer success rate, p50/p99 latency and bytes.
+        """
+        with self._lock:
+            peer_ids = list(self._peers)
+        summary = {}
+        for peer_id in peer_ids:
+            peer = self._peers.get(peer_id)
+            if peer is None:
+                continue
+            summary[peer_id] = {
+                'success': self.success_rate(peer_id),
+                'p50': self.latency(peer_id, 50),
+                'p99': self.latency(peer_id, 99),
+                'bytes_sent': peer.bytes_sent,
+                'bytes_received': peer.bytes_received,
+            }
+        return summary
+
+    def _forget_stale(self):
+        now = time.time()
+        with self._lock:
+            for peer_id in list(self._peers):
+                if now - self._peers[peer_id].last_call > self.forget_after:
+                    del self._peers[peer_id]
@@ -4,6 +4,7 @@
 
 import sys
 _b=sys.version_info[0]<3 and (lambda x:x) or (lambda x:x.encode('latin1'))
+from google.protobuf.internal import enum_type_wrapper
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
 from google.protobuf import reflection as _reflection
@@ -20,9 +21,59 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   package='',
   syntax='proto3',
   serialized_options=None,
-  serialized_pb=_b('\n\x1f\x62ittensor/proto/bittensor.proto\"j\n\x0cSpikeRequest\x12\x0f\n\x07version\x18\x01 \x01(\x02\x12\x11\n\tsource_id\x18\x02 \x01(\t\x12\x11\n\tparent_id\x18\x04 \x01(\t\x12\x12\n\nmessage_id\x18\x07 \x01(\x0c\x12\x0f\n\x07payload\x18\x08 \x01(\x0c\"j\n\rSpikeResponse\x12\x0f\n\x07version\x18\x01 \x01(\x02\x12\x11\n\tsource_id\x18\x02 \x01(\t\x12\x10\n\x08\x63hild_id\x18\x04 \x01(\t\x12\x12\n\nmessage_id\x18\x07 \x01(\x0c\x12\x0f\n\x07payload\x18\x08 \x01(\x0c\"j\n\x0cGradeRequest\x12\x0f\n\x07version\x18\x01 \x01(\x02\x12\x11\n\tsource_id\x18\x02 \x01(\t\x12\x11\n\tparent_id\x18\x04 \x01(\t\x12\x12\n\nmessage_id\x18\x07 \x01(\x0c\x12\x0f\n\x07payload\x18\x08 \x01(\x0c\"0\n\rGradeResponse\x12\x0f\n\x07version\x18\x01 \x01(\x02\x12\x0e\n\x06\x61\x63\x63\x65pt\x18\x02 \x01(\x08\x32_\n\tBittensor\x12(\n\x05Spike\x12\r.SpikeRequest\x1a\x0e.SpikeResponse\"\x00\x12(\n\x05Grade\x12\r.GradeRequest\x1a\x0e.GradeResponse\"\x00\x62\x06proto3')
+  serialized_pb=_b('\n\x1f\x62ittensor/proto/bittensor.proto\"\xcb\x01\n\x0cSpikeRequest\x12\x0f\n\x07version\x18\x01 \x01(\x02\x12\x11\n\tsource_id\x18\x02 \x01(\t\x12\x11\n\tparent_id\x18\x04 \x01(\t\x12\x12\n\nmessage_id\x18\x07 \x01(\x0c\x12\x0f\n\x07payload\x18\x08 \x01(\x0c\x12\x17\n\x06tensor\x18\t \x01(\x0b\x32\x07.Tensor\x12\x1c\n\tprecision\x18\n \x01(\x0e\x32\t.DataType\x12\x17\n\x0fvocabulary_hash\x18\x0b \x01(\x0c\x12\x0f\n\x07timeout\x18\x0c \x01(\x02\"\xbb\x01\n\rSpikeResponse\x12\x0f\n\x07version\x18\x01 \x01(\x02\x12\x11\n\tsource_id\x18\x02 \x01(\t\x12\x10\n\x08\x63hild_id\x18\x04 \x01(\t\x12\x12\n\nmessage_id\x18\x07 \x01(\x0c\x12\x0f\n\x07payload\x18\x08 \x01(\x0c\x12\x17\n\x06tensor\x18\t \x01(\x0b\x32\x07.Tensor\x12\x17\n\x0fvocabulary_hash\x18\n \x01(\x0c\x12\x0c\n\x04\x63ode\x18\x0b \x01(\x05\x12\x0f\n\x07\x64\x65tails\x18\x0c \x01(\t\"\x94\x01\n\x0cGradeRequest\x12\x0f\n\x07version\x18\x01 \x01(\x02\x12\x11\n\tsource_id\x18\x02 \x01(\t\x12\x11\n\tparent_id\x18\x04 \x01(\t\x12\x12\n\nmessage_id\x18\x07 \x01(\x0c\x12\x0f\n\x07payload\x18\x08 \x01(\x0c\x12\x17\n\x06tensor\x18\t \x01(\x0b\x32\x07.Tensor\x12\x0f\n\x07timeout\x18\n \x01(\x02\"c\n\rGradeResponse\x12\x0f\n\x07version\x18\x01 \x01(\x02\x12\x0e\n\x06\x61\x63\x63\x65pt\x18\x02 \x01(\x08\x12\x12\n\nmessage_id\x18\x03 \x01(\x0c\x12\x0c\n\x04\x63ode\x18\x04 \x01(\x05\x12\x0f\n\x07\x64\x65tails\x18\x05 \x01(\t\"4\n\x11SpikeBatchRequest\x12\x1f\n\x08requests\x18\x01 \x03(\x0b\x32\r.SpikeRequest\"7\n\x12SpikeBatchResponse\x12!\n\tresponses\x18\x01 \x03(\x0b\x32\x0e.SpikeResponse\"4\n\x11GradeBatchRequest\x12\x1f\n\x08requests\x18\x01 \x03(\x0b\x32\r.GradeRequest\"7\n\x12GradeBatchResponse\x12!\n\tresponses\x18\x01 \x03(\x0b\x32\x0e.GradeResponse\"u\n\x06Tensor\x12\x18\n\x05\x64type\x18\x01 \x01(\x0e\x32\t.DataType\x12\r\n\x05shape\x18\x02 \x03(\x03\x12\x0e\n\x06\x62uffer\x18\x03 \x01(\x0c\x12\x12\n\nstring_val\x18\x04 \x03(\t\x12\r\n\x05scale\x18\x05 \x03(\x02\x12\x0f\n\x07indices\x18\x06 \x03(\x05*]\n\x08\x44\x61taType\x12\x0b\n\x07UNKNOWN\x10\x00\x12\x0b\n\x07\x46LOAT32\x10\x01\x12\t\n\x05INT32\x10\x02\x12\t\n\x05INT64\x10\x03\x12\n\n\x06STRING\x10\x04\x12\x0b\n\x07\x46LOAT16\x10\x05\x12\x08\n\x04INT8\x10\x06\x32\xb9\x02\n\tBittensor\x12(\n\x05Spike\x12\r.SpikeRequest\x1a\x0e.SpikeResponse\"\x00\x12(\n\x05Grade\x12\r.GradeRequest\x1a\x0e.GradeResponse\"\x00\x12\x32\n\x0bSpikeStream\x12\r.SpikeRequest\x1a\x0e.SpikeResponse\"\x00(\x01\x30\x01\x12\x32\n\x0bGradeStream\x12\r.GradeRequest\x1a\x0e.GradeResponse\"\x00(\x01\x30\x01\x12\x37\n\nSpikeBatch\x12\x12.SpikeBatchRequest\x1a\x13.SpikeBatchResponse\"\x00\x12\x37\n\nGradeBatch\x12\x12.GradeBatchRequest\x1a\x13.GradeBatchResponse\"\x00\x62\x06proto3')
 )
 
+_DATATYPE = _descriptor.EnumDescriptor(
+  name='DataType',
+  full_name='DataType',
+  filename=None,
+  file=DESCRIPTOR,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='UNKNOWN', index=0, number=0,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='FLOAT32', index=1, number=1,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='INT32', index=2, number=2,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='INT64', index=3, number=3,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='STRING', index=4, number=4,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='FLOAT16', index=5, number=5,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='INT8', index=6, number=6,
+      serialized_options=None,
+      type=None),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=1024,
+  serialized_end=1117,
+)
+_sym_db.RegisterEnumDescriptor(_DATATYPE)
+
+DataType = enum_type_wrapper.EnumTypeWrapper(_DATATYPE)
+UNKNOWN = 0
+FLOAT32 = 1
+INT32 = 2
+INT64 = 3
+STRING = 4
+FLOAT16 = 5
+INT8 = 6
 
 
 
@@ -68,6 +119,34 @@ _SPIKEREQUEST = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='tensor', full_name='SpikeRequest.tensor', index=5,
+      number=9, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='precision', full_name='SpikeRequest.precision', index=6,
+      number=10, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='vocabulary_hash', full_name='SpikeRequest.vocabulary_hash', index=7,
+      number=11, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='timeout', full_name='SpikeRequest.timeout', index=8,
+      number=12, type=2, cpp_type=6, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -80,8 +159,8 @@ _SPIKEREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=35,
-  serialized_end=141,
+  serialized_start=36,
+  serialized_end=239,
 )
 
 
@@ -127,6 +206,34 @@ _SPIKERESPONSE = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='tensor', full_name='SpikeResponse.tensor', index=5,
+      number=9, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='vocabulary_hash', full_name='SpikeResponse.vocabulary_hash', index=6,
+      number=10, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='code', full_name='SpikeResponse.code', index=7,
+      number=11, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='details', full_name='SpikeResponse.details', index=8,
+      number=12, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -139,8 +246,8 @@ _SPIKERESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=143,
-  serialized_end=249,
+  serialized_start=242,
+  serialized_end=429,
 )
 
 
@@ -186,6 +293,20 @@ _GRADEREQUEST = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='tensor', full_name='GradeRequest.tensor', index=5,
+      number=9, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='timeout', full_name='GradeRequest.timeout', index=6,
+      number=10, type=2, cpp_type=6, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -198,8 +319,8 @@ _GRADEREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=251,
-  serialized_end=357,
+  serialized_start=432,
+  serialized_end=580,
 )
 
 
@@ -224,6 +345,58 @@ _GRADERESPONSE = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='message_id', full_name='GradeResponse.message_id', index=2,
+      number=3, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='code', full_name='GradeResponse.code', index=3,
+      number=4, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='details', full_name='GradeResponse.details', index=4,
+      number=5, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=582,
+  serialized_end=681,
+)
+
+
+_SPIKEBATCHREQUEST = _descriptor.Descriptor(
+  name='SpikeBatchRequest',
+  full_name='SpikeBatchRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='requests', full_name='SpikeBatchRequest.requests', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -236,14 +409,188 @@ _GRADERESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=359,
-  serialized_end=407,
+  serialized_start=683,
+  serialized_end=735,
 )
 
+
+_SPIKEBATCHRESPONSE = _descriptor.Descriptor(
+  name='SpikeBatchResponse',
+  full_name='SpikeBatchResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='responses', full_name='SpikeBatchResponse.responses', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=737,
+  serialized_end=792,
+)
+
+
+_GRADEBATCHREQUEST = _descriptor.Descriptor(
+  name='GradeBatchRequest',
+  full_name='GradeBatchRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='requests', full_name='GradeBatchRequest.requests', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=794,
+  serialized_end=846,
+)
+
+
+_GRADEBATCHRESPONSE = _descriptor.Descriptor(
+  name='GradeBatchResponse',
+  full_name='GradeBatchResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='responses', full_name='GradeBatchResponse.responses', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=848,
+  serialized_end=903,
+)
+
+
+_TENSOR = _descriptor.Descriptor(
+  name='Tensor',
+  full_name='Tensor',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='dtype', full_name='Tensor.dtype', index=0,
+      number=1, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='shape', full_name='Tensor.shape', index=1,
+      number=2, type=3, cpp_type=2, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='buffer', full_name='Tensor.buffer', index=2,
+      number=3, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='string_val', full_name='Tensor.string_val', index=3,
+      number=4, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='scale', full_name='Tensor.scale', index=4,
+      number=5, type=2, cpp_type=6, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='indices', full_name='Tensor.indices', index=5,
+      number=6, type=5, cpp_type=1, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=905,
+  serialized_end=1022,
+)
+
+_SPIKEREQUEST.fields_by_name['tensor'].message_type = _TENSOR
+_SPIKEREQUEST.fields_by_name['precision'].enum_type = _DATATYPE
+_SPIKERESPONSE.fields_by_name['tensor'].message_type = _TENSOR
+_GRADEREQUEST.fields_by_name['tensor'].message_type = _TENSOR
+_SPIKEBATCHREQUEST.fields_by_name['requests'].message_type = _SPIKEREQUEST
+_SPIKEBATCHRESPONSE.fields_by_name['responses'].message_type = _SPIKERESPONSE
+_GRADEBATCHREQUEST.fields_by_name['requests'].message_type = _GRADEREQUEST
+_GRADEBATCHRESPONSE.fields_by_name['responses'].message_type = _GRADERESPONSE
+_TENSOR.fields_by_name['dtype'].enum_type = _DATATYPE
 DESCRIPTOR.message_types_by_name['SpikeRequest'] = _SPIKEREQUEST
 DESCRIPTOR.message_types_by_name['SpikeResponse'] = _SPIKERESPONSE
 DESCRIPTOR.message_types_by_name['GradeRequest'] = _GRADEREQUEST
 DESCRIPTOR.message_types_by_name['GradeResponse'] = _GRADERESPONSE
+DESCRIPTOR.message_types_by_name['SpikeBatchRequest'] = _SPIKEBATCHREQUEST
+DESCRIPTOR.message_types_by_name['SpikeBatchResponse'] = _SPIKEBATCHRESPONSE
+DESCRIPTOR.message_types_by_name['GradeBatchRequest'] = _GRADEBATCHREQUEST
+DESCRIPTOR.message_types_by_name['GradeBatchResponse'] = _GRADEBATCHRESPONSE
+DESCRIPTOR.message_types_by_name['Tensor'] = _TENSOR
+DESCRIPTOR.enum_types_by_name['DataType'] = _DATATYPE
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 SpikeRequest = _reflection.GeneratedProtocolMessageType('SpikeRequest', (_message.Message,), dict(
@@ -274,6 +621,41 @@ GradeResponse = _reflection.GeneratedProtocolMessageType('GradeResponse', (_mess
   ))
 _sym_db.RegisterMessage(GradeResponse)
 
+SpikeBatchRequest = _reflection.GeneratedProtocolMessageType('SpikeBatchRequest', (_message.Message,), dict(
+  DESCRIPTOR = _SPIKEBATCHREQUEST,
+  __module__ = 'bittensor.proto.bittensor_pb2'
+  # @@protoc_insertion_point(class_scope:SpikeBatchRequest)
+  ))
+_sym_db.RegisterMessage(SpikeBatchRequest)
+
+SpikeBatchResponse = _reflection.GeneratedProtocolMessageType('SpikeBatchResponse', (_message.Message,), dict(
+  DESCRIPTOR = _SPIKEBATCHRESPONSE,
+  __module__ = 'bittensor.proto.bittensor_pb2'
+  # @@protoc_insertion_point(class_scope:SpikeBatchResponse)
+  ))
+_sym_db.RegisterMessage(SpikeBatchResponse)
+
+GradeBatchRequest = _reflection.GeneratedProtocolMessageType('GradeBatchRequest', (_message.Message,), dict(
+  DESCRIPTOR = _GRADEBATCHREQUEST,
+  __module__ = 'bittensor.proto.bittensor_pb2'
+  # @@protoc_insertion_point(class_scope:GradeBatchRequest)
+  ))
+_sym_db.RegisterMessage(GradeBatchRequest)
+
+GradeBatchResponse = _reflection.GeneratedProtocolMessageType('GradeBatchResponse', (_message.Message,), dict(
+  DESCRIPTOR = _GRADEBATCHRESPONSE,
+  __module__ = 'bittensor.proto.bittensor_pb2'
+  # @@protoc_insertion_point(class_scope:GradeBatchResponse)
+  ))
+_sym_db.RegisterMessage(GradeBatchResponse)
+
+Tensor = _reflection.GeneratedProtocolMessageType('Tensor', (_message.Message,), dict(
+  DESCRIPTOR = _TENSOR,
+  __module__ = 'bittensor.proto.bittensor_pb2'
+  # @@protoc_insertion_point(class_scope:Tensor)
+  ))
+_sym_db.RegisterMessage(Tensor)
+
 
 
 _BITTENSOR = _descriptor.ServiceDescriptor(
@@ -282,8 +664,8 @@ _BITTENSOR = _descriptor.ServiceDescriptor(
   file=DESCRIPTOR,
   index=0,
   serialized_options=None,
-  serialized_start=409,
-  serialized_end=504,
+  serialized_start=1120,
+  serialized_end=1433,
   methods=[
   _descriptor.MethodDescriptor(
     name='Spike',
@@ -303,6 +685,42 @@ _BITTENSOR = _descriptor.ServiceDescriptor(
     output_type=_GRADERESPONSE,
     serialized_options=None,
   ),
+  _descriptor.MethodDescriptor(
+    name='SpikeStream',
+    full_name='Bittensor.SpikeStream',
+    index=2,
+    containing_service=None,
+    input_type=_SPIKEREQUEST,
+    output_type=_SPIKERESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='GradeStream',
+    full_name='Bittensor.GradeStream',
+    index=3,
+    containing_service=None,
+    input_type=_GRADEREQUEST,
+    output_type=_GRADERESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='SpikeBatch',
+    full_name='Bittensor.SpikeBatch',
+    index=4,
+    containing_service=None,
+    input_type=_SPIKEBATCHREQUEST,
+    output_type=_SPIKEBATCHRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='GradeBatch',
+    full_name='Bittensor.GradeBatch',
+    index=5,
+    containing_service=None,
+    input_type=_GRADEBATCHREQUEST,
+    output_type=_GRADEBATCHRESPONSE,
+    serialized_options=None,
+  ),
 ])
 _sym_db.RegisterServiceDescriptor(_BITTENSOR)
 
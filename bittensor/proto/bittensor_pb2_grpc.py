@@ -26,6 +26,26 @@ class BittensorStub(object):
         request_serializer=bittensor_dot_proto_dot_bittensor__pb2.GradeRequest.SerializeToString,
         response_deserializer=bittensor_dot_proto_dot_bittensor__pb2.GradeResponse.FromString,
         )
+    self.SpikeStream = channel.stream_stream(
+        '/Bittensor/SpikeStream',
+        request_serializer=bittensor_dot_proto_dot_bittensor__pb2.SpikeRequest.SerializeToString,
+        response_deserializer=bittensor_dot_proto_dot_bittensor__pb2.SpikeResponse.FromString,
+        )
+    self.GradeStream = channel.stream_stream(
+        '/Bittensor/GradeStream',
+        request_serializer=bittensor_dot_proto_dot_bittensor__pb2.GradeRequest.SerializeToString,
+        response_deserializer=bittensor_dot_proto_dot_bittensor__pb2.GradeResponse.FromString,
+        )
+    self.SpikeBatch = channel.unary_unary(
+        '/Bittensor/SpikeBatch',
+        request_serializer=bittensor_dot_proto_dot_bittensor__pb2.SpikeBatchRequest.SerializeToString,
+        response_deserializer=bittensor_dot_proto_dot_bittensor__pb2.SpikeBatchResponse.FromString,
+        )
+    self.GradeBatch = channel.unary_unary(
+        '/Bittensor/GradeBatch',
+        request_serializer=bittensor_dot_proto_dot_bittensor__pb2.GradeBatchRequest.SerializeToString,
+        response_deserializer=bittensor_dot_proto_dot_bittensor__pb2.GradeBatchResponse.FromString,
+        )
 
 
 class BittensorServicer(object):
@@ -49,6 +69,38 @@ class BittensorServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def SpikeStream(self, request_iterator, context):
+    """Long-lived Spike stream. Responses are matched to requests by
+    message_id and may arrive out of order.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def GradeStream(self, request_iterator, context):
+    """Long-lived Grade stream. Responses are matched to requests by
+    message_id and may arrive out of order.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def SpikeBatch(self, request, context):
+    """Several Spike requests to one peer in one call. The peer may serve
+    them with a single pass through its model.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def GradeBatch(self, request, context):
+    """Several Grade requests to one peer in one call. The peer may apply
+    them with a single pass through its model.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
 
 def add_BittensorServicer_to_server(servicer, server):
   rpc_method_handlers = {
@@ -62,6 +114,26 @@ def add_BittensorServicer_to_server(servicer, server):
           request_deserializer=bittensor_dot_proto_dot_bittensor__pb2.GradeRequest.FromString,
           response_serializer=bittensor_dot_proto_dot_bittensor__pb2.GradeResponse.SerializeToString,
       ),
+      'SpikeStream': grpc.stream_stream_rpc_method_handler(
+          servicer.SpikeStream,
+          request_deserializer=bittensor_dot_proto_dot_bittensor__pb2.SpikeRequest.FromString,
+          response_serializer=bittensor_dot_proto_dot_bittensor__pb2.SpikeResponse.SerializeToString,
+      ),
+      'GradeStream': grpc.stream_stream_rpc_method_handler(
+          servicer.GradeStream,
+          request_deserializer=bittensor_dot_proto_dot_bittensor__pb2.GradeRequest.FromString,
+          response_serializer=bittensor_dot_proto_dot_bittensor__pb2.GradeResponse.SerializeToString,
+      ),
+      'SpikeBatch': grpc.unary_unary_rpc_method_handler(
+          servicer.SpikeBatch,
+          request_deserializer=bittensor_dot_proto_dot_bittensor__pb2.SpikeBatchRequest.FromString,
+          response_serializer=bittensor_dot_proto_dot_bittensor__pb2.SpikeBatchResponse.SerializeToString,
+      ),
+      'GradeBatch': grpc.unary_unary_rpc_method_handler(
+          servicer.GradeBatch,
+          request_deserializer=bittensor_dot_proto_dot_bittensor__pb2.GradeBatchRequest.FromString,
+          response_serializer=bittensor_dot_proto_dot_bittensor__pb2.GradeBatchResponse.SerializeToString,
+      ),
   }
   generic_handler = grpc.method_handlers_generic_handler(
       'Bittensor', rpc_method_handlers)
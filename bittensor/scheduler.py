@@ -0,0 +1,126 @@
+""" Priority scheduling of incoming Spikes.
+
+gRPC hands calls to its worker threads in arrival order. A Scheduler sits
+between the handlers and the nucleus: at most workers calls run the
+nucleus at once, the others wait in a queue ordered by the priority of
+their parent, e.g. its stake, then by arrival. When max_queue calls are
+waiting, the lowest priority one is shed with Overloaded, so under load
+we serve the peers that pay us.
+
+Queue depth on arrival and time spent waiting are kept as histograms.
+"""
+
+import bisect
+import threading
+import time
+
+# Upper bounds of the histogram buckets, the last bucket is unbounded.
+DEPTH_BUCKETS = [0, 1, 2, 4, 8, 16, 32, 64]
+WAIT_BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]
+
+
+class Overloaded(Exception):
+    """ Raised for calls shed from a full queue.
+    """
+
+
+class _Waiter():
+
+    def __init__(self, priority, sequence):
+        self.priority = priority
+        self.sequence = sequence
+        self.shed = False
+
+
+def stake_priority(metagraph):
+    """ Returns a function giving the stake of a parent in the metagraph, 0
+    for unknown parents.
+    """
+
+    def _priority(parent_id):
+        node = metagraph.nodes.get(parent_id)
+        return 0.0 if node is None else float(node.stake)
+
+    return _priority
+
+
+class Scheduler():
+
+    def __init__(self, workers=2, max_queue=32, priority=None):
+        """ Schedules calls by priority.
+        Args:
+            workers: calls run at once.
+            max_queue: calls waiting before the lowest priority is shed.
+            priority: function of parent_id, higher runs first. None
+                schedules in arrival order.
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self.priority = priority
+        self.active = 0
+        self.shed = 0
+        self.depths = [0 for _ in range(len(DEPTH_BUCKETS) + 1)]
+        self.waits = [0 for _ in range(len(WAIT_BUCKETS) + 1)]
+        self._waiting = []
+        self._sequence = 0
+        self._condition = threading.Condition()
+
+    def run(self, parent_ids, fn, *args):
+        """ Runs fn(*args) once its turn comes, with the priority of the
+        highest priority parent in parent_ids.
+        Raises:
+            Overloaded: if the call was shed.
+        """
+        priority = 0.0
+        if self.priority and parent_ids:
+            priority = max(self.priority(p) for p in parent_ids)
+        start = time.time()
+        with self._condition:
+            self.depths[bisect.bisect_left(DEPTH_BUCKETS,
+                                           len(self._waiting))] += 1
+            waiter = _Waiter(priority, self._sequence)
+            self._sequence += 1
+            if len(self._waiting) >= self.max_queue:
+                # Shed the lowest priority, latest arrived, call.
+                lowest = min(self._waiting,
+                             key=lambda w: (w.priority, -w.sequence))
+                if lowest.priority >= priority:
+                    self.shed += 1
+                    raise Overloaded()
+                self._waiting.remove(lowest)
+                lowest.shed = True
+                self.shed += 1
+                self._condition.notify_all()
+            self._waiting.append(waiter)
+            while not waiter.shed and not (self.active < self.workers and
+                                           self._next() is waiter):
+                self._condition.wait()
+            if waiter.shed:
+                raise Overloaded()
+            self._waiting.remove(waiter)
+            self.active += 1
+            self.waits[bisect.bisect_left(WAIT_BUCKETS,
+                                          time.time() - start)] += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._condition:
+                self.active -= 1
+                self._condition.notify_all()
+
+    def stats(self):
+        """ Returns the queue depth, calls shed and the depth and wait time
+        histograms, as counts per bucket upper bound.
+        """
+        with self._condition:
+            return {
+                'queued': len(self._waiting),
+                'active': self.active,
+                'shed': self.shed,
+                'depths': dict(zip(DEPTH_BUCKETS + ['inf'], self.depths)),
+                'waits': dict(zip(WAIT_BUCKETS + ['inf'], self.waits)),
+            }
+
+    def _next(self):
+        # Requires self._condition.
+        return min(self._waiting, key=lambda w: (-w.priority, w.sequence))
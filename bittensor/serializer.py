@@ -0,0 +1,585 @@
+""" Tensor serialization for Spike and Grade payloads.
+
+Payloads are encoded according to the protocol version carried on each
+message:
+
+    1.0: pickle protocol 0 (legacy, ASCII) in the payload field.
+    1.1: binary header (dtype code, rank, shape) followed by the contiguous
+         little-endian buffer in the payload field.
+    2.0: typed Tensor proto (dtype, shape, packed buffer) in the tensor field.
+
+Floating point arrays are sent as float32 and numeric payloads are decoded
+with np.frombuffer without copying. At version 2.0 float tensors may instead
+be quantized for transport, either to float16 or to int8 with a per-row
+scale, and/or top-k sparsified per row. unpack dequantizes and densifies
+them back to float32.
+
+Receivers dispatch on the version field of the incoming message and respond
+with the highest version both sides speak (see negotiate). Senders track the
+version spoken by each downstream peer with a Negotiator.
+"""
+
+import grpc
+import numpy as np
+import pickle
+import struct
+from threading import Lock
+
+import bittensor.proto.bittensor_pb2 as proto_pb2
+
+# Legacy pickle protocol 0 payloads.
+PICKLE_VERSION = 1.0
+
+# Binary header + raw buffer payloads.
+BINARY_VERSION = 1.1
+
+# Typed Tensor proto payloads.
+TENSOR_VERSION = 2.0
+
+# Versions understood by this package, ascending.
+SUPPORTED_VERSIONS = (PICKLE_VERSION, BINARY_VERSION, TENSOR_VERSION)
+
+# Version sent by this package.
+VERSION = TENSOR_VERSION
+
+# Proto dtype to numpy dtype.
+_NUMPY_DTYPES = {
+    proto_pb2.FLOAT32: np.dtype('<f4'),
+    proto_pb2.FLOAT16: np.dtype('<f2'),
+    proto_pb2.INT8: np.dtype('i1'),
+    proto_pb2.INT32: np.dtype('<i4'),
+    proto_pb2.INT64: np.dtype('<i8'),
+}
+
+# Transport precisions for float tensors.
+PRECISIONS = {
+    'float32': proto_pb2.FLOAT32,
+    'float16': proto_pb2.FLOAT16,
+    'int8': proto_pb2.INT8,
+}
+
+# Version 1.1 header dtype codes.
+_BINARY_CODES = {
+    proto_pb2.FLOAT32: 0,
+    proto_pb2.INT32: 1,
+    proto_pb2.INT64: 2,
+    proto_pb2.STRING: 3,
+}
+_BINARY_DTYPES = {code: dtype for dtype, code in _BINARY_CODES.items()}
+
+# Version 1.1 header prefix: dtype code, rank.
+_PREFIX = struct.Struct('<BB')
+
+# Status codes returned by peers which failed to parse our payload.
+_INCOMPATIBLE_CODES = (grpc.StatusCode.UNKNOWN,
+                       grpc.StatusCode.INVALID_ARGUMENT)
+
+# Status code returned by peers which do not hold the vocabulary of our
+# token ids.
+_VOCABULARY_CODE = grpc.StatusCode.FAILED_PRECONDITION
+
+
+class SerializationError(Exception):
+    pass
+
+
+def _normalize(version):
+    # Versions travel as proto float32, i.e. 1.1 arrives as 1.100000023.
+    return round(float(version), 3)
+
+
+def negotiate(version):
+    """ Returns the highest supported version not above the passed version.
+    Unset (0.0) versions are treated as the legacy pickle protocol.
+    """
+    version = _normalize(version)
+    best = PICKLE_VERSION
+    for supported in SUPPORTED_VERSIONS:
+        if supported <= version:
+            best = supported
+    return best
+
+
+def downgrade(version):
+    """ Returns the supported version directly below the passed version.
+    """
+    version = negotiate(version)
+    index = SUPPORTED_VERSIONS.index(version)
+    return SUPPORTED_VERSIONS[max(0, index - 1)]
+
+
+def upgrade(version):
+    """ Returns the supported version directly above the passed version.
+    """
+    version = negotiate(version)
+    index = SUPPORTED_VERSIONS.index(version)
+    return SUPPORTED_VERSIONS[min(len(SUPPORTED_VERSIONS) - 1, index + 1)]
+
+
+def is_binary(version):
+    """ Returns True if messages at this version carry binary payloads.
+    """
+    return _normalize(version) >= BINARY_VERSION
+
+
+def is_tensor(version):
+    """ Returns True if messages at this version carry Tensor protos.
+    """
+    return _normalize(version) >= TENSOR_VERSION
+
+
+def pack(array, version=VERSION, precision=proto_pb2.FLOAT32):
+    """ Encodes an array into the payload fields for a message at version.
+    Args:
+        array: numpy array or array-like of floats, ints or strings.
+        version: protocol version of the message carrying the payload.
+        precision: transport dtype for float arrays, FLOAT32, FLOAT16 or
+            INT8. Ignored below version 2.0.
+    Returns:
+        fields: dict of message fields, i.e. {'tensor': Tensor} or
+            {'payload': bytes}, to be passed to the message constructor.
+    """
+    if is_tensor(version):
+        return {'tensor': to_tensor(array, precision)}
+    return {'payload': serialize(array, version)}
+
+
+def unpack(message, shape=None):
+    """ Decodes the payload of a Spike or Grade message.
+    Args:
+        message: SpikeRequest, SpikeResponse or GradeRequest proto.
+        shape: optional expected shape, None entries match any size.
+            Typed (2.0) tensors are checked before allocating. Legacy
+            payloads do not carry reliable shapes and are reshaped instead.
+    Returns:
+        array: numpy array.
+    """
+    if is_tensor(message.version):
+        return from_tensor(message.tensor, shape)
+    array = np.asarray(deserialize(message.payload, message.version))
+    if shape is not None:
+        array = array.reshape([-1 if dim is None else dim for dim in shape])
+    return array
+
+
+def to_tensor(array, precision=proto_pb2.FLOAT32, k=None):
+    """ Builds a Tensor proto from a numpy array. Float arrays are
+    quantized to the passed precision and, if k is set, only the k largest
+    magnitude entries of each row are kept.
+    """
+    array = np.asarray(array)
+    dtype = _dtype_of(array)
+    if dtype == proto_pb2.STRING:
+        return proto_pb2.Tensor(dtype=dtype,
+                                shape=array.shape,
+                                string_val=[to_str(s) for s in array.flat])
+    if dtype != proto_pb2.FLOAT32:
+        array = np.ascontiguousarray(array, dtype=_NUMPY_DTYPES[dtype])
+        return proto_pb2.Tensor(dtype=dtype,
+                                shape=array.shape,
+                                buffer=array.tobytes())
+
+    rows = _rows(array)
+    if k and k < rows.shape[1]:
+        indices = np.argpartition(-np.abs(rows), k - 1, axis=1)[:, :k]
+        tensor = _encode_values(np.take_along_axis(rows, indices, axis=1),
+                                precision)
+        tensor.indices.extend(indices.ravel().tolist())
+    else:
+        tensor = _encode_values(rows, precision)
+    tensor.shape.extend(array.shape)
+    return tensor
+
+
+def from_tensor(tensor, shape=None):
+    """ Decodes a Tensor proto into a numpy array. Numeric tensors are
+    returned as read-only views over the proto buffer (no copy), quantized
+    and sparse tensors are decoded to float32.
+    """
+    tensor_shape = tuple(tensor.shape)
+    if shape is not None:
+        _check_shape(tensor_shape, shape)
+    count = int(np.prod(tensor_shape))
+
+    if tensor.dtype == proto_pb2.STRING:
+        if len(tensor.string_val) != count:
+            raise SerializationError(
+                'Tensor holds {} strings, shape {} requires {}'.format(
+                    len(tensor.string_val), tensor_shape, count))
+        return np.array(tensor.string_val, dtype=object).reshape(tensor_shape)
+
+    if tensor.dtype not in _NUMPY_DTYPES:
+        raise SerializationError('Unknown tensor dtype {}'.format(tensor.dtype))
+    if len(tensor.indices) > 0:
+        return _densify(tensor, tensor_shape)
+    return _decode_values(tensor, tensor_shape)
+
+
+def precision(name):
+    """ Returns the transport precision for a name in PRECISIONS.
+    """
+    if name not in PRECISIONS:
+        raise ValueError('Unknown precision {}, expected one of {}'.format(
+            name, sorted(PRECISIONS)))
+    return PRECISIONS[name]
+
+
+def to_str(value):
+    """ Returns a string entry of an array, decoding utf-8 bytes.
+    """
+    return value.decode('utf-8') if isinstance(value, bytes) else str(value)
+
+
+def serialize(array, version=BINARY_VERSION):
+    """ Serializes a numpy array (or nested list) into payload bytes for the
+    pre-2.0 payload field.
+    Args:
+        array: numpy array or array-like of floats, ints or strings.
+        version: protocol version of the message carrying the payload.
+    Returns:
+        payload: bytes.
+    """
+    if not is_binary(version):
+        return pickle.dumps(array, protocol=0)
+
+    array = np.asarray(array)
+    dtype = _dtype_of(array)
+    if dtype == proto_pb2.STRING:
+        return _serialize_strings(array)
+
+    array = np.ascontiguousarray(array, dtype=_NUMPY_DTYPES[dtype])
+    return _header(_BINARY_CODES[dtype], array.shape) + array.tobytes()
+
+
+def deserialize(payload, version):
+    """ Deserializes pre-2.0 payload bytes into a numpy array.
+    Numeric payloads are returned as read-only views over the payload
+    buffer (no copy).
+    Args:
+        payload: bytes.
+        version: protocol version of the message carrying the payload.
+    Returns:
+        array: numpy array.
+    """
+    if not is_binary(version):
+        return pickle.loads(payload)
+
+    try:
+        code, ndim = _PREFIX.unpack_from(payload, 0)
+        shape = struct.unpack_from('<%dI' % ndim, payload, _PREFIX.size)
+    except struct.error as e:
+        raise SerializationError('Malformed header: {}'.format(e))
+    offset = _PREFIX.size + 4 * ndim
+
+    if code not in _BINARY_DTYPES:
+        raise SerializationError('Unknown dtype code {}'.format(code))
+    if _BINARY_DTYPES[code] == proto_pb2.STRING:
+        return _deserialize_strings(payload, offset, shape)
+
+    dtype = _NUMPY_DTYPES[_BINARY_DTYPES[code]]
+    count = int(np.prod(shape))
+    if len(payload) - offset != count * dtype.itemsize:
+        raise SerializationError('Payload size does not match shape {}'.format(shape))
+    return np.frombuffer(payload, dtype=dtype, count=count,
+                         offset=offset).reshape(shape)
+
+
+class Negotiator():
+
+    def __init__(self, probe_after=100):
+        """ Tracks the protocol version spoken by each downstream peer.
+        Peers start at VERSION. A response carries the version the peer
+        answered with, and a call failing because the peer could not parse
+        our payload steps the peer down one version.
+
+        A failure counts as a parse failure if it has an incompatible status
+        code and the peer has not answered at the version the call was sent
+        at yet; once it has, failures are not about the version. Only calls
+        sent at the peer's current version step it down, so the calls in
+        flight when a peer fails step it down once.
+
+        A peer stepped down is probed one version up after probe_after
+        successful calls, and after twice as many each time a probe fails.
+
+        Also tracks the vocabulary hash each peer advertises in its
+        SpikeResponses, forgotten when the peer rejects our token ids.
+        Args:
+            probe_after: successful calls before probing a higher version.
+        """
+        self.probe_after = probe_after
+        self._versions = {}
+        # Peers which answered at their current version.
+        self._confirmed = set()
+        # Successful calls and calls before the next probe, of stepped down
+        # peers.
+        self._successes = {}
+        self._probes = {}
+        # Peers probed at their current version.
+        self._probing = set()
+        self._vocabulary_hashes = {}
+        self._lock = Lock()
+
+    def version(self, peer_id):
+        return self._versions.get(peer_id, VERSION)
+
+    def vocabulary_hash(self, peer_id):
+        return self._vocabulary_hashes.get(peer_id, b'')
+
+    def on_response(self, peer_id, response, version=None):
+        """ Records a response to a call sent at version, None for the
+        peer's current version.
+        """
+        with self._lock:
+            current = self.version(peer_id)
+            sent = current if version is None else negotiate(version)
+            answered = negotiate(response.version)
+            if answered < sent and answered < current:
+                # The peer speaks an older version.
+                self._versions[peer_id] = answered
+                self._successes[peer_id] = 0
+            elif answered > current:
+                # A call sent before the peer was stepped down was answered
+                # at a higher version.
+                self._versions[peer_id] = answered
+                self._successes[peer_id] = 0
+            elif current < VERSION:
+                self._count_success(peer_id, current)
+            if answered >= self.version(peer_id):
+                self._confirmed.add(peer_id)
+                self._probing.discard(peer_id)
+            if isinstance(response, proto_pb2.SpikeResponse):
+                self._vocabulary_hashes[peer_id] = response.vocabulary_hash
+
+    def on_error(self, peer_id, error, version=None):
+        """ Records the error of a call sent at version, None for the
+        peer's current version.
+        """
+        # Sync call errors are grpc.Calls, asyncio ones only carry code().
+        code = error.code() if hasattr(error, 'code') else None
+        if code in _INCOMPATIBLE_CODES:
+            with self._lock:
+                current = self.version(peer_id)
+                sent = current if version is None else negotiate(version)
+                if sent == current and peer_id not in self._confirmed:
+                    self._step_down(peer_id, current)
+        elif code == _VOCABULARY_CODE:
+            self._vocabulary_hashes.pop(peer_id, None)
+
+    def track(self, peer_id, future, version=None):
+        """ Updates the peer's version when the call future, sent at
+        version, completes. None is the peer's current version.
+        """
+        if version is None:
+            version = self.version(peer_id)
+
+        def _done(call):
+            if call.cancelled():
+                return
+            error = call.exception()
+            if error is None:
+                self.on_response(peer_id, call.result(), version)
+            else:
+                self.on_error(peer_id, error, version)
+
+        future.add_done_callback(_done)
+        return future
+
+    def reset(self, peer_id):
+        with self._lock:
+            self._versions.pop(peer_id, None)
+            self._confirmed.discard(peer_id)
+            self._successes.pop(peer_id, None)
+            self._probes.pop(peer_id, None)
+            self._probing.discard(peer_id)
+            self._vocabulary_hashes.pop(peer_id, None)
+
+    def _step_down(self, peer_id, current):
+        # Requires self._lock. A failed probe doubles the wait for the next.
+        probe = self._probes.get(peer_id, self.probe_after)
+        if peer_id in self._probing:
+            probe *= 2
+            self._probing.discard(peer_id)
+        self._versions[peer_id] = downgrade(current)
+        self._confirmed.discard(peer_id)
+        self._successes[peer_id] = 0
+        self._probes[peer_id] = probe
+
+    def _count_success(self, peer_id, current):
+        # Requires self._lock. Probes the next version up.
+        self._successes[peer_id] = self._successes.get(peer_id, 0) + 1
+        if self._successes[peer_id] >= self._probes.get(
+                peer_id, self.probe_after):
+            self._versions[peer_id] = upgrade(current)
+            self._confirmed.discard(peer_id)
+            self._probing.add(peer_id)
+            self._successes[peer_id] = 0
+
+
+class Precisions():
+
+    def __init__(self, default='float32', overrides=''):
+        """ Transport precision used for float tensors sent to each peer.
+        Args:
+            default: precision name for peers without an override.
+            overrides: comma separated peer_id:precision pairs, e.g.
+                'abcd:int8,efgh:float16'.
+        """
+        self._default = precision(default)
+        self._precisions = {}
+        for item in filter(None, overrides.split(',')):
+            peer_id, _, name = item.strip().rpartition(':')
+            if not peer_id:
+                raise ValueError('Expected peer_id:precision, got {}'.format(item))
+            self._precisions[peer_id] = precision(name)
+
+    def precision(self, peer_id):
+        return self._precisions.get(peer_id, self._default)
+
+
+class ErrorFeedback():
+
+    def __init__(self, k):
+        """ Top-k sparsifies float tensors sent to each peer. What a peer
+        did not receive, dropped entries and quantization error, is kept as
+        a per-peer residual and added to the next tensor sent to that peer
+        when the shapes match.
+        Args:
+            k: entries kept per row. 0 or None sends dense tensors.
+        """
+        self._k = k
+        self._residuals = {}
+        self._lock = Lock()
+
+    def pack(self, peer_id, array, version=VERSION,
+             precision=proto_pb2.FLOAT32):
+        """ As serializer.pack, sparsifying with error feedback when the
+        peer speaks version 2.0.
+        """
+        if not self._k or not is_tensor(version):
+            return pack(array, version, precision)
+        array = np.asarray(array, dtype=np.float32)
+        with self._lock:
+            residual = self._residuals.get(peer_id)
+            if residual is not None and residual.shape == array.shape:
+                array = array + residual
+            tensor = to_tensor(array, precision, self._k)
+            self._residuals[peer_id] = array - from_tensor(tensor)
+        return {'tensor': tensor}
+
+    def reset(self, peer_id):
+        with self._lock:
+            self._residuals.pop(peer_id, None)
+
+
+def _dtype_of(array):
+    if array.dtype.kind in ('U', 'S', 'O'):
+        return proto_pb2.STRING
+    if array.dtype.kind == 'f':
+        return proto_pb2.FLOAT32
+    if array.dtype.kind in ('i', 'u', 'b') and array.dtype.itemsize <= 4:
+        return proto_pb2.INT32
+    if array.dtype.kind in ('i', 'u'):
+        return proto_pb2.INT64
+    raise SerializationError('Unsupported dtype {}'.format(array.dtype))
+
+
+def _check_shape(tensor_shape, shape):
+    if len(tensor_shape) != len(shape) or any(
+            dim is not None and dim != size
+            for dim, size in zip(shape, tensor_shape)):
+        raise SerializationError('Tensor shape {} does not match {}'.format(
+            tensor_shape, tuple(shape)))
+
+
+def _rows(array):
+    # Rows are entries of the outermost dimension. The row length comes from
+    # the shape, so batches of zero rows keep it.
+    if array.ndim > 1:
+        return array.reshape(array.shape[0], int(np.prod(array.shape[1:])))
+    return array.reshape(1, array.size)
+
+
+def _encode_values(rows, precision):
+    # Encodes a 2-D float array into the dtype, buffer and scale fields.
+    if precision == proto_pb2.INT8:
+        scale = np.abs(rows).max(axis=1) / 127.0 if rows.size else np.zeros(
+            len(rows), dtype=np.float32)
+        safe_scale = np.where(scale > 0, scale, 1.0)
+        values = np.rint(rows / safe_scale[:, None]).astype(np.int8)
+        return proto_pb2.Tensor(dtype=proto_pb2.INT8,
+                                buffer=values.tobytes(),
+                                scale=scale)
+    dtype = proto_pb2.FLOAT16 if precision == proto_pb2.FLOAT16 else proto_pb2.FLOAT32
+    values = np.ascontiguousarray(rows, dtype=_NUMPY_DTYPES[dtype])
+    return proto_pb2.Tensor(dtype=dtype, buffer=values.tobytes())
+
+
+def _decode_values(tensor, shape):
+    # Decodes the buffer of a numeric tensor as an array of shape.
+    dtype = _NUMPY_DTYPES[tensor.dtype]
+    count = int(np.prod(shape))
+    if len(tensor.buffer) != count * dtype.itemsize:
+        raise SerializationError(
+            'Tensor buffer holds {} bytes, shape {} requires {}'.format(
+                len(tensor.buffer), shape, count * dtype.itemsize))
+    array = np.frombuffer(tensor.buffer, dtype=dtype,
+                          count=count).reshape(shape)
+    if tensor.dtype == proto_pb2.FLOAT16:
+        return array.astype(np.float32)
+    if tensor.dtype == proto_pb2.INT8:
+        return _dequantize(array, tensor.scale)
+    return array
+
+
+def _dequantize(values, scale):
+    rows = _rows(values)
+    if len(scale) != len(rows):
+        raise SerializationError(
+            'INT8 tensor has {} scales for {} rows'.format(len(scale), len(rows)))
+    scale = np.asarray(scale, dtype=np.float32)
+    return (rows * scale[:, None]).reshape(values.shape)
+
+
+def _densify(tensor, shape):
+    # Scatters the k entries per row of a sparse tensor into zeros.
+    n_rows = shape[0] if len(shape) > 1 else 1
+    width = int(np.prod(shape)) // n_rows if n_rows else 0
+    if n_rows == 0 or len(tensor.indices) % n_rows != 0:
+        raise SerializationError(
+            'Sparse tensor has {} indices for {} rows'.format(
+                len(tensor.indices), n_rows))
+    k = len(tensor.indices) // n_rows
+    indices = np.array(tensor.indices, dtype=np.int64).reshape(n_rows, k)
+    if indices.min() < 0 or indices.max() >= width:
+        raise SerializationError(
+            'Sparse tensor index out of range for shape {}'.format(shape))
+    values = _decode_values(tensor, (n_rows, k))
+    dense = np.zeros((n_rows, width), dtype=np.float32)
+    np.put_along_axis(dense, indices, values, axis=1)
+    return dense.reshape(shape)
+
+
+def _header(code, shape):
+    return _PREFIX.pack(code, len(shape)) + struct.pack(
+        '<%dI' % len(shape), *shape)
+
+
+def _serialize_strings(array):
+    # Strings: uint32 byte lengths followed by the concatenated utf-8 bytes.
+    encoded = [to_str(s).encode('utf-8') for s in array.flat]
+    lengths = np.array([len(s) for s in encoded], dtype='<u4')
+    return _header(_BINARY_CODES[proto_pb2.STRING],
+                   array.shape) + lengths.tobytes() + b''.join(encoded)
+
+
+def _deserialize_strings(payload, offset, shape):
+    count = int(np.prod(shape))
+    lengths = np.frombuffer(payload, dtype='<u4', count=count, offset=offset)
+    offset += 4 * count
+    strings = []
+    for length in lengths:
+        strings.append(payload[offset:offset + length].decode('utf-8'))
+        offset += length
+    if offset != len(payload):
+        raise SerializationError('Payload size does not match shape {}'.format(shape))
+    return np.array(strings, dtype=object).reshape(shape)
@@ -0,0 +1,83 @@
+""" Preallocated slabs of message activations.
+
+Neurons keep the downstream spikes of each answered message until its
+Grade arrives. Allocating k arrays per message at high QPS churns the
+allocator and the garbage collector. A Slab preallocates
+[planes, slots, rows, width] float32 storage, one plane per array of a
+message, and hands out slots in ring order. A message stores its arrays
+by copying them into its slot and keeps the slot id.
+
+Slots are reused once the ring wraps around, but not within ttl seconds
+of their store, while their message may still be graded: a store finding
+the next slot that fresh returns None and the caller keeps its arrays on
+the heap, as it does for arrays with more than rows rows. Each slot
+carries a generation so that loads of an overwritten slot return None:
+stores copy under the lock, and loads copy out and check the generation
+afterwards, so a store racing a load turns the load into a miss rather
+than torn arrays.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+
+class Slab():
+
+    def __init__(self, slots, rows, width, planes=1, ttl=0):
+        """ Preallocates storage.
+        Args:
+            slots: messages stored before slots are reused.
+            rows: rows per message.
+            width: row width.
+            planes: arrays per message.
+            ttl: seconds a slot is not reused after its store, e.g. the
+                time messages are remembered waiting for their grade.
+        """
+        self.slots = slots
+        self.rows = rows
+        self.ttl = ttl
+        self.spilled = 0
+        self.data = np.zeros((planes, slots, rows, width), dtype=np.float32)
+        self._generations = np.zeros(slots, dtype=np.int64)
+        self._stored = np.full(slots, -np.inf)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def store(self, arrays):
+        """ Copies arrays, one per plane, into the next slot.
+        Returns:
+            (slot, generation), or None if the arrays have too many rows
+            or the next slot was stored within ttl seconds.
+        """
+        n = len(arrays[0])
+        if n > self.rows:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            slot = self._next
+            # Slots are stored in ring order, so the next one is the oldest.
+            if now - self._stored[slot] < self.ttl:
+                self.spilled += 1
+                return None
+            self._next = (slot + 1) % self.slots
+            self._stored[slot] = now
+            self._generations[slot] += 1
+            generation = int(self._generations[slot])
+            for plane, array in enumerate(arrays):
+                self.data[plane, slot, :n] = array
+        return slot, generation
+
+    def load(self, slot, rows):
+        """ Returns copies of the first rows rows of each plane of slot, as
+        returned by store, or None if the slot was reused since.
+        """
+        slot, generation = slot
+        if self._generations[slot] != generation:
+            return None
+        arrays = list(self.data[:, slot, :rows].copy())
+        # A store into the slot during the copy may have torn it.
+        if self._generations[slot] != generation:
+            return None
+        return arrays
@@ -0,0 +1,470 @@
+""" Long-lived bidirectional Spike and Grade streams.
+
+Unary Spike and Grade calls pay HTTP/2 stream setup and framing on every
+message. Streams carry many messages over one SpikeStream or GradeStream
+call per channel instead. Responses are matched to requests by message_id
+and may arrive out of order.
+
+Servers subclass StreamingServicer, which serves both streams, and by
+default the SpikeBatch and GradeBatch RPCs, through the unary Spike and
+Grade handlers. Clients send through a Streams object per
+channel. A Streams object falls back to unary calls for peers without
+stream support.
+
+A failing handler, aborting or raising, fails its own request only: the
+server answers it with a response carrying the status code and details,
+which the client raises as a StreamError from that request's future.
+Batched requests fail alone the same way. A request not answered within
+its timeout fails with DEADLINE_EXCEEDED. Requests carry their timeout,
+so the handler's context.time_remaining() is that of the request rather
+than of the long-lived stream, and a request whose deadline passed
+before a handler picked it up is not handled. A broken stream fails
+every request in flight on it, as a dropped connection would, and the
+next request opens a new stream.
+
+Each open stream holds a server worker thread for its lifetime. A
+process serves at most MAX_STREAMS streams at once, so size the server's
+pool above it to leave workers for unary calls. Further streams are
+refused with RESOURCE_EXHAUSTED and their clients use unary calls for
+STREAM_RETRY seconds.
+"""
+
+import collections
+from concurrent import futures
+import grpc
+import heapq
+import itertools
+from loguru import logger
+import queue
+import threading
+import time
+
+import bittensor.proto.bittensor_pb2 as proto_pb2
+import bittensor.proto.bittensor_pb2_grpc as proto_pb2_grpc
+
+# Seconds a streamed request waits for its response by default.
+TIMEOUT = 10.0
+
+# Streams served at once by this process, each holding a server worker.
+MAX_STREAMS = 16
+
+# Seconds a client refused a stream uses unary calls before retrying.
+STREAM_RETRY = 30.0
+
+_open_streams = 0
+_open_streams_lock = threading.Lock()
+
+# Handler pool shared by the streams served in this process.
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class StreamError(grpc.RpcError):
+    """ Error of a single request on a stream, with the status code and
+    details of a failed unary call.
+    """
+
+    def __init__(self, code, details=''):
+        super().__init__(details)
+        self._code = code
+        self._details = details
+
+    def code(self):
+        return self._code
+
+    def details(self):
+        return self._details
+
+
+def error_response(response_type, request, code, details=''):
+    """ Returns the response_type response failing request on a stream.
+    """
+    return response_type(message_id=request.message_id,
+                         code=code.value[0],
+                         details=details)
+
+
+def _status_code(value):
+    for code in grpc.StatusCode:
+        if code.value[0] == value:
+            return code
+    return grpc.StatusCode.UNKNOWN
+
+
+class _Aborted(Exception):
+    pass
+
+
+class _MessageContext():
+    # Context of one request on a stream or in a batch. Status codes set or
+    # aborted with stay with the request instead of ending the call, and
+    # the time remaining is bounded by the request's timeout; everything
+    # else is the call's context.
+
+    def __init__(self, context, request):
+        self._context = context
+        self.code = None
+        self.details = ''
+        self.deadline = None
+        timeout = getattr(request, 'timeout', 0)
+        if timeout > 0:
+            self.deadline = time.time() + timeout
+
+    def time_remaining(self):
+        remaining = self._context.time_remaining()
+        if self.deadline is None:
+            return remaining
+        own = max(0.0, self.deadline - time.time())
+        return own if remaining is None else min(own, remaining)
+
+    def abort(self, code, details=''):
+        self.code = code
+        self.details = details
+        raise _Aborted(details)
+
+    def set_code(self, code):
+        self.code = code
+
+    def set_details(self, details):
+        self.details = details
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = futures.ThreadPoolExecutor(max_workers=10)
+        return _executor
+
+
+def _handle(handler, request, message_context, response_type):
+    # Runs handler on one request of a stream or batch, answering a failed
+    # request with an error response.
+    if message_context.time_remaining() == 0:
+        return error_response(response_type, request,
+                              grpc.StatusCode.DEADLINE_EXCEEDED,
+                              'Deadline Exceeded')
+    try:
+        response = handler(request, message_context)
+        if message_context.code not in (None, grpc.StatusCode.OK):
+            response = error_response(response_type, request,
+                                      message_context.code,
+                                      message_context.details)
+        response.message_id = request.message_id
+    except Exception as error:
+        if isinstance(error, _Aborted):
+            code = message_context.code
+            details = message_context.details
+        else:
+            code = grpc.StatusCode.UNKNOWN
+            details = 'Exception calling application: {}'.format(error)
+            logger.debug('Handler failed: {}', error)
+        response = error_response(response_type, request, code, details)
+    return response
+
+
+def serve(handler, request_iterator, context, response_type, executor=None):
+    """ Serves a request stream through a unary handler.
+    Args:
+        handler: unary handler, handler(request, context) -> response.
+        request_iterator: incoming requests.
+        context: stream call context.
+        response_type: response proto class, for the responses of failed
+            requests.
+        executor: pool running the handler, defaults to a shared pool.
+    Yields:
+        responses, tagged with the message_id of their request, in
+        completion order.
+    """
+    global _open_streams
+    with _open_streams_lock:
+        refused = _open_streams >= MAX_STREAMS
+        if not refused:
+            _open_streams += 1
+    if refused:
+        context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, 'Too many streams.')
+
+    executor = executor or _get_executor()
+    responses = queue.Queue()
+
+    def _respond(request, message_context):
+        responses.put(_handle(handler, request, message_context,
+                              response_type))
+
+    def _consume():
+        n_requests = 0
+        try:
+            for request in request_iterator:
+                n_requests += 1
+                # The request's deadline runs from its arrival.
+                executor.submit(_respond, request,
+                                _MessageContext(context, request))
+        except Exception as error:
+            # Cancelled or broken stream.
+            logger.debug('Request stream ended: {}', error)
+        responses.put(n_requests)
+
+    try:
+        threading.Thread(target=_consume, daemon=True).start()
+        n_responses = 0
+        n_requests = None
+        while n_requests is None or n_responses < n_requests:
+            item = responses.get()
+            if isinstance(item, int):
+                n_requests = item
+                continue
+            n_responses += 1
+            yield item
+    finally:
+        with _open_streams_lock:
+            _open_streams -= 1
+
+
+class StreamingServicer(proto_pb2_grpc.BittensorServicer):
+    """ Serves SpikeStream and GradeStream through the servicer's unary
+    Spike and Grade handlers. SpikeBatch and GradeBatch call the unary
+    handlers once per request unless overridden with a batched pass.
+    """
+
+    def SpikeStream(self, request_iterator, context):
+        return serve(self.Spike, request_iterator, context,
+                     proto_pb2.SpikeResponse)
+
+    def GradeStream(self, request_iterator, context):
+        return serve(self.Grade, request_iterator, context,
+                     proto_pb2.GradeResponse)
+
+    def SpikeBatch(self, request, context):
+        contexts = [_MessageContext(context, r) for r in request.requests]
+        return proto_pb2.SpikeBatchResponse(responses=[
+            _handle(self.Spike, spike_request, message_context,
+                    proto_pb2.SpikeResponse) for spike_request,
+            message_context in zip(request.requests, contexts)
+        ])
+
+    def GradeBatch(self, request, context):
+        contexts = [_MessageContext(context, r) for r in request.requests]
+        return proto_pb2.GradeBatchResponse(responses=[
+            _handle(self.Grade, grade_request, message_context,
+                    proto_pb2.GradeResponse) for grade_request,
+            message_context in zip(request.requests, contexts)
+        ])
+
+
+class Streams():
+
+    def __init__(self, channel):
+        """ Spike and Grade streams to the peer at the end of channel.
+        Streams are opened on first use and reopened after failing.
+        """
+        self.channel = channel
+        self._stub = proto_pb2_grpc.BittensorStub(channel)
+        self._spike = _Stream(self._stub.SpikeStream, self._stub.Spike)
+        self._grade = _Stream(self._stub.GradeStream, self._stub.Grade)
+
+    def spike(self, request, timeout=TIMEOUT):
+        """ Sends a SpikeRequest, returns a future of its SpikeResponse,
+        failed if it does not arrive within timeout seconds.
+        """
+        return self._spike.call(request, timeout)
+
+    def grade(self, request, timeout=TIMEOUT):
+        """ Sends a GradeRequest, returns a future of its GradeResponse,
+        failed if it does not arrive within timeout seconds.
+        """
+        return self._grade.call(request, timeout)
+
+    def spike_batch(self, requests):
+        """ Sends SpikeRequests in one SpikeBatch call, returns a future of
+        the SpikeBatchResponse.
+        """
+        return self._stub.SpikeBatch.future(
+            proto_pb2.SpikeBatchRequest(requests=requests))
+
+    def grade_batch(self, requests):
+        """ Sends GradeRequests in one GradeBatch call, returns a future of
+        the GradeBatchResponse.
+        """
+        return self._stub.GradeBatch.future(
+            proto_pb2.GradeBatchRequest(requests=requests))
+
+    def close(self):
+        self._spike.close()
+        self._grade.close()
+
+
+class _Stream():
+
+    def __init__(self, stream_method, unary_method):
+        self._stream_method = stream_method
+        self._unary_method = unary_method
+        self._lock = threading.Lock()
+        # Request queue of the open stream, None if closed.
+        self._requests = None
+        # Requests of the open stream awaiting a response,
+        # message_id -> deque of (request, future).
+        self._pending = None
+        # Unary calls are used until this time, forever once the peer is
+        # found not to implement the stream.
+        self._unary_until = 0
+        # Deadlines of pending requests, heap of
+        # (deadline, sequence, pending, message_id, entry).
+        self._deadlines = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition(self._lock)
+        self._expirer = None
+
+    def call(self, request, timeout):
+        request.timeout = timeout
+        with self._lock:
+            if time.time() >= self._unary_until:
+                if self._requests is None:
+                    self._open()
+                future = futures.Future()
+                entry = (request, future)
+                self._pending.setdefault(request.message_id,
+                                         collections.deque()).append(entry)
+                heapq.heappush(self._deadlines,
+                               (time.time() + timeout, next(self._sequence),
+                                self._pending, request.message_id, entry))
+                if self._expirer is None:
+                    self._expirer = threading.Thread(target=self._expire,
+                                                     daemon=True)
+                    self._expirer.start()
+                self._condition.notify()
+                self._requests.put(request)
+                return future
+        return self._unary_method.future(request, timeout=timeout)
+
+    def close(self):
+        with self._lock:
+            if self._requests is not None:
+                self._requests.put(None)
+                self._requests = None
+                self._pending = None
+            self._deadlines = []
+
+    def _expire(self):
+        # Fails requests not answered by their deadline. Exits once no
+        # deadlines are left and is restarted by the next call.
+        while True:
+            expired = []
+            with self._lock:
+                if not self._deadlines:
+                    self._expirer = None
+                    return
+                now = time.time()
+                while self._deadlines and self._deadlines[0][0] <= now:
+                    _, _, pending, message_id, entry = heapq.heappop(
+                        self._deadlines)
+                    entries = pending.get(message_id, ())
+                    for n, pending_entry in enumerate(entries):
+                        if pending_entry is entry:
+                            del entries[n]
+                            if not entries:
+                                del pending[message_id]
+                            expired.append(entry[1])
+                            break
+                if not expired and self._deadlines:
+                    self._condition.wait(self._deadlines[0][0] - now)
+            for future in expired:
+                _resolve(future,
+                         error=StreamError(grpc.StatusCode.DEADLINE_EXCEEDED,
+                                           'Deadline Exceeded'))
+
+    def _open(self):
+        requests = queue.Queue()
+        pending = {}
+        responses = self._stream_method(_iterate(requests))
+        self._requests = requests
+        self._pending = pending
+        threading.Thread(target=self._read,
+                         args=(requests, pending, responses),
+                         daemon=True).start()
+
+    def _read(self, requests, pending, responses):
+        error = grpc.RpcError('Stream closed')
+        try:
+            for response in responses:
+                with self._lock:
+                    entries = pending.get(response.message_id)
+                    if not entries:
+                        continue
+                    _, future = entries.popleft()
+                    if not entries:
+                        del pending[response.message_id]
+                if response.code:
+                    _resolve(future,
+                             error=StreamError(_status_code(response.code),
+                                               response.details))
+                else:
+                    _resolve(future, response=response)
+        except grpc.RpcError as rpc_error:
+            error = rpc_error
+
+        # Fail or, for peers without streams, resend what is in flight.
+        with self._lock:
+            if self._requests is requests:
+                self._requests = None
+                self._pending = None
+            requests.put(None)
+            code = error.code() if isinstance(error, grpc.Call) else None
+            if code == grpc.StatusCode.UNIMPLEMENTED:
+                self._unary_until = float('inf')
+            elif code == grpc.StatusCode.RESOURCE_EXHAUSTED:
+                # The peer serves too many streams.
+                self._unary_until = time.time() + STREAM_RETRY
+            unary = time.time() < self._unary_until
+            in_flight = list(pending.values())
+            pending.clear()
+        for entries in in_flight:
+            for request, future in entries:
+                if unary:
+                    _chain(
+                        self._unary_method.future(request,
+                                                  timeout=request.timeout or
+                                                  None), future)
+                else:
+                    _resolve(future, error=error)
+
+
+def _iterate(requests):
+    while True:
+        request = requests.get()
+        if request is None:
+            return
+        yield request
+
+
+def _chain(call, future):
+    # Completes future with the outcome of a unary call future.
+
+    def _done(call):
+        if call.cancelled():
+            future.cancel()
+            return
+        error = call.exception()
+        if error is None:
+            _resolve(future, response=call.result())
+        else:
+            _resolve(future, error=error)
+
+    call.add_done_callback(_done)
+
+
+def _resolve(future, response=None, error=None):
+    # Completes future unless the caller cancelled it, e.g. a hedged call
+    # that lost.
+    if future.cancelled():
+        return
+    try:
+        if error is None:
+            future.set_result(response)
+        else:
+            future.set_exception(error)
+    except Exception:
+        # Cancelled meanwhile.
+        pass
@@ -0,0 +1,137 @@
+""" Shared word vocabulary for token id Spike payloads.
+
+Neurons training on the same corpus build the same vocabulary, a list of
+words ordered by count with 'UNK' first. A vocabulary is identified by a
+hash of its contents. A child advertises the hash in its SpikeResponses;
+a parent holding the same vocabulary then sends INT32 token ids, tagged
+with the hash, instead of strings. Otherwise strings are sent.
+
+Token ids follow tf.contrib.lookup.index_table_from_tensor with one OOV
+bucket: words missing from the vocabulary map to len(string_map).
+"""
+
+import collections
+import hashlib
+import numpy as np
+import zipfile
+
+from bittensor import serializer
+
+
+class VocabularyError(Exception):
+    """ Raised when token ids reference a vocabulary we do not hold.
+    """
+
+
+class TokenIdError(VocabularyError):
+    """ Raised when token ids fall outside the vocabulary and its OOV id.
+    """
+
+
+def read_corpus(path):
+    """ Reads the words of a zipped text corpus, e.g. text8.zip.
+    """
+    words = []
+    with zipfile.ZipFile(path) as f:
+        for name in f.namelist():
+            words = f.read(name).decode('utf-8').split()
+    return words
+
+
+class Vocabulary():
+
+    def __init__(self, string_map):
+        """ A word vocabulary.
+        Args:
+            string_map: list of words, the position of a word is its token id.
+        """
+        self.string_map = list(string_map)
+        self._ids = {word: i for i, word in enumerate(self.string_map)}
+        self.oov_id = len(self.string_map)
+        self.hash = hashlib.sha256(
+            '\n'.join(self.string_map).encode('utf-8')).digest()
+
+    @classmethod
+    def from_words(cls, words, vocabulary_size):
+        """ Builds the vocabulary of the vocabulary_size - 2 most common
+        words, after 'UNK'.
+        """
+        counts = [('UNK', -1)]
+        counts.extend(
+            collections.Counter(words).most_common(vocabulary_size - 2))
+        return cls([c[0] for c in counts])
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls(f.read().split('\n'))
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.string_map))
+
+    def encode(self, words):
+        """ Maps an array of words to int32 token ids of the same shape.
+        """
+        words = np.asarray(words)
+        ids = [self._ids.get(serializer.to_str(word), self.oov_id) for word in words.flat]
+        return np.array(ids, dtype=np.int32).reshape(words.shape)
+
+    def decode(self, ids):
+        """ Maps an array of token ids to words. OOV ids map to 'UNK'.
+        """
+        ids = np.asarray(ids)
+        words = [
+            self.string_map[i] if 0 <= i < self.oov_id else 'UNK'
+            for i in ids.flat
+        ]
+        return np.array(words, dtype=object).reshape(ids.shape)
+
+    def concatenate(self, tokens):
+        """ Concatenates token arrays along the batch dimension. Words are
+        encoded to token ids if the arrays mix words and ids.
+        """
+        if any(is_ids(t) for t in tokens) and not all(is_ids(t) for t in tokens):
+            tokens = [t if is_ids(t) else self.encode(t) for t in tokens]
+        return np.concatenate([np.asarray(t) for t in tokens])
+
+    def pack(self, tokens, version, peer_hash):
+        """ Encodes words or token ids into SpikeRequest fields. Token ids
+        are sent if the peer advertised this vocabulary, words otherwise.
+        Args:
+            tokens: array of words or token ids.
+            version: protocol version of the request.
+            peer_hash: vocabulary hash advertised by the peer.
+        Returns:
+            fields: dict of SpikeRequest fields.
+        """
+        if serializer.is_tensor(version) and peer_hash == self.hash:
+            ids = tokens if is_ids(tokens) else self.encode(tokens)
+            return dict(vocabulary_hash=self.hash,
+                        **serializer.pack(ids, version))
+        words = self.decode(tokens) if is_ids(tokens) else tokens
+        return serializer.pack(words, version)
+
+    def unpack(self, request):
+        """ Decodes the tokens of a SpikeRequest. Returns int32 token ids if
+        the request carries them, words otherwise.
+        Raises:
+            VocabularyError: the token ids index into another vocabulary.
+            TokenIdError: token ids outside 0 <= id <= oov_id, which would
+                fail the embedding lookup of every message batched with
+                them.
+        """
+        if request.vocabulary_hash and request.vocabulary_hash != self.hash:
+            raise VocabularyError('Unknown vocabulary {}'.format(
+                request.vocabulary_hash.hex()))
+        tokens = serializer.unpack(request)
+        if is_ids(tokens) and tokens.size > 0 and (
+                tokens.min() < 0 or tokens.max() > self.oov_id):
+            raise TokenIdError('Token ids outside [0, {}]'.format(self.oov_id))
+        return tokens
+
+
+def is_ids(tokens):
+    """ True if tokens are token ids rather than words.
+    """
+    return np.asarray(tokens).dtype.kind in ('i', 'u')
@@ -16,6 +16,8 @@ flags.DEFINE_string("logdir", "/tmp/", "logginf directory.")
 flags.DEFINE_integer("k", 3, "Out edge degree.")
 flags.DEFINE_float("alpha", 0.01, "Learning rate.")
 flags.DEFINE_integer("batch_size", 10, "batch_size")
+flags.DEFINE_string("transport_precision", "float32", "Precision of tensors sent to children: float32, float16 or int8.")
+flags.DEFINE_string("peer_precisions", "", "Per child precision overrides, comma separated identity:precision pairs.")
 
 
 class Config():
@@ -30,6 +32,8 @@ class Config():
         self.k = FLAGS.k
         self.alpha = FLAGS.alpha
         self.batch_size = FLAGS.batch_size
+        self.transport_precision = FLAGS.transport_precision
+        self.peer_precisions = FLAGS.peer_precisions
 
     def __repr__(self):
         return self.__str__()
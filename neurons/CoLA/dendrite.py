@@ -1,10 +1,7 @@
 import bittensor
 
-from Crypto.Hash import SHA256
-import grpc
 from loguru import logger
 import numpy as np
-import pickle
 import tensorflow as tf
 
 EMBEDDING_SIZE = 128
@@ -19,26 +16,50 @@ class Dendrite():
     def __init__(self, config, metagraph):
         self.config = config
         self.metagraph = metagraph
+        # Channels are shared through the process channel pool.
+        self.pool = bittensor.channel_pool.get_pool()
         self.channels = [None for _ in range(self.config.k)]
         self.channel_nodes = [None for _ in range(self.config.k)]
+        self.streams = [None for _ in range(self.config.k)]
+        self.negotiator = bittensor.serializer.Negotiator()
+        self.message_ids = bittensor.identifiers.MessageIds(
+            self.config.identity)
+        self.precisions = bittensor.serializer.Precisions(
+            self.config.transport_precision, self.config.peer_precisions)
+        # Seconds the training loop waits on spikes, slower calls count as
+        # failures in peer_stats.
+        self.spike_ttl = 1.0
+        self.peer_stats = bittensor.peer_stats.PeerStats()
+        # Children failing repeatedly are skipped, their spikes count as
+        # zeros, until a periodic probe succeeds.
+        self.breaker = bittensor.circuit_breaker.CircuitBreaker()
         self.select_channels()
 
     def select_channels(self):
+        # Fill free slots and replace failing children with the best ranked
+        # nodes.
         nodes = self.metagraph.nodes
-        for i in range(self.config.k):
-            if self.channels[i] != None:
+        candidates = [
+            identity for identity in nodes if identity != self.config.identity
+        ]
+        channel_ids = [node.identity if node else None for node in self.channel_nodes]
+        selected = self.peer_stats.select(channel_ids, candidates)
+        for i, identity in enumerate(selected):
+            if identity == channel_ids[i]:
                 continue
 
-            selected_node = None
-            for node in nodes.values():
-                if node not in self.channel_nodes and node.identity != self.config.identity:
-                    selected_node = node
-                    break
-
-            if selected_node:
-                address = selected_node.address + ':' + selected_node.port
-                self.channels[i] = grpc.insecure_channel(address)
-                self.channel_nodes[i] = selected_node
+            if self.channels[i] != None:
+                logger.info('Replacing child {} with {}.', channel_ids[i],
+                            identity)
+                old_node = self.channel_nodes[i]
+                self.pool.release(old_node.address + ':' + old_node.port)
+
+            selected_node = nodes[identity]
+            address = selected_node.address + ':' + selected_node.port
+            self.streams[i] = self.pool.streams(address)
+            self.channels[i] = self.streams[i].channel
+            self.channel_nodes[i] = selected_node
+        self.pool.evict_idle()
 
     def grad(self, nounce, spikes, grads):
         # Type checks.
@@ -47,43 +68,36 @@ class Dendrite():
         assert (type(grads) == list)
         assert (type(grads[0]) == type(np.array([])))
 
-        # Encode nounce and source.
-        nounce_bytes = bytes(nounce, 'utf-8')
-        source_bytes = bytes(self.config.identity, 'utf-8')
-        spikes_bytes = pickle.dumps(spikes, protocol=0)
-
-        # Create message hash.
-        hash = SHA256.new()
-        hash.update(nounce_bytes)
-        hash.update(source_bytes)
-        hash.update(spikes_bytes)
-        message_hash = hash.digest()
+        # Create message id, the same for the spike and grad of a nounce.
+        message_hash = self.message_ids.of(nounce)
 
         #logger.info('nounce {} hash {}', nounce, message_hash)
 
         # Query downstream.
         for (i, channel) in enumerate(self.channels):
-            # Check channel exists.
+            # Check channel exists and was spiked.
             if not channel:
                 continue
+            peer_id = self.channel_nodes[i].identity
+            if self.breaker.state(peer_id) == bittensor.circuit_breaker.OPEN:
+                continue
 
             # Encode gradient for this channel.
-            grad_bytes = pickle.dumps(grads[i], protocol=0)
+            version = self.negotiator.version(peer_id)
+            precision = self.precisions.precision(peer_id)
 
             # Create request proto.
             request = bittensor.proto.bittensor_pb2.GradeRequest(
-                version=1.0,
+                version=version,
                 source_id=self.config.identity,
                 parent_id=self.config.identity,
                 message_id=message_hash,
-                payload=grad_bytes)
+                **bittensor.serializer.pack(grads[i], version, precision))
 
             try:
-                # Build stub.
-                stub = bittensor.proto.bittensor_pb2_grpc.BittensorStub(channel)
-
-                # Send non-waiting Grade request.
-                future = stub.Grade.future(request)
+                # Send non-waiting Grade request on the child's stream.
+                future = self.streams[i].grade(request)
+                self.peer_stats.track(peer_id, future, request.ByteSize())
                 future.add_done_callback(_delete_callback)
 
             except:
@@ -96,44 +110,47 @@ class Dendrite():
         assert (type(nounce) == str)
         assert (type(spikes) == type(np.array([])))
 
-        # Encode nounce and source.
-        nounce_bytes = bytes(nounce, 'utf-8')
-        source_bytes = bytes(self.config.identity, 'utf-8')
-        payload_bytes = pickle.dumps(spikes, protocol=0)
-
-        # Create message hash.
-        hash = SHA256.new()
-        hash.update(nounce_bytes)
-        hash.update(source_bytes)
-        hash.update(payload_bytes)
-        message_hash = hash.digest()
+        # Create message id, the same for the spike and grad of a nounce.
+        message_hash = self.message_ids.of(nounce)
 
         #logger.info('nounce {} hash {}', nounce, message_hash)
 
-        # Build request proto.
-        request = bittensor.proto.bittensor_pb2.SpikeRequest(
-            version=1.0,
-            source_id=self.config.identity,
-            parent_id=self.config.identity,
-            message_id=message_hash,
-            payload=payload_bytes)
-
         # Query downstream.
         futures = []
-        for channel in self.channels:
-            # Check channel exists.
+        requests = {}
+        for (i, channel) in enumerate(self.channels):
+            # Check channel exists and its breaker lets the call through.
             if channel == None:
                 futures.append(None)
                 continue
+            peer_id = self.channel_nodes[i].identity
+            if not self.breaker.allow(peer_id):
+                futures.append(None)
+                continue
 
-            try:
-                # Build channel
-                # TODO(const): having prebuilt stubs would be better.
-                stub = bittensor.proto.bittensor_pb2_grpc.BittensorStub(channel)
+            # Build request proto, once per protocol version and precision.
+            key = (self.negotiator.version(peer_id),
+                   self.precisions.precision(peer_id))
+            if key not in requests:
+                version, precision = key
+                requests[key] = bittensor.proto.bittensor_pb2.SpikeRequest(
+                    version=version,
+                    source_id=self.config.identity,
+                    parent_id=self.config.identity,
+                    message_id=message_hash,
+                    precision=precision,
+                    **bittensor.serializer.pack(spikes, version))
 
-                # Send non-waiting spike request.
-                futures.append(stub.Spike.future(request))
+            try:
+                # Send non-waiting spike request on the child's stream.
+                future = self.streams[i].spike(requests[key], self.spike_ttl)
+                self.peer_stats.track(peer_id, future,
+                                      requests[key].ByteSize(), self.spike_ttl)
+                self.breaker.track(peer_id, future, self.spike_ttl)
+                futures.append(
+                    self.negotiator.track(peer_id, future,
+                                          requests[key].version))
             except Exception as e:
-                pass
+                futures.append(None)
 
         return futures
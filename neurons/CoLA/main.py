@@ -8,7 +8,6 @@ from itertools import cycle
 from loguru import logger
 import numpy as np
 import os
-import pickle
 import queue
 import time
 import tensorflow as tf
@@ -188,47 +187,23 @@ class Neuron():
                         self._labels: labels
                     }
 
-                    # Fill feeds from passed call futures. Iterates through
-                    # each channel checking done complete on futures. If they
-                    # are filled we add them to the feed dict, if they are none
-                    # we fill the feed dict with zeros.
-                    ttl = 1.0
-                    start = time.time()
-                    is_done = [False for _ in futures]
-                    is_filled = [False for _ in futures]
-                    while True:
-                        for i, channel in enumerate(self._inputs):
-                            # Init as zeros.
-                            feeds[channel] = np.zeros(
-                                (self._batch_size, EMBEDDING_SIZE))
-
-                            # Check already done.
-                            if is_done[i]:
-                                continue
-
-                            # Check nil.
-                            elif futures[i] == None:
-                                is_done[i] = True
-
-                            # Check result.
-                            elif futures[i].done():
-                                is_done[i] = True
-                                try:
-                                    response = futures[i].result()
-                                    dspikes = pickle.loads(response.payload)
-                                    feeds[channel] = dspikes.reshape(
-                                        self._batch_size, EMBEDDING_SIZE)
-                                    is_filled[i] = True
-                                except:
-                                    pass
-
-                            # Check ttl.
-                            elif (time.time() - start) > ttl:
-                                is_done[i] = True
-
-                        # Break fill when all are done or timedout.
-                        if all(is_done):
-                            break
+                    # Fill feeds from passed call futures. Waits up to ttl
+                    # seconds on the futures. Responses are added to the feed
+                    # dict, missing or failed channels are fed zeros.
+                    ttl = self._dendrite.spike_ttl
+                    results = bittensor.collector.collect(futures, ttl)
+                    for i, channel in enumerate(self._inputs):
+                        feeds[channel] = np.zeros(
+                            (self._batch_size, EMBEDDING_SIZE),
+                            dtype=np.float32)
+                        if results[i] is None:
+                            continue
+                        try:
+                            feeds[channel] = bittensor.serializer.unpack(
+                                results[i],
+                                shape=(self._batch_size, EMBEDDING_SIZE))
+                        except:
+                            pass
 
                     # Build fetches.
                     fetches = {
@@ -341,6 +316,9 @@ def main():
         logger.info('Begin wait on main...')
         while True:
             logger.debug('heartbeat')
+            logger.info('Peers: {}', dendrite.peer_stats.summary())
+            logger.info('Breakers: {}', dendrite.breaker.stats())
+            dendrite.select_channels()
             time.sleep(100)
 
     except KeyboardInterrupt:
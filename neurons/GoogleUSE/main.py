@@ -6,7 +6,6 @@ from concurrent import futures
 import grpc
 from loguru import logger
 import numpy
-import pickle
 
 import time
 import tensorflow as tf
@@ -16,7 +15,7 @@ import tf_sentencepiece
 EMBEDDING_SIZE = 128
 
 
-class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
+class Neuron(bittensor.streams.StreamingServicer):
 
     def __init__(self, config):
         self.config = config
@@ -49,9 +48,18 @@ class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
         self.session = tf.Session(graph=self.graph)
         self.session.run(init_op)
 
+        # Embedding passes of incoming Spikes. This neuron has no metagraph,
+        # so parents are served in arrival order and the latest are shed.
+        self.scheduler = bittensor.scheduler.Scheduler(self.config.spike_workers,
+                                                       self.config.spike_queue)
+
         # Init server.
         self.server_address = self.config.bind_address + ":" + self.config.port
-        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+        # Each open SpikeStream or GradeStream holds a worker, up to
+        # bittensor.streams.MAX_STREAMS of them.
+        self.server = grpc.server(
+            futures.ThreadPoolExecutor(max_workers=50),
+            options=bittensor.channel_pool.SERVER_OPTIONS)
         bittensor.proto.bittensor_pb2_grpc.add_BittensorServicer_to_server(
             self, self.server)
         self.server.add_insecure_port(self.server_address)
@@ -68,21 +76,28 @@ class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
         # Unpack message.
         parent_id = request.parent_id
         message_id = request.message_id
-        inputs = pickle.loads(request.payload)
+        version = bittensor.serializer.negotiate(request.version)
+        inputs = bittensor.serializer.unpack(request)
         logger.info('. {}', parent_id)
 
         # Inference through Google USE.
         numpy_inputs = inputs.flatten()  # [batch_size, var length]
-        represenations = self.session.run(self.output,
-                                          {self.text_placeholder: numpy_inputs})
-        represenations = represenations.reshape(EMBEDDING_SIZE, -1)
+        try:
+            represenations = self.scheduler.run(
+                [parent_id], self.session.run, self.output,
+                {self.text_placeholder: numpy_inputs})
+        except bittensor.scheduler.Overloaded:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                          'Spike queue full.')
+        represenations = represenations.reshape(-1, EMBEDDING_SIZE)
 
         # Pack response.
-        response_payload = pickle.dumps(represenations, protocol=0)
         response = bittensor.proto.bittensor_pb2.SpikeResponse(
+            version=version,
             child_id=self.config.identity,
             message_id=message_id,
-            payload=response_payload)
+            **bittensor.serializer.pack(represenations, version,
+                                        request.precision))
 
         return response
 
@@ -103,6 +103,129 @@ if __name__ == '__main__':
         type=str,
         help="logging output directory. Default logdir=/tmp/")
 
+    # Transport parameters.
+    parser.add_argument(
+        '--transport_precision',
+        default='float32',
+        type=str,
+        help='Precision of tensors sent to children, one of float32, float16 or int8. Default transport_precision=float32')
+    parser.add_argument(
+        '--peer_precisions',
+        default='',
+        type=str,
+        help='Per child precision overrides as comma separated identity:precision pairs. Default peer_precisions=""')
+    parser.add_argument(
+        '--grade_topk',
+        default=0,
+        type=int,
+        help='Gradient entries sent per row to children, 0 sends dense gradients. Default grade_topk=0')
+    parser.add_argument(
+        '--spike_timeout',
+        default=1.0,
+        type=float,
+        help='Seconds to wait on children spikes, late children count as zeros. Default spike_timeout=1.0')
+    parser.add_argument(
+        '--hedge_budget',
+        default=0.0,
+        type=float,
+        help='Spikes resent to a standby node when a child is slower than its p95 latency, as a fraction of all spikes. 0 disables hedging. Default hedge_budget=0.0')
+    parser.add_argument(
+        '--breaker_threshold',
+        default=5,
+        type=int,
+        help='Consecutive failed calls after which a child is skipped. Default breaker_threshold=5')
+    parser.add_argument(
+        '--breaker_reset',
+        default=10.0,
+        type=float,
+        help='Seconds a failing child is skipped before it is probed again. Default breaker_reset=10.0')
+    parser.add_argument(
+        '--admission_rate',
+        default=50.0,
+        type=float,
+        help='Spike and Grade calls per second allowed per parent, 0 disables rate limiting. Default admission_rate=50.0')
+    parser.add_argument(
+        '--admission_burst',
+        default=100,
+        type=int,
+        help='Spike and Grade calls a parent may make at once. Default admission_burst=100')
+    parser.add_argument(
+        '--max_inflight',
+        default=8,
+        type=int,
+        help='Spike and Grade calls handled at once, further calls are rejected. 0 disables the cap. Default max_inflight=8')
+    parser.add_argument(
+        '--stake_weighted',
+        default=False,
+        type=bool,
+        help='Scale parent rate limits by their stake over the mean stake. Default stake_weighted=False')
+    parser.add_argument(
+        '--spike_workers',
+        default=2,
+        type=int,
+        help='Incoming Spikes run through the nucleus at once. Default spike_workers=2')
+    parser.add_argument(
+        '--spike_queue',
+        default=32,
+        type=int,
+        help='Incoming Spikes waiting before the lowest staked parent is shed. Default spike_queue=32')
+    parser.add_argument(
+        '--spike_window',
+        default=0.005,
+        type=float,
+        help='Seconds concurrent incoming Spikes are gathered into one nucleus pass. Default spike_window=0.005')
+    parser.add_argument(
+        '--spike_max_rows',
+        default=512,
+        type=int,
+        help='Rows after which gathered Spikes run without waiting out the window. Default spike_max_rows=512')
+    parser.add_argument(
+        '--grade_queue',
+        default=1024,
+        type=int,
+        help='Upstream grads waiting to be applied before further grads are refused. Default grade_queue=1024')
+    parser.add_argument(
+        '--grade_batch',
+        default=32,
+        type=int,
+        help='Upstream grads applied in one optimizer step. Default grade_batch=32')
+    parser.add_argument(
+        '--grade_window',
+        default=0.05,
+        type=float,
+        help='Seconds upstream grads are gathered before an optimizer step. Default grade_window=0.05')
+    parser.add_argument(
+        '--grade_staleness',
+        default=10.0,
+        type=float,
+        help='Upstream grads of spikes older than this many seconds are dropped. Default grade_staleness=10.0')
+    parser.add_argument(
+        '--grade_reduce',
+        default='sum',
+        type=str,
+        choices=['sum', 'mean'],
+        help='Sum upstream grads over a step, or average them over its messages. Default grade_reduce=sum')
+    parser.add_argument(
+        '--memory_ttl',
+        default=10.0,
+        type=float,
+        help='Seconds answered spikes are remembered waiting for their grade. Default memory_ttl=10.0')
+    parser.add_argument(
+        '--memory_capacity',
+        default=10000,
+        type=int,
+        help='Answered spikes remembered before the oldest are evicted. Default memory_capacity=10000')
+    parser.add_argument(
+        '--coalesce_ttl',
+        default=1.0,
+        type=float,
+        help='Seconds the spikes of an answered message are served to copies of its message_id. Default coalesce_ttl=1.0')
+    parser.add_argument(
+        '--coalesce_timeout',
+        default=0.5,
+        type=float,
+        help='Seconds a copy of a message_id in flight waits on its spikes before getting zeros. Default coalesce_timeout=0.5')
+
     # Word embedding parameters.
     parser.add_argument(
         '--corpus_path',
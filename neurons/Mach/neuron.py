@@ -1,16 +1,13 @@
 import bittensor
 import visualizer
 
-from Crypto.Hash import SHA256
 from concurrent import futures
 import grpc
 from loguru import logger
 import numpy as np
 import math
 import pickle
-import random
 import time
-from threading import Lock
 import threading
 import queue
 
@@ -19,54 +16,33 @@ from io import StringIO
 import matplotlib.pyplot as plt
 
 class Buffer:
+    """ Record of an answered message. Only its upstream spikes are kept:
+    Spikes are answered with all zero downstream spikes, which are rebuilt
+    when its Grade arrives.
+    """
+
+    __slots__ = ('source_id', 'parent_id', 'message_id', 'create_time',
+                 'uspikes', 'rows')
 
     def __init__(self,
                  source_id=None,
                  parent_id=None,
                  message_id=None,
-                 create_time=None,
-                 lspikes=None,
-                 uspikes=None,
-                 dspikes=None,
-                 lgrads=None):
+                 create_time=None):
 
         self.source_id = source_id
         self.parent_id = parent_id
         self.message_id = message_id
         self.create_time = create_time
-        self.lspikes = lspikes
+        self.uspikes = None
+        # Set once the message is spiked.
+        self.rows = None
+
+    def keep(self, uspikes):
         self.uspikes = uspikes
-        self.dspikes = dspikes
-        self.lgrads = lgrads
-
-    def set(self,
-            source_id=None,
-            parent_id=None,
-            message_id=None,
-            create_time=None,
-            lspikes=None,
-            uspikes=None,
-            dspikes=None,
-            lgrads=None):
-
-        if not self.source_id:
-            self.source_id = source_id
-        if not self.parent_id:
-            self.parent_id = parent_id
-        if not self.message_id:
-            self.message_id = message_id
-        if not self.create_time:
-            self.create_time = create_time
-        if not self.lspikes:
-            self.lspikes = lspikes
-        if not self.uspikes:
-            self.uspikes = uspikes
-        if not self.dspikes:
-            self.dspikes = dspikes
-        if not self.lgrads:
-            self.lgrads = lgrads
-
-class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
+        self.rows = len(uspikes)
+
+class Neuron(bittensor.streams.StreamingServicer):
 
     def __init__(self, config, nucleus, metagraph):
         self.config = config
@@ -77,13 +53,55 @@ class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
             'gs': None,
             'step': None,
             'mem': None,
+            'memory': None,
             'loss': None,
             'metrics': None,
-            'scores': None
+            'scores': None,
+            'peers': None,
+            'hedges': None,
+            'breakers': None,
+            'admission': None,
+            'scheduler': None,
+            'batcher': None,
+            'coalescer': None,
+            'grades': None
         }
 
-        self.lock = Lock()
-        self.memory = {}
+        # Buffers of the messages we answered, until their Grade arrives.
+        self.memory = bittensor.memory.MessageStore(self.config.memory_ttl,
+                                                    self.config.memory_capacity)
+
+        # Upstream grads waiting for the grade worker, which applies them in
+        # batches.
+        self.grade_queue = queue.Queue(maxsize=self.config.grade_queue)
+        self._grade_stats = {'applied': 0, 'steps': 0, 'stale': 0, 'dropped': 0}
+
+        # Ids of the messages we source.
+        self.message_ids = bittensor.identifiers.MessageIds(
+            self.config.identity)
+
+        # Protocol version spoken by each child.
+        self.negotiator = bittensor.serializer.Negotiator()
+
+        # Transport precision used with each child.
+        self.precisions = bittensor.serializer.Precisions(
+            self.config.transport_precision, self.config.peer_precisions)
+
+        # Top-k gradient sparsification with per child error feedback.
+        self.error_feedback = bittensor.serializer.ErrorFeedback(
+            self.config.grade_topk)
+
+        # Success rate, latency and bytes of calls to each child.
+        self.peer_stats = bittensor.peer_stats.PeerStats()
+
+        # Children failing repeatedly are skipped, their spikes count as
+        # zeros, until a periodic probe succeeds.
+        self.breaker = bittensor.circuit_breaker.CircuitBreaker(
+            self.config.breaker_threshold, self.config.breaker_reset)
+
+        # Spikes to children slower than their p95 are resent to standby
+        # nodes, whose channels are held until the resent spike settles.
+        self.hedger = bittensor.hedging.Hedger(self.config.hedge_budget)
 
         # Metrics
         self._metrics = {}
@@ -91,178 +109,388 @@ class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
         # child scores.
         self._scores = [0 for _ in range(self.config.n_children + 1)]
 
+        # Per parent rate limits and a cap on calls handled at once, so
+        # parents cannot starve training of the nucleus.
+        self.admission = bittensor.admission.Admission(
+            self.config.admission_rate, self.config.admission_burst,
+            self.config.max_inflight,
+            bittensor.admission.stake_weights(self.metagraph)
+            if self.config.stake_weighted else None)
+
+        # Nucleus passes of incoming Spikes, highest staked parents first.
+        self.scheduler = bittensor.scheduler.Scheduler(
+            self.config.spike_workers, self.config.spike_queue,
+            bittensor.scheduler.stake_priority(self.metagraph))
+
+        # Concurrent Spikes arriving within spike_window seconds share one
+        # nucleus pass.
+        self.batcher = bittensor.batcher.Batcher(self._spike_batch,
+                                                 self.config.spike_window,
+                                                 self.config.spike_max_rows)
+
+        # Copies of a message_id share the spikes of the first.
+        self.coalescer = bittensor.coalescer.Coalescer(
+            self.config.coalesce_ttl, self.config.coalesce_timeout)
+
         # Init server.
         self.server_address = self.config.bind_address + ":" + self.config.port
-        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+        # Each open SpikeStream or GradeStream holds a worker, up to
+        # bittensor.streams.MAX_STREAMS of them.
+        self.server = grpc.server(
+            futures.ThreadPoolExecutor(max_workers=50),
+            interceptors=[self.admission],
+            options=bittensor.channel_pool.SERVER_OPTIONS)
         bittensor.proto.bittensor_pb2_grpc.add_BittensorServicer_to_server(
             self, self.server)
         visualizer.proto.visualizer_pb2_grpc.add_VisualizerServicer_to_server(self, self.server)
         self.server.add_insecure_port(self.server_address)
 
+        # Channels are shared through the process channel pool.
+        self.pool = bittensor.channel_pool.get_pool()
         self.channels = [None for _ in range(self.config.n_children)]
         self.channel_ids = [None for _ in range(self.config.n_children)]
+        self.channel_addresses = [None for _ in range(self.config.n_children)]
+        self.streams = [None for _ in range(self.config.n_children)]
         self.connect()
 
     def connect(self):
-        for i in range(self.config.n_children):
-            if self.channels[i] == None:
-                self._set_channel(i)
-
-    def _set_channel(self, i):
-        for node in self.metagraph.nodes.values():
-            if node.identity in self.channel_ids:
-                continue
-            if node.identity == self.config.identity:
-                continue
-            else:
-                address = node.address + ':' + node.port
-                self.channels[i] = grpc.insecure_channel(address)
-                self.channel_ids[i] = node.identity
-                break
+        # Fill free slots and replace failing children with the best ranked
+        # nodes.
+        candidates = [
+            identity for identity in self.metagraph.nodes
+            if identity != self.config.identity
+        ]
+        selected = self.peer_stats.select(self.channel_ids, candidates)
+        for i, identity in enumerate(selected):
+            if identity != self.channel_ids[i]:
+                self._set_channel(i, self.metagraph.nodes[identity])
+        self.pool.evict_idle()
+
+    def _set_channel(self, i, node):
+        if self.channels[i] != None:
+            logger.info('Replacing child {} with {}.', self.channel_ids[i],
+                        node.identity)
+            self.pool.release(self.channel_addresses[i])
+            self.error_feedback.reset(self.channel_ids[i])
+            self._scores[i] = 0
+        address = node.address + ':' + node.port
+        self.streams[i] = self.pool.streams(address)
+        self.channels[i] = self.streams[i].channel
+        self.channel_ids[i] = node.identity
+        self.channel_addresses[i] = address
 
     def __del__(self):
         self.server.stop(0)
         self._stop_training()
+        self._stop_grading()
         logger.debug('Stopped Serving Neuron at: {}.', self.server_address)
 
     def serve(self):
         self.server.start()
         self._start_training()
+        self._start_grading()
         logger.debug('Started Serving Neuron at: {}.', self.server_address)
 
-    def _spike_future(self, channel, source_id, message_id, payload):
+    def _spike_future(self, i, source_id, message_id, spikes, packed, standby):
+        channel = self.channels[i]
         if channel == None:
             return None
+        child_id = self.channel_ids[i]
+        if not self.breaker.allow(child_id):
+            return None
+        future = self._send_spike(child_id, self.streams[i], source_id,
+                                  message_id, spikes, packed)
+        if future is None or self.hedger.budget <= 0:
+            return future
+        if self.peer_stats.calls(child_id) < self.peer_stats.min_calls:
+            return future
+
+        def _backup():
+            # Resend to the best ranked node that is not a child.
+            candidates = [
+                identity for identity in self.metagraph.nodes
+                if identity != self.config.identity and
+                identity not in self.channel_ids
+            ]
+            standby_id = self.peer_stats.select([None], candidates)[0]
+            if standby_id is None or not self.breaker.allow(standby_id):
+                return None
+            node = self.metagraph.nodes[standby_id]
+            address = node.address + ':' + node.port
+            streams = self.pool.streams(address)
+            standby[i] = (standby_id, streams)
+            backup = self._send_spike(standby_id, streams, source_id,
+                                      message_id, spikes, packed)
+            if backup is None:
+                self.pool.release(address)
+            else:
+                backup.add_done_callback(
+                    lambda _: self.pool.release(address))
+            return backup
+
+        return self.hedger.hedge(future, self.peer_stats.latency(child_id, 95),
+                                 _backup)
+
+    def _send_spike(self, peer_id, streams, source_id, message_id, spikes,
+                    packed):
         try:
-            # Build Stub and request proto.
-            stub = bittensor.proto.bittensor_pb2_grpc.BittensorStub(channel)
+            # Encode spikes once per protocol version and peer vocabulary.
+            version = self.negotiator.version(peer_id)
+            vocabulary_hash = self.negotiator.vocabulary_hash(peer_id)
+            key = (version, vocabulary_hash)
+            if key not in packed:
+                packed[key] = self.nucleus.vocabulary.pack(
+                    spikes, version, vocabulary_hash)
 
             # Create spike request proto.
             request = bittensor.proto.bittensor_pb2.SpikeRequest(
-                version=1.0,
+                version=version,
                 source_id=source_id,
                 parent_id=self.config.identity,
                 message_id=message_id,
-                payload=payload)
-
-            # Send TCP spike request with futures callback.
-            return stub.Spike.future(request)
+                precision=self.precisions.precision(peer_id),
+                **packed[key])
+
+            # Send spike request on the peer's stream with futures callback.
+            future = streams.spike(request, self.config.spike_timeout)
+            self.peer_stats.track(peer_id, future, request.ByteSize(),
+                                  self.config.spike_timeout)
+            self.breaker.track(peer_id, future, self.config.spike_timeout)
+            return self.negotiator.track(peer_id, future, version)
         except:
             return None
 
     def _fill_dspikes(self, dspikes, futures):
-        while True:
-            remaining_futures = sum(1 for _ in filter(None.__ne__, self.channel_ids))
-            for i in range(self.config.n_children):
-                if futures[i] != None:
-                    if futures[i].done():
-                        remaining_futures -= 1
-                        try:
-                            result = futures[i].result()
-                            next_dspikes = pickle.loads(result.payload).reshape(
-                                -1, 128)
-                            dspikes[i] = next_dspikes
-                        except:
-                            pass
-            if remaining_futures == 0:
-                break
+        # Children missing the deadline keep their zeros.
+        results = bittensor.collector.collect(futures,
+                                              self.config.spike_timeout)
+        for i, result in enumerate(results):
+            if result is None:
+                continue
+            try:
+                dspikes[i] = bittensor.serializer.unpack(
+                    result, shape=(None, self.config.n_embedding))
+            except:
+                pass
         return dspikes
 
 
     def Spike(self, request, context):
-        # Unpack message.
-        source_id = request.source_id
-        parent_id = request.parent_id
-        message_id = request.message_id
-        uspikes = pickle.loads(request.payload)
-        if parent_id not in self._metrics:
-            self._metrics[parent_id] = 0
-        self._metrics[parent_id] += 1
-
-        # 1. Check and build message buffer. On recursion with loops we respond
-        # with a null message if the message_id has been seen already.
-        self.lock.acquire()
-        try:
-            # Check for duplicates.
-            if message_id in self.memory:
-                # Return null repsonse.
-                zeros_payload = pickle.dumps(np.zeros((len(uspikes), self.config.n_embedding)), protocol=0)
-                response = bittensor.proto.bittensor_pb2.SpikeResponse(
-                    version=1.0,
-                    source_id=source_id,
-                    child_id=self.config.identity,
-                    message_id=message_id,
-                    payload=zeros_payload)
-                return response
-
-            # Build new message buffer.
-            msg_buffer = Buffer(source_id=source_id,
-                                parent_id=parent_id,
-                                message_id=message_id,
+        return self._spike([request], context)[0]
+
+    def SpikeBatch(self, request, context):
+        responses = self._spike(list(request.requests), context)
+        return bittensor.proto.bittensor_pb2.SpikeBatchResponse(
+            responses=responses)
+
+    def _spike(self, requests, context):
+        # Answers a batch of SpikeRequests with a single nucleus pass.
+        # 1. Unpack messages.
+        uspikes = []
+        for request in requests:
+            try:
+                uspikes.append(self.nucleus.vocabulary.unpack(request))
+            except bittensor.vocabulary.TokenIdError as error:
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(error))
+            except bittensor.vocabulary.VocabularyError as error:
+                context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(error))
+            parent_id = request.parent_id
+            if parent_id not in self._metrics:
+                self._metrics[parent_id] = 0
+            self._metrics[parent_id] += 1
+
+        # 2. Check and build message buffers. Copies of a message_id in
+        # flight or answered within coalesce_ttl share its spikes, older
+        # copies get a null message.
+        fresh = []
+        flights = {}
+        buffers = {}
+        for i, request in enumerate(requests):
+            flight = self.coalescer.lead(request.message_id)
+            if flight is not None:
+                flights[i] = flight
+                continue
+            buffers[i] = Buffer(source_id=request.source_id,
+                                parent_id=request.parent_id,
+                                message_id=request.message_id,
                                 create_time=time.time())
-
-            self.memory[message_id] = msg_buffer
-
-        finally:
-            self.lock.release()
-
-        # 4. Fill downstream spikes. (all zeros)
-        dspikes = [np.zeros((len(uspikes), 128)) for _ in range(self.config.n_children)]
-
-        # 5. Inference local neuron.
-        lspikes = self.nucleus.spike(uspikes, dspikes, use_synthetic=True)
-
-        # 6. Sink output to memory.
-        self.lock.acquire()
-        try:
-            self.memory[message_id].set(uspikes=uspikes,
-                                        lspikes=lspikes,
-                                        dspikes=dspikes)
-        finally:
-            self.lock.release()
-
-        # 7. Build response.
-        payload = pickle.dumps(lspikes, protocol=0)
-        response = bittensor.proto.bittensor_pb2.SpikeResponse(
-            version=1.0,
-            source_id=source_id,
-            child_id=self.config.identity,
-            message_id=message_id,
-            payload=payload)
-
-        # Return.
-        return response
+            if self.memory.add(request.message_id, buffers[i]):
+                fresh.append(i)
+            else:
+                self.coalescer.finish(request.message_id, None)
+
+        # 3. Inference local neuron over all new messages, batched with those
+        # of concurrent calls.
+        lspikes = [
+            np.zeros((len(x), self.config.n_embedding), dtype=np.float32)
+            for x in uspikes
+        ]
+        if fresh:
+            try:
+                fresh_lspikes = self.batcher.submit(
+                    ([requests[i].parent_id for i in fresh],
+                     [uspikes[i] for i in fresh]),
+                    sum(len(uspikes[i]) for i in fresh))
+            except Exception as error:
+                for i in fresh:
+                    self.memory.remove(requests[i].message_id)
+                    self.coalescer.finish(requests[i].message_id, None)
+                if isinstance(error, bittensor.scheduler.Overloaded):
+                    context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                                  'Spike queue full.')
+                raise
+
+            # 4. Sink each message to memory and share it with its copies.
+            for n, i in enumerate(fresh):
+                lspikes[i] = fresh_lspikes[n]
+                buffers[i].keep(uspikes[i])
+                self.coalescer.finish(requests[i].message_id, lspikes[i])
+
+        # 5. Wait on the messages copied. Copies whose flight failed or timed
+        # out keep their zeros.
+        for i, flight in flights.items():
+            result = self.coalescer.wait(flight, context.time_remaining())
+            if result is not None:
+                lspikes[i] = result
+
+        # 6. Build responses.
+        responses = []
+        for request, x in zip(requests, lspikes):
+            version = bittensor.serializer.negotiate(request.version)
+            responses.append(
+                bittensor.proto.bittensor_pb2.SpikeResponse(
+                    version=version,
+                    source_id=request.source_id,
+                    child_id=self.config.identity,
+                    message_id=request.message_id,
+                    vocabulary_hash=self.nucleus.vocabulary.hash,
+                    **bittensor.serializer.pack(x, version, request.precision)))
+        return responses
+
+    def _spike_batch(self, items):
+        # Runs the items gathered by the batcher, each the parent ids and
+        # token arrays of the new messages of one call, through a single
+        # nucleus pass with all zero downstream spikes, when the scheduler
+        # gives the parents their turn. Returns the local spikes of each
+        # message, split back by item.
+        parent_ids = [p for ids, _ in items for p in ids]
+        tokens = [x for _, xs in items for x in xs]
+        batch = self.nucleus.vocabulary.concatenate(tokens)
+        dspikes = self._zero_dspikes(len(batch))
+        batch_lspikes = self.scheduler.run(parent_ids, self.nucleus.spike,
+                                           batch, dspikes, True)
+        results = []
+        start = 0
+        for _, xs in items:
+            item_lspikes = []
+            for x in xs:
+                end = start + len(x)
+                item_lspikes.append(batch_lspikes[start:end])
+                start = end
+            results.append(item_lspikes)
+        return results
+
+    def _zero_dspikes(self, rows):
+        # Downstream spikes fed to the nucleus when answering Spikes.
+        return [
+            np.zeros((rows, self.config.n_embedding), dtype=np.float32)
+            for _ in range(self.config.n_children)
+        ]
 
     def Grade(self, request, context):
-        # Unpack request.
-        source_id = request.source_id
-        parent_id = request.parent_id
-        message_id = request.message_id
-        ugrades = pickle.loads(request.payload)
-
-        # Check for lost or badly routed grades.
-        if message_id not in self.memory:
-            return bittensor.proto.bittensor_pb2.GradeResponse(accept=True)
-
-        # Get local spikes.
-        mem_buffer = self.memory[message_id]
-
-        # Get local spikes.
-        lspikes = mem_buffer.lspikes
-
-        # Get downstream spikes.
-        dspikes = mem_buffer.dspikes
-
-        # Get upstream spikes
-        uspikes = mem_buffer.uspikes
-
-        # Get downstream grads and local grads.
-        dgrades = self.nucleus.grade(ugrades, uspikes, dspikes)
-
-        # delete memory:
-        del self.memory[message_id]
+        accepted = self._grade([request])
+        return bittensor.proto.bittensor_pb2.GradeResponse(accept=accepted[0])
+
+    def GradeBatch(self, request, context):
+        accepted = self._grade(list(request.requests))
+        return bittensor.proto.bittensor_pb2.GradeBatchResponse(responses=[
+            bittensor.proto.bittensor_pb2.GradeResponse(
+                accept=accept, message_id=grade_request.message_id)
+            for grade_request, accept in zip(request.requests, accepted)
+        ])
+
+    def _grade(self, requests):
+        # Queues the upstream grads of a batch of GradeRequests for the grade
+        # worker. Returns whether each request was accepted.
+        accepted = [False for _ in requests]
+        for i, request in enumerate(requests):
+            # Decode before popping so a malformed grade leaves the message
+            # buffer for a well formed one.
+            try:
+                ugrades = bittensor.serializer.unpack(
+                    request, shape=(None, self.config.n_embedding))
+            except bittensor.serializer.SerializationError as error:
+                logger.debug('Malformed grade from {}: {}', request.parent_id,
+                             error)
+                continue
+            # Check for lost, badly routed or repeated grades.
+            mem_buffer = self.memory.pop(request.message_id)
+            if mem_buffer is None or mem_buffer.rows is None:
+                continue
+            try:
+                self.grade_queue.put_nowait((ugrades, mem_buffer))
+                accepted[i] = True
+            except queue.Full:
+                self._grade_stats['dropped'] += 1
+        return accepted
+
+    def _start_grading(self):
+        self._is_grading = True
+        self._grade_thread = threading.Thread(target=self._apply_grades,
+                                              daemon=True)
+        self._grade_thread.start()
+
+    def _stop_grading(self):
+        self._is_grading = False
+        self._grade_thread.join()
+
+    def _apply_grades(self):
+        # Applies queued upstream grads in batches of up to grade_batch
+        # messages gathered over grade_window seconds, with one optimizer
+        # step per batch. Grads of spikes older than grade_staleness seconds
+        # are dropped.
+        while self._is_grading:
+            try:
+                items = [self.grade_queue.get(timeout=1.0)]
+            except queue.Empty:
+                continue
+            deadline = time.time() + self.config.grade_window
+            while len(items) < self.config.grade_batch:
+                try:
+                    items.append(
+                        self.grade_queue.get(
+                            timeout=max(deadline - time.time(), 0)))
+                except queue.Empty:
+                    break
+
+            time_now = time.time()
+            fresh = []
+            for ugrades, mem_buffer in items:
+                if time_now - mem_buffer.create_time > self.config.grade_staleness:
+                    continue
+                fresh.append((ugrades, mem_buffer,
+                              self._zero_dspikes(mem_buffer.rows)))
+            self._grade_stats['stale'] += len(items) - len(fresh)
+            if not fresh:
+                continue
 
-        return bittensor.proto.bittensor_pb2.GradeResponse(accept=True)
+            # Rows of all messages form one batch; their grads are summed by
+            # the step, or averaged over messages with grade_reduce=mean.
+            ugrades = np.concatenate([ugrades for ugrades, _, _ in fresh])
+            if self.config.grade_reduce == 'mean':
+                ugrades = ugrades / len(fresh)
+            uspikes = self.nucleus.vocabulary.concatenate(
+                [b.uspikes for _, b, _ in fresh])
+            dspikes = [
+                np.concatenate([d[i] for _, _, d in fresh])
+                for i in range(self.config.n_children)
+            ]
+            try:
+                self.nucleus.grade(ugrades, uspikes, dspikes)
+                self._grade_stats['applied'] += len(fresh)
+                self._grade_stats['steps'] += 1
+            except Exception as error:
+                logger.error('Failed to apply grads: {}', error)
 
     def _start_training(self):
         self._is_training = True
@@ -282,53 +510,53 @@ class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
             step+=1
 
             # 1. Next training batch.
-            nounce = str(random.randint(0, 1000000000))
             spikes, targets = self.nucleus.next_batch(self.config.batch_size)
 
-            # 2. Encode nounce and source
+            # 2. Create unique message id.
             source_id = self.config.identity
-            nounce_bytes = bytes(nounce, 'utf-8')
-            source_bytes = bytes(source_id, 'utf-8')
-            payload_bytes = pickle.dumps(spikes, protocol=0)
-
-            # 3. Create unique message hash.
-            hash = SHA256.new()
-            hash.update(nounce_bytes)
-            hash.update(source_bytes)
-            hash.update(payload_bytes)
-            message_id = hash.digest()
+            message_id = self.message_ids.next()
 
             # 3. Make recursive calls to downstream neighbors.
             # futures is a list of callbacks from each downstream call.
+            # standby maps children whose spike was hedged to the standby
+            # node and its streams.
             futures = []
-            for channel in self.channels:
-                futures.append(self._spike_future(channel, source_id, message_id, payload_bytes))
+            packed = {}
+            standby = {}
+            for i in range(self.config.n_children):
+                futures.append(self._spike_future(i, source_id, message_id, spikes, packed, standby))
 
             # 4. Fill responses.
-            dspikes = [np.zeros((self.config.batch_size, self.config.n_embedding)) for _ in range(self.config.n_children)]
+            dspikes = [np.zeros((self.config.batch_size, self.config.n_embedding), dtype=np.float32) for _ in range(self.config.n_children)]
             dspikes = self._fill_dspikes(dspikes, futures)
 
             # 5. Train local model.
             dgrads, loss, scores = self.nucleus.train(spikes, dspikes, targets)
 
-            # 6. Send downstream grads.
+            # 6. Send downstream grads, to the standby node where it
+            # answered first. Children skipped by their breaker get none.
             for i, channel in enumerate(self.channels):
-                if channel is None:
+                if channel is None or futures[i] is None:
                     continue
-
-                # Build Stub and request proto.
-                stub = bittensor.proto.bittensor_pb2_grpc.BittensorStub(channel)
+                peer_id = self.channel_ids[i]
+                streams = self.streams[i]
+                if getattr(futures[i], 'won', False):
+                    peer_id, streams = standby[i]
 
                 # Build Grade Request proto.
+                version = self.negotiator.version(peer_id)
+                precision = self.precisions.precision(peer_id)
                 request = bittensor.proto.bittensor_pb2.GradeRequest(
-                    version=1.0,
+                    version=version,
                     source_id=source_id,
                     parent_id=self.config.identity,
                     message_id=message_id,
-                    payload=pickle.dumps(dgrads[i][0], protocol=0))
+                    **self.error_feedback.pack(peer_id, dgrads[i][0], version,
+                                               precision))
 
-                # Send async grade request.
-                stub.Grade.future(request)
+                # Send async grade request on the peer's stream.
+                self.peer_stats.track(peer_id, streams.grade(request),
+                                      request.ByteSize())
 
             # 7. Average score values.
             for i, score in enumerate(scores):
@@ -341,10 +569,7 @@ class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
                 time_now = time.time()
 
                 # Clean mem.
-                for key in self.memory:
-                    val = self.memory[key]
-                    if val.create_time - time_now > 5:
-                        del self.memory[key]
+                self.memory.expire()
 
                 # global step calulcation and log.
                 steps_since_last_log = last_log_step - step
@@ -360,9 +585,19 @@ class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
                 self.current_stats['gs'] = gs
                 self.current_stats['step'] = step
                 self.current_stats['mem'] = len(self.memory)
+                self.current_stats['memory'] = self.memory.stats()
                 self.current_stats['loss'] = loss
                 self.current_stats['metrics'] = self._metrics
                 self.current_stats['score'] = clean_scores
+                self.current_stats['peers'] = self.peer_stats.summary()
+                self.current_stats['hedges'] = self.hedger.stats()
+                self.current_stats['breakers'] = self.breaker.stats()
+                self.current_stats['admission'] = self.admission.stats()
+                self.current_stats['scheduler'] = self.scheduler.stats()
+                self.current_stats['batcher'] = self.batcher.stats()
+                self.current_stats['coalescer'] = self.coalescer.stats()
+                self.current_stats['grades'] = dict(
+                    self._grade_stats, queued=self.grade_queue.qsize())
 
                 self.metagraph.attributions = clean_scores
                 logger.info('gs {} mem {} loss {} scores {}', gs, len(self.memory), loss, clean_scores)
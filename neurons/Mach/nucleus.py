@@ -1,8 +1,9 @@
-import collections
+import bittensor
+
 from loguru import logger
+import numpy as np
 import random
 import tensorflow as tf
-import zipfile
 
 
 class Nucleus():
@@ -99,10 +100,16 @@ class Nucleus():
 
         return run_output['downstream_grads'], run_output['target_loss'], run_output['scores']
 
+    def _token_feeds(self, uspikes):
+        # Token ids bypass the vocabulary table lookup.
+        if bittensor.vocabulary.is_ids(uspikes):
+            return {self._token_ids: np.reshape(uspikes, [-1])}
+        return {self._spikes: uspikes}
+
     def spike(self, uspikes, dspikes, use_synthetic):
 
         # Build Feeds dictionary.
-        feeds = {self._spikes : uspikes}
+        feeds = self._token_feeds(uspikes)
         feeds[self._use_synthetic] = use_synthetic
         for i in range(self._hparams.n_children):
             feeds[self._dspikes[i]] = dspikes[i]
@@ -116,17 +123,14 @@ class Nucleus():
     def grade(self, ugrades, uspikes, dspikes):
 
         # Build Feeds dictionary.
-        feeds = {}
-        feeds[self._spikes] = uspikes
+        feeds = self._token_feeds(uspikes)
         feeds[self._egrads] = ugrades
         for i in range(self._hparams.n_children):
             feeds[self._dspikes[i]] = dspikes[i]
 
-        # Compute gradients for the children and apply the local step.
-        dgrads = self._session.run([self._dgrads, self._estep], feeds)[0]
-
-        # Return downstream grads
-        return dgrads
+        # Apply the local step. Upstream grads are not passed on to children,
+        # so their grads are not computed.
+        self._session.run(self._estep, feeds)
 
     def _model_fn(self):
 
@@ -279,7 +283,7 @@ class Nucleus():
         # 1 x vocabulary sized vector.
         # string map, is a list of strings ordered by count.
         vocabulary_table = tf.contrib.lookup.index_table_from_tensor(
-            mapping=tf.constant(self._string_map),
+            mapping=tf.constant(self.vocabulary.string_map),
             num_oov_buckets=1,
             default_value=0)
 
@@ -295,8 +299,11 @@ class Nucleus():
         text = tf.reshape(self._spikes, [-1])
         labels = tf.reshape(self._targets, [-1])
 
-        # Apply tokenizer lookup.
-        text_tokens = vocabulary_table.lookup(text)
+        # Apply tokenizer lookup. Token ids received from peers sharing our
+        # vocabulary are fed directly.
+        self._token_ids = tf.compat.v1.placeholder_with_default(
+            vocabulary_table.lookup(text), [None], 'token_ids')
+        text_tokens = self._token_ids
         label_tokens = vocabulary_table.lookup(labels)
 
         # Apply table lookup to retrieve the embedding.
@@ -417,15 +424,8 @@ class Nucleus():
         """
 
         # Read textfile.
-        f = zipfile.ZipFile(self._hparams.corpus_path)
-        for name in f.namelist():
-            self._words = tf.compat.as_str(f.read(name)).split()
-        f.close()
-
-        counts = [('UNK', -1)]
-        counts.extend(
-            collections.Counter(self._words).most_common(self._hparams.n_vocabulary -
-                                                        2))
-        self._string_map = [c[0] for c in counts]
+        self._words = bittensor.vocabulary.read_corpus(self._hparams.corpus_path)
+        self.vocabulary = bittensor.vocabulary.Vocabulary.from_words(
+            self._words, self._hparams.n_vocabulary)
 
         logger.debug('Built Nucleus vocabulary.')
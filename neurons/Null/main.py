@@ -1,99 +1,66 @@
 import argparse
 import bittensor
-from Crypto.Hash import SHA256
 from concurrent import futures
 from datetime import timedelta
 from metagraph import Metagraph
 from loguru import logger
-import pickle
-import random
 import time
 import numpy
 import grpc
 from timeloop import Timeloop
 
-class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
+class Neuron(bittensor.streams.StreamingServicer):
     def __init__(self, hparams, metagraph):
         self._hparams = hparams
         self._metagraph = metagraph
-        self._channels = {}
+        self._pool = bittensor.channel_pool.get_pool()
         self._channels = []
         self._channel_ids = []
+        self._streams = []
         self._channel_reliability = []
+        self._negotiator = bittensor.serializer.Negotiator()
+        self._message_ids = bittensor.identifiers.MessageIds(hparams.identity)
         self.connect()
 
     def connect(self):
         for node in self._metagraph.nodes.values():
             if node.identity == self._hparams.identity:
                 continue
-            elif node.identity not in self._channels:
+            elif node.identity not in self._channel_ids:
                 address = node.address + ':' + node.port
-                self._channels.append(grpc.insecure_channel(address))
+                self._streams.append(self._pool.streams(address))
+                self._channels.append(self._streams[-1].channel)
                 self._channel_ids.append(node.identity)
                 self._channel_reliability.append(0.5)
 
     def query(self):
         logger.info('query')
-        # 1. Create nounce.
-        nounce = str(random.randint(0, 1000000000))
-
-        # 2. Encode nounce and source
-        source_id = self._hparams.identity
-        nounce_bytes = bytes(nounce, 'utf-8')
-        source_bytes = bytes(source_id, 'utf-8')
+        # 1. Create unique message id.
         spikes = numpy.array(['this is a test'])
-        payload_bytes = pickle.dumps(spikes, protocol=0)
-
-        # 3. Create unique message hash.
-        hash = SHA256.new()
-        hash.update(nounce_bytes)
-        hash.update(source_bytes)
-        hash.update(payload_bytes)
-        message_id = hash.digest()
+        message_id = self._message_ids.next()
 
         # 4. Create futures.
         spike_futures = []
         for i,channel in enumerate(self._channels):
             try:
-                stub = bittensor.proto.bittensor_pb2_grpc.BittensorStub(channel)
+                version = self._negotiator.version(self._channel_ids[i])
                 request = bittensor.proto.bittensor_pb2.SpikeRequest(
-                    version=1.0,
+                    version=version,
                     source_id=self._hparams.identity,
                     parent_id=self._hparams.identity,
                     message_id=message_id,
-                    payload=payload_bytes)
-                spike_futures.append(stub.Spike.future(request))
+                    **bittensor.serializer.pack(spikes, version))
+                spike_futures.append(
+                    self._negotiator.track(self._channel_ids[i],
+                                           self._streams[i].spike(request),
+                                           version))
             except Exception as e:
                 logger.error(str(e))
 
         # 5. Catch future responses
-        start = time.time()
-        exception = [False for _ in spike_futures]
-        result = [False for _ in spike_futures]
-        returned = [False for _ in spike_futures]
-        timed = [0 for _ in spike_futures]
-        while True:
-            for i, future in enumerate(spike_futures):
-                if future.done():
-                    returned[i] = True
-                    timed[i] = time.time() - start
-                    try:
-                        if future.exception():
-                            exception[i] = True
-                            failing_channels[i] = True
-
-                    except Exception as e:
-                        pass
-                    try:
-                        future.result()
-                        result[i] = True
-                    except Exception as e:
-                        pass
-
-            if time.time() - start > 3:
-                break
-            if sum(returned) == len(spike_futures):
-                break
+        collector = bittensor.collector.Collector(spike_futures)
+        collector.wait(3)
+        returned = [collector.done(i) for i in range(len(spike_futures))]
 
         for i in range(len(returned)):
             if returned[i]:
@@ -105,60 +72,42 @@ class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
 
         # 6. Create grad futures.
         grad_futures = []
-        for channel in self._channels:
+        for i, channel in enumerate(self._channels):
             try:
-                zeros_payload = pickle.dumps(numpy.zeros((1, self._hparams.n_embedding)), protocol=0)
-                stub = bittensor.proto.bittensor_pb2_grpc.BittensorStub(channel)
+                zeros = numpy.zeros((1, self._hparams.n_embedding),
+                                    dtype=numpy.float32)
+                version = self._negotiator.version(self._channel_ids[i])
                 request = bittensor.proto.bittensor_pb2.GradeRequest(
-                    version=1.0,
+                    version=version,
                     source_id=self._hparams.identity,
                     parent_id=self._hparams.identity,
                     message_id=message_id,
-                    payload=zeros_payload)
-                grad_futures.append(stub.Grade.future(request))
+                    **bittensor.serializer.pack(zeros, version))
+                grad_futures.append(self._streams[i].grade(request))
             except Exception as e:
                 logger.error(str(e))
 
         # 7. Catch grad future responses
-        start = time.time()
-        exception = [False for _ in grad_futures]
-        result = [False for _ in grad_futures]
-        returned = [False for _ in grad_futures]
-        timed = [0 for _ in grad_futures]
-        while True:
-            for i, future in enumerate(grad_futures):
-                if future.done():
-                    returned[i] = True
-                    timed[i] = time.time() - start
-                    try:
-                        if future.exception():
-                            exception[i] = True
-                    except Exception as e:
-                        pass
-                    try:
-                        future.result()
-                        result[i] = True
-                    except Exception as e:
-                        pass
-
-            if time.time() - start > 3:
-                break
-            if sum(returned) == len(grad_futures):
-                break
+        collector = bittensor.collector.Collector(grad_futures)
+        collector.wait(3)
+        result = [r is not None for r in collector.results()]
+        timed = [t or 0 for t in collector.times]
 
         logger.info('C: {}', list(zip(result, timed, self._channel_reliability)))
 
 
     def Spike(self, request, context):
         logger.info('{} --> S', request.source_id)
-        inputs = numpy.asarray(pickle.loads(request.payload))
-        zeros_payload = pickle.dumps(numpy.zeros((len(inputs), self._hparams.n_embedding)), protocol=0)
+        version = bittensor.serializer.negotiate(request.version)
+        inputs = bittensor.serializer.unpack(request)
+        zeros = numpy.zeros((len(inputs), self._hparams.n_embedding),
+                            dtype=numpy.float32)
         response = bittensor.proto.bittensor_pb2.SpikeResponse(
-            version=1.0,
+            version=version,
             source_id=request.source_id,
             child_id=self._hparams.identity,
             message_id=request.message_id,
-            payload=zeros_payload)
+            **bittensor.serializer.pack(zeros, version, request.precision))
         return response
 
     def Grade(self, request, context):
@@ -187,7 +136,10 @@ def main(hparams):
     metagraph = Metagraph(hparams)
     neuron = Neuron(hparams, metagraph)
 
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    # Each open SpikeStream or GradeStream holds a worker, up to
+    # bittensor.streams.MAX_STREAMS of them.
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=50),
+                         options=bittensor.channel_pool.SERVER_OPTIONS)
     bittensor.proto.bittensor_pb2_grpc.add_BittensorServicer_to_server(neuron, server)
     server.add_insecure_port(hparams.bind_address + ":" + hparams.port)
     server.start()
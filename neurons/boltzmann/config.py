@@ -16,6 +16,26 @@ flags.DEFINE_string("logdir", "/tmp/", "logginf directory.")
 flags.DEFINE_integer("k", 3, "Out edge degree.")
 flags.DEFINE_float("alpha", 0.01, "Learning rate.")
 flags.DEFINE_integer("time_till_expire", 5, "time till query expire")
+flags.DEFINE_string("transport_precision", "float32", "Precision of tensors sent to children: float32, float16 or int8.")
+flags.DEFINE_string("peer_precisions", "", "Per child precision overrides, comma separated identity:precision pairs.")
+flags.DEFINE_integer("grade_topk", 0, "Gradient entries sent per row to children, 0 sends dense gradients.")
+flags.DEFINE_float("spike_timeout", 1.0, "Seconds to wait on children spikes, late children count as zeros.")
+flags.DEFINE_integer("breaker_threshold", 5, "Consecutive failed calls after which a child is skipped.")
+flags.DEFINE_float("breaker_reset", 10.0, "Seconds a failing child is skipped before it is probed again.")
+flags.DEFINE_float("admission_rate", 50.0, "Spike and Grade calls per second allowed per parent, 0 disables rate limiting.")
+flags.DEFINE_integer("admission_burst", 100, "Spike and Grade calls a parent may make at once.")
+flags.DEFINE_integer("max_inflight", 8, "Spike and Grade calls handled at once, further calls are rejected. 0 disables the cap.")
+flags.DEFINE_bool("stake_weighted", False, "Scale parent rate limits by their stake over the mean stake.")
+flags.DEFINE_integer("spike_workers", 2, "Incoming Spikes run through the model at once.")
+flags.DEFINE_integer("spike_queue", 32, "Incoming Spikes waiting before the lowest priority is shed.")
+flags.DEFINE_float("grad_staleness", 10.0, "Gradients of messages spiked more than this many seconds ago are dropped.")
+flags.DEFINE_integer("grad_max_mb", 256, "Size in MB of the summed gradients, larger gradients are dropped.")
+flags.DEFINE_integer("memory_capacity", 10000, "Answered spikes remembered before the oldest are evicted.")
+flags.DEFINE_integer("slab_slots", 1024, "Answered spikes whose downstream spikes are kept in the preallocated slab. Slots are not reused within time_till_expire, spikes beyond them are kept on the heap.")
+flags.DEFINE_integer("slab_rows", 64, "Rows per slab slot, larger messages are stored outside the slab.")
+flags.DEFINE_bool("grade_recompute", False, "Keep the children's packed responses of answered spikes and unpack them when the Grade arrives, instead of keeping the spikes in the slab.")
+flags.DEFINE_float("coalesce_ttl", 1.0, "Seconds the spikes of an answered message are served to copies of its message_id.")
+flags.DEFINE_float("coalesce_timeout", 0.5, "Seconds a copy of a message_id in flight waits on its spikes before getting a null message.")
 
 
 class Config():
@@ -30,6 +50,26 @@ class Config():
         self.k = FLAGS.k
         self.alpha = FLAGS.alpha
         self.time_till_expire = FLAGS.time_till_expire
+        self.transport_precision = FLAGS.transport_precision
+        self.peer_precisions = FLAGS.peer_precisions
+        self.grade_topk = FLAGS.grade_topk
+        self.spike_timeout = FLAGS.spike_timeout
+        self.breaker_threshold = FLAGS.breaker_threshold
+        self.breaker_reset = FLAGS.breaker_reset
+        self.admission_rate = FLAGS.admission_rate
+        self.admission_burst = FLAGS.admission_burst
+        self.max_inflight = FLAGS.max_inflight
+        self.stake_weighted = FLAGS.stake_weighted
+        self.spike_workers = FLAGS.spike_workers
+        self.spike_queue = FLAGS.spike_queue
+        self.grad_staleness = FLAGS.grad_staleness
+        self.grad_max_mb = FLAGS.grad_max_mb
+        self.memory_capacity = FLAGS.memory_capacity
+        self.slab_slots = FLAGS.slab_slots
+        self.slab_rows = FLAGS.slab_rows
+        self.grade_recompute = FLAGS.grade_recompute
+        self.coalesce_ttl = FLAGS.coalesce_ttl
+        self.coalesce_timeout = FLAGS.coalesce_timeout
 
     def __repr__(self):
         return self.__str__()
@@ -4,57 +4,59 @@ from concurrent import futures
 import grpc
 from loguru import logger
 import numpy as np
-import pickle
 import time
-from threading import Lock
-import queue
 
 
 class Buffer:
+    """ Record of an answered message. Its downstream spikes are kept in a
+    slot of the neuron's slab, or in activations if they do not fit.
+    Alternatively it keeps the responses of the children, from which the
+    downstream spikes are unpacked again when its Grade arrives.
+    """
+
+    __slots__ = ('source_id', 'parent_id', 'message_id', 'create_time',
+                 'uspikes', 'rows', 'slot', 'activations', 'responses')
 
     def __init__(self,
+                 source_id=None,
                  parent_id=None,
                  message_id=None,
-                 create_time=None,
-                 lspikes=None,
-                 uspikes=None,
-                 dspikes=None,
-                 lgrads=None):
+                 create_time=None):
 
+        self.source_id = source_id
         self.parent_id = parent_id
         self.message_id = message_id
         self.create_time = create_time
-        self.lspikes = lspikes
+        self.uspikes = None
+        # Set once the message is spiked.
+        self.rows = None
+        self.slot = None
+        self.activations = None
+        self.responses = None
+
+    def store(self, slab, uspikes, dspikes):
+        self.uspikes = uspikes
+        self.slot = slab.store(dspikes)
+        if self.slot is None:
+            self.activations = dspikes
+        self.rows = len(uspikes)
+
+    def keep(self, uspikes, responses):
+        # Keeps the upstream spikes and the children's SpikeResponses, None
+        # for children that did not answer.
         self.uspikes = uspikes
-        self.dspikes = dspikes
-        self.lgrads = lgrads
-
-    def set(self,
-            parent_id=None,
-            message_id=None,
-            create_time=None,
-            lspikes=None,
-            uspikes=None,
-            dspikes=None,
-            lgrads=None):
-
-        if not self.parent_id:
-            self.parent_id = parent_id
-        if not self.message_id:
-            self.message_id = message_id
-        if not self.create_time:
-            self.create_time = create_time
-        if not self.lspikes:
-            self.lspikes = lspikes
-        if not self.uspikes:
-            self.uspikes = uspikes
-        if not self.dspikes:
-            self.dspikes = dspikes
-        if not self.lgrads:
-            self.lgrads = lgrads
-
-
-class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
+        self.responses = responses
+        self.rows = len(uspikes)
+
+    def load(self, slab):
+        """ Returns the downstream spikes, None if their slot was reused.
+        """
+        if self.slot is None:
+            return self.activations
+        return slab.load(self.slot, self.rows)
+
+
+class Neuron(bittensor.streams.StreamingServicer):
 
     def __init__(self, config, dendrite, nucleus, metagraph):
         self.config = config
@@ -62,37 +64,102 @@ class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
         self.nucleus = nucleus
         self.metagraph = metagraph
 
-        self.lock = Lock()
-        self.memory = {}
-        self.gradient_queue = queue.LifoQueue(maxsize=-1)
+        # Buffers of the messages we answered, until their Grade arrives.
+        self.memory = bittensor.memory.MessageStore(
+            self.config.time_till_expire, self.config.memory_capacity)
+        # Downstream spikes of answered messages, on the heap once the slots
+        # stored within time_till_expire run out. With grade_recompute the
+        # children's packed responses are kept instead.
+        self.slab = None
+        if not self.config.grade_recompute:
+            self.slab = bittensor.slab.Slab(self.config.slab_slots,
+                                            self.config.slab_rows, 128,
+                                            self.config.k,
+                                            self.config.time_till_expire)
+        # Local gradients summed between Learn steps.
+        self.gradients = bittensor.accumulator.Accumulator(
+            self.config.grad_staleness, self.config.grad_max_mb * 1024 * 1024)
+
+        # Protocol version spoken by each child.
+        self.negotiator = bittensor.serializer.Negotiator()
+
+        # Transport precision used with each child.
+        self.precisions = bittensor.serializer.Precisions(
+            self.config.transport_precision, self.config.peer_precisions)
+
+        # Top-k gradient sparsification with per child error feedback.
+        self.error_feedback = bittensor.serializer.ErrorFeedback(
+            self.config.grade_topk)
+
+        # Success rate, latency and bytes of calls to each child.
+        self.peer_stats = bittensor.peer_stats.PeerStats()
+
+        # Children failing repeatedly are skipped, their spikes count as
+        # zeros, until a periodic probe succeeds.
+        self.breaker = bittensor.circuit_breaker.CircuitBreaker(
+            self.config.breaker_threshold, self.config.breaker_reset)
+
+        # Per parent rate limits and a cap on calls handled at once, so
+        # parents cannot starve training of the nucleus.
+        self.admission = bittensor.admission.Admission(
+            self.config.admission_rate, self.config.admission_burst,
+            self.config.max_inflight,
+            bittensor.admission.stake_weights(self.metagraph)
+            if self.config.stake_weighted else None)
+
+        # Nucleus passes of incoming Spikes, highest staked parents first.
+        self.scheduler = bittensor.scheduler.Scheduler(
+            self.config.spike_workers, self.config.spike_queue,
+            bittensor.scheduler.stake_priority(self.metagraph))
+
+        # Copies of a message_id share the spikes of the first.
+        self.coalescer = bittensor.coalescer.Coalescer(
+            self.config.coalesce_ttl, self.config.coalesce_timeout)
 
         # Init server.
         self.server_address = self.config.bind_address + ":" + self.config.port
-        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+        # Each open SpikeStream or GradeStream holds a worker, up to
+        # bittensor.streams.MAX_STREAMS of them.
+        self.server = grpc.server(
+            futures.ThreadPoolExecutor(max_workers=50),
+            interceptors=[self.admission],
+            options=bittensor.channel_pool.SERVER_OPTIONS)
         bittensor.proto.bittensor_pb2_grpc.add_BittensorServicer_to_server(
             self, self.server)
         self.server.add_insecure_port(self.server_address)
 
+        # Channels are shared through the process channel pool.
+        self.pool = bittensor.channel_pool.get_pool()
         self.channels = [None for _ in range(self.config.k)]
         self.channel_ids = [None for _ in range(self.config.k)]
+        self.channel_addresses = [None for _ in range(self.config.k)]
+        self.streams = [None for _ in range(self.config.k)]
         self.connect()
 
     def connect(self):
-        for i in range(self.config.k):
-            if self.channels[i] == None:
-                self._set_channel(i)
-
-    def _set_channel(self, i):
-        for node in self.metagraph.nodes.values():
-            if node.identity in self.channel_ids:
-                continue
-            if node.identity == self.config.identity:
-                continue
-            else:
-                address = node.address + ':' + node.port
-                self.channels[i] = grpc.insecure_channel(address)
-                self.channel_ids[i] = node.identity
-                break
+        # Fill free slots and replace failing children with the best ranked
+        # nodes.
+        candidates = [
+            identity for identity in self.metagraph.nodes
+            if identity != self.config.identity
+        ]
+        selected = self.peer_stats.select(self.channel_ids, candidates)
+        for i, identity in enumerate(selected):
+            if identity != self.channel_ids[i]:
+                self._set_channel(i, self.metagraph.nodes[identity])
+        self.pool.evict_idle()
+
+    def _set_channel(self, i, node):
+        if self.channels[i] != None:
+            logger.info('Replacing child {} with {}.', self.channel_ids[i],
+                        node.identity)
+            self.pool.release(self.channel_addresses[i])
+            self.error_feedback.reset(self.channel_ids[i])
+        address = node.address + ':' + node.port
+        self.streams[i] = self.pool.streams(address)
+        self.channels[i] = self.streams[i].channel
+        self.channel_ids[i] = node.identity
+        self.channel_addresses[i] = address
 
     def __del__(self):
         self.server.stop(0)
@@ -102,172 +169,298 @@ class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
         self.server.start()
         logger.debug('Started Serving Neuron at: {}.', self.server_address)
 
-    def _spike_future(self, channel, request):
-        if channel == None:
+    def _spike_future(self, i, request, uspikes, forwards):
+        channel = self.channels[i]
+        if channel == None or not self.breaker.allow(self.channel_ids[i]):
             return None
         try:
-            # Build Stub and request proto.
-            stub = bittensor.proto.bittensor_pb2_grpc.BittensorStub(channel)
-
-            # Create spike request proto.
-            request = bittensor.proto.bittensor_pb2.SpikeRequest(
-                version=1.0,
-                source_id=request.source_id,
-                parent_id=self.config.identity,
-                message_id=request.message_id,
-                payload=request.payload)
-
-            # Send TCP spike request with futures callback.
-            return stub.Spike.future(request)
+            # Forward the upstream payload as is, unless the child only
+            # speaks an older protocol version or does not share the
+            # vocabulary of the upstream tokens. Children asking for the
+            # same encoding share one request, built once per message in
+            # forwards.
+            version = min(bittensor.serializer.negotiate(request.version),
+                          self.negotiator.version(self.channel_ids[i]))
+            vocabulary_hash = self.negotiator.vocabulary_hash(self.channel_ids[i])
+            repack = version != bittensor.serializer.negotiate(
+                request.version) or (request.vocabulary_hash and
+                                     request.vocabulary_hash != vocabulary_hash)
+            precision = self.precisions.precision(self.channel_ids[i])
+            key = (version, vocabulary_hash if repack else None, precision)
+            if key not in forwards:
+                if repack:
+                    fields = self.nucleus.vocabulary.pack(
+                        uspikes, version, vocabulary_hash)
+                elif bittensor.serializer.is_tensor(version):
+                    fields = {
+                        'tensor': request.tensor,
+                        'vocabulary_hash': request.vocabulary_hash
+                    }
+                else:
+                    fields = {'payload': request.payload}
+
+                # Create spike request proto.
+                forwards[key] = bittensor.proto.bittensor_pb2.SpikeRequest(
+                    version=version,
+                    source_id=request.source_id,
+                    parent_id=self.config.identity,
+                    message_id=request.message_id,
+                    precision=precision,
+                    **fields)
+            request = forwards[key]
+
+            # Send spike request on the child's stream with futures callback.
+            future = self.streams[i].spike(request,
+                                           self.config.spike_timeout)
+            self.peer_stats.track(self.channel_ids[i], future,
+                                  request.ByteSize(), self.config.spike_timeout)
+            self.breaker.track(self.channel_ids[i], future,
+                               self.config.spike_timeout)
+            return self.negotiator.track(self.channel_ids[i], future,
+                                         request.version)
         except:
             return None
 
-    def _fill_dspikes(self, dspikes, futures):
-        while True:
-            remaining_futures = self.config.k
-            for i in range(self.config.k):
-                if futures[i] != None:
-                    if futures[i].done():
-                        remaining_futures -= 1
-                        try:
-                            result = futures[i].result()
-                            next_dspikes = pickle.loads(result.payload).reshape(
-                                -1, 128)
-                            dspikes[i] = next_dspikes
-                        except:
-                            pass
-                else:
-                    remaining_futures -= 1
-            if remaining_futures == 0:
-                break
+    def _fill_dspikes(self, dspikes, results):
+        # Children that failed or missed the deadline keep their zeros.
+        for i, result in enumerate(results):
+            if result is None:
+                continue
+            try:
+                dspikes[i] = bittensor.serializer.unpack(result,
+                                                         shape=(None, 128))
+            except:
+                pass
         return dspikes
 
-    def Spike(self, request, context):
-        # Unpack message.
-        source_id = request.source_id
-        parent_id = request.parent_id
-        message_id = request.message_id
-        logger.info('spike {}', parent_id)
-
-        # 1. Check and build message buffer. On recursion with loops we respond
-        # with a null message if the message_id has been seen already.
-        self.lock.acquire()
-        try:
-            # Check for duplicates.
-            if message_id in self.memory:
-                # Return null repsonse.
-                response = bittensor.proto.bittensor_pb2.SpikeResponse(
-                    version=1.0,
-                    source_id=source_id,
-                    child_id=self.config.identity,
-                    message_id=message_id,
-                    payload=str.encode(''))
-                return response
+    def _unpack_dspikes(self, rows, results):
+        # Downstream spikes of a message of rows rows from the results of
+        # its children.
+        dspikes = [
+            np.zeros((rows, 128), dtype=np.float32)
+            for _ in range(self.config.k)
+        ]
+        return self._fill_dspikes(dspikes, results)
+
+    def _forget(self, requests, fresh):
+        # Drops the new messages of a failed call.
+        for i in fresh:
+            self.memory.remove(requests[i].message_id)
+            self.coalescer.finish(requests[i].message_id, None)
 
-            # Build new message buffer.
-            msg_buffer = Buffer(parent_id=parent_id,
-                                message_id=message_id,
+    def Spike(self, request, context):
+        return self._spike([request], context)[0]
+
+    def SpikeBatch(self, request, context):
+        responses = self._spike(list(request.requests), context)
+        return bittensor.proto.bittensor_pb2.SpikeBatchResponse(
+            responses=responses)
+
+    def _spike(self, requests, context):
+        # Answers a batch of SpikeRequests with a single nucleus pass.
+        for request in requests:
+            logger.info('spike {}', request.parent_id)
+
+        # 1. Check and build message buffers. Copies of a message_id in
+        # flight or answered within coalesce_ttl share its spikes, e.g. on
+        # recursion with loops, older copies get a null message.
+        fresh = []
+        flights = {}
+        buffers = {}
+        for i, request in enumerate(requests):
+            flight = self.coalescer.lead(request.message_id)
+            if flight is not None:
+                flights[i] = flight
+                continue
+            buffers[i] = Buffer(parent_id=request.parent_id,
+                                message_id=request.message_id,
                                 create_time=time.time())
+            if self.memory.add(request.message_id, buffers[i]):
+                fresh.append(i)
+            else:
+                self.coalescer.finish(request.message_id, None)
 
-            self.memory[message_id] = msg_buffer
-
-        finally:
-            self.lock.release()
-
-        # 2. Make recursive calls to downstream neighbors.
-        # futures is a list of callbacks from each downstream call.
-        futures = []
-        for channel in self.channels:
-            futures.append(self._spike_future(channel, request))
-
-        # 3. Deserialize upstream spikes.
-        uspikes = pickle.loads(request.payload)
-
-        # 4. Fill downstream spikes.
-        dspikes = [np.zeros((len(uspikes), 128)) for _ in range(self.config.k)]
-        dspikes = self._fill_dspikes(dspikes, futures)
-
-        # 5. Inference local neuron.
-        lspikes = self.nucleus.spike(uspikes, dspikes)
-
-        # 6. Sink output to memory.
-        self.lock.acquire()
-        try:
-            self.memory[message_id].set(uspikes=uspikes,
-                                        lspikes=lspikes,
-                                        dspikes=dspikes)
-        finally:
-            self.lock.release()
-
-        # 7. Build response.
-        payload = pickle.dumps(lspikes, protocol=0)
-        response = bittensor.proto.bittensor_pb2.SpikeResponse(
-            version=1.0,
-            source_id=source_id,
-            child_id=self.config.identity,
-            message_id=message_id,
-            payload=payload)
-
-        # Return.
-        return response
+        # 2. Deserialize upstream spikes.
+        uspikes = {}
+        for i in fresh:
+            try:
+                uspikes[i] = self.nucleus.vocabulary.unpack(requests[i])
+            except bittensor.vocabulary.TokenIdError as error:
+                self._forget(requests, fresh)
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(error))
+            except bittensor.vocabulary.VocabularyError as error:
+                self._forget(requests, fresh)
+                context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(error))
+
+        lspikes = {}
+        if fresh:
+            # 3. Make recursive calls to downstream neighbors.
+            # futures is a list of callbacks from each downstream call.
+            dspikes = {}
+            responses = {}
+            pending = []
+            for i in fresh:
+                futures = []
+                forwards = {}
+                for j in range(self.config.k):
+                    futures.append(
+                        self._spike_future(j, requests[i], uspikes[i],
+                                           forwards))
+                pending.append((i, futures))
+
+            # 4. Fill downstream spikes. All messages share one deadline.
+            results = bittensor.collector.collect(
+                [f for _, futures in pending for f in futures],
+                self.config.spike_timeout)
+            for n, (i, futures) in enumerate(pending):
+                responses[i] = results[n * self.config.k:(n + 1) *
+                                       self.config.k]
+                dspikes[i] = self._unpack_dspikes(len(uspikes[i]),
+                                                  responses[i])
+
+            # 5. Inference local neuron once over all new messages.
+            batch_uspikes = self.nucleus.vocabulary.concatenate(
+                [uspikes[i] for i in fresh])
+            batch_dspikes = [
+                np.concatenate([dspikes[i][j] for i in fresh])
+                for j in range(self.config.k)
+            ]
+            try:
+                batch_lspikes = self.scheduler.run(
+                    [requests[i].parent_id for i in fresh], self.nucleus.spike,
+                    batch_uspikes, batch_dspikes)
+            except Exception as error:
+                self._forget(requests, fresh)
+                if isinstance(error, bittensor.scheduler.Overloaded):
+                    context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                                  'Spike queue full.')
+                raise
+
+            # 6. Split output by message, sink to memory and share with
+            # copies.
+            start = 0
+            for i in fresh:
+                end = start + len(uspikes[i])
+                lspikes[i] = batch_lspikes[start:end]
+                if self.config.grade_recompute:
+                    buffers[i].keep(uspikes[i], responses[i])
+                else:
+                    buffers[i].store(self.slab, uspikes[i], dspikes[i])
+                self.coalescer.finish(requests[i].message_id, lspikes[i])
+                start = end
+
+        # 7. Wait on the messages copied. Copies whose flight failed or timed
+        # out get a null message.
+        for i, flight in flights.items():
+            result = self.coalescer.wait(flight, context.time_remaining())
+            if result is not None:
+                lspikes[i] = result
+
+        # 8. Build responses.
+        responses = []
+        for i, request in enumerate(requests):
+            version = bittensor.serializer.negotiate(request.version)
+            fields = {}
+            if i in lspikes:
+                fields = bittensor.serializer.pack(lspikes[i], version,
+                                                   request.precision)
+            responses.append(
+                bittensor.proto.bittensor_pb2.SpikeResponse(
+                    version=version,
+                    source_id=request.source_id,
+                    child_id=self.config.identity,
+                    message_id=request.message_id,
+                    vocabulary_hash=self.nucleus.vocabulary.hash,
+                    **fields))
+        return responses
 
     def Grade(self, request, context):
+        self._grade([request])
+        return bittensor.proto.bittensor_pb2.GradeResponse(accept=True)
 
-        # Unpack request.
-        source_id = request.source_id
-        parent_id = request.parent_id
-        message_id = request.message_id
-        ugrades = pickle.loads(request.payload)
-        logger.info('grad {}', parent_id)
-
-        # Check for lost or badly routed grades.
-        if message_id not in self.memory:
-            return bittensor.proto.bittensor_pb2.GradeResponse(accept=True)
-
-        # Get local spikes.
-        mem_buffer = self.memory[message_id]
-
-        # Get local spikes.
-        lspikes = mem_buffer.lspikes
-
-        # Get downstream spikes.
-        dspikes = mem_buffer.dspikes
-
-        # Get upstream spikes
-        uspikes = mem_buffer.uspikes
+    def GradeBatch(self, request, context):
+        self._grade(list(request.requests))
+        return bittensor.proto.bittensor_pb2.GradeBatchResponse(responses=[
+            bittensor.proto.bittensor_pb2.GradeResponse(
+                accept=True, message_id=grade_request.message_id)
+            for grade_request in request.requests
+        ])
+
+    def _grade(self, requests):
+        # Applies a batch of GradeRequests with a single nucleus pass.
+        ugrades = []
+        buffers = []
+        for request in requests:
+            logger.info('grad {}', request.parent_id)
+            # Decode before popping so a malformed grade leaves the message
+            # buffer for a well formed one.
+            try:
+                request_ugrades = bittensor.serializer.unpack(
+                    request, shape=(None, 128))
+            except bittensor.serializer.SerializationError as error:
+                logger.debug('Malformed grade from {}: {}', request.parent_id,
+                             error)
+                continue
+            # Check for lost, badly routed or repeated grades.
+            mem_buffer = self.memory.pop(request.message_id)
+            if mem_buffer is None or mem_buffer.rows is None:
+                continue
+            # Spikes whose slab slot was reused are lost.
+            if self.config.grade_recompute:
+                mem_dspikes = self._unpack_dspikes(mem_buffer.rows,
+                                                   mem_buffer.responses)
+            else:
+                mem_dspikes = mem_buffer.load(self.slab)
+            if mem_dspikes is None:
+                continue
+            ugrades.append(request_ugrades)
+            buffers.append((request, mem_buffer, mem_dspikes))
+        if not buffers:
+            return
 
         # Get downstream grads and local grads.
-        dgrades, lgrads = self.nucleus.grade(ugrades, uspikes, dspikes)
-
-        # delete memory:
-        del self.memory[message_id]
-
-        # Put gradients on LIFO queue.
-        self.gradient_queue.put(lgrads)
-
-        # Send downstream grads.
-        for channel in self.channels:
-            if channel is None:
+        uspikes = self.nucleus.vocabulary.concatenate(
+            [b.uspikes for _, b, _ in buffers])
+        dspikes = [
+            np.concatenate([d[i] for _, _, d in buffers])
+            for i in range(self.config.k)
+        ]
+        dgrades, lgrads = self.nucleus.grade(np.concatenate(ugrades), uspikes,
+                                             dspikes)
+
+        # Add gradients to the sum applied on the next Learn.
+        self.gradients.add(lgrads, min(b.create_time for _, b, _ in buffers))
+
+        # Send downstream grads, split back by message. Children skipped by
+        # their breaker get none.
+        for i, channel in enumerate(self.channels):
+            if channel is None or self.breaker.state(
+                    self.channel_ids[i]) == bittensor.circuit_breaker.OPEN:
                 continue
-            try:
-                # Build Stub and request proto.
-                stub = bittensor.proto.bittensor_pb2_grpc.BittensorStub(channel)
-
-                # Build Grade Request proto.
-                request = bittensor.proto.bittensor_pb2.GradeRequest(
-                    version=1.0,
-                    source_id=source_id,
-                    parent_id=self.config.identity,
-                    message_id=message_id,
-                    payload=pickle.dumps(dgrades, protocol=0))
-
-                # Send async grade request.
-                stub.Grade.future(request)
-
-            except Exception as error:
-                pass
-
-        return bittensor.proto.bittensor_pb2.GradeResponse(accept=True)
+            version = self.negotiator.version(self.channel_ids[i])
+            precision = self.precisions.precision(self.channel_ids[i])
+            start = 0
+            for request, mem_buffer, _ in buffers:
+                end = start + len(mem_buffer.uspikes)
+                try:
+                    # Build Grade Request proto.
+                    grade_request = bittensor.proto.bittensor_pb2.GradeRequest(
+                        version=version,
+                        source_id=request.source_id,
+                        parent_id=self.config.identity,
+                        message_id=request.message_id,
+                        **self.error_feedback.pack(self.channel_ids[i],
+                                                   dgrades[i][0][start:end],
+                                                   version, precision))
+
+                    # Send async grade request on the child's stream.
+                    self.peer_stats.track(self.channel_ids[i],
+                                          self.streams[i].grade(grade_request),
+                                          grade_request.ByteSize())
+
+                except Exception as error:
+                    pass
+                start = end
 
     def Learn(self):
         # Function clears the message buffer of all outdated memory objects
@@ -275,25 +468,17 @@ class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
         logger.info('Learn.')
 
         # Clean the memory.
-        self.lock.acquire()
-        try:
-            time_now = time.time()
-            to_delete = []
-            for row in self.memory.values():
-                if (time_now - row.create_time) > self.config.time_till_expire:
-                    to_delete.append(row.message_id)
-
-            for message_id in to_delete:
-                del self.memory[message_id]
-
-        except Exception as e:
-            logger.error('Neuron failed on memory clean with Error: ' + str(e))
-
-        finally:
-            self.lock.release()
-
-        # Apply the batch.
-        logger.info('Grad queue size: {}', self.gradient_queue.qsize())
-        while not self.gradient_queue.empty():
-            grad = self.gradient_queue.get()
-            self.nucleus.learn(grad)
+        self.memory.expire()
+        logger.info('Memory: {}', self.memory.stats())
+
+        logger.info('Peers: {}', self.peer_stats.summary())
+        logger.info('Breakers: {}', self.breaker.stats())
+        logger.info('Admission: {}', self.admission.stats())
+        logger.info('Scheduler: {}', self.scheduler.stats())
+        logger.info('Coalescer: {}', self.coalescer.stats())
+
+        # Apply the summed gradients in one step.
+        logger.info('Gradients: {}', self.gradients.stats())
+        gradients, _ = self.gradients.take()
+        if gradients is not None:
+            self.nucleus.learn(gradients)
@@ -1,7 +1,8 @@
-import collections
+import bittensor
+
 from loguru import logger
+import numpy as np
 import tensorflow as tf
-import zipfile
 
 
 class Nucleus():
@@ -35,10 +36,16 @@ class Nucleus():
 
         self.session.run(self.table_init)
 
+    def token_feeds(self, uspikes):
+        # Token ids bypass the vocabulary table lookup.
+        if bittensor.vocabulary.is_ids(uspikes):
+            return {self.token_ids: np.reshape(uspikes, [-1])}
+        return {self.text_placeholder: uspikes}
+
     def spike(self, uspikes, dspikes):
 
         # Build Feeds dictionary.
-        feeds = {self.text_placeholder: uspikes}
+        feeds = self.token_feeds(uspikes)
         for i in range(self.config.k):
             feeds[self.dspikes[i]] = dspikes[i]
 
@@ -54,8 +61,7 @@ class Nucleus():
     def grade(self, ugrades, uspikes, dspikes):
 
         # Build Feeds dictionary.
-        feeds = {}
-        feeds[self.text_placeholder] = uspikes
+        feeds = self.token_feeds(uspikes)
         feeds[self.output_grad] = ugrades
         for i in range(self.config.k):
             feeds[self.dspikes[i]] = dspikes[i]
@@ -68,17 +74,30 @@ class Nucleus():
         # Run graph.
         run_output = self.session.run(fetches, feeds)
 
+        # Embedding gradients come back as IndexedSlicesValues over the looked
+        # up rows, passed on as (indices, values).
+        lgrads = [
+            (grad.indices, grad.values)
+            if isinstance(grad, tf.compat.v1.IndexedSlicesValue) else grad
+            for grad in run_output['lgrads']
+        ]
+
         # Return spikes.
         return [run_output["dgrads" + str(i)] for i in range(self.config.k)
-               ], run_output['lgrads']
+               ], lgrads
 
     def learn(self, gradients):
 
         # Build Feeds dictionary.
         # Feed batch of gradients.
+        # Sparse gradients feed their row indices and values.
         feeds = {}
-        for i, grad_var in enumerate(gradients):
-            feeds[self.placeholder_gradients[i][0]] = gradients[i]
+        for gradient, placeholder in zip(gradients, self.gradient_feeds):
+            if isinstance(placeholder, tuple):
+                feeds[placeholder[0]] = gradient[0]
+                feeds[placeholder[1]] = gradient[1]
+            else:
+                feeds[placeholder] = gradient
 
         # Fetches. Call apply gradients.
         fetches = {}
@@ -96,10 +115,12 @@ class Nucleus():
 
         # Tokenization.
         vocabulary_table = tf.contrib.lookup.index_table_from_tensor(
-            mapping=tf.constant(self.string_map),
+            mapping=tf.constant(self.vocabulary.string_map),
             num_oov_buckets=1,
             default_value=0)
-        input_tokens = vocabulary_table.lookup(input_text)
+        self.token_ids = tf.compat.v1.placeholder_with_default(
+            vocabulary_table.lookup(input_text), [None], name="token_ids")
+        input_tokens = self.token_ids
 
         # Token spikes.
         embedding_matrix = tf.Variable(
@@ -152,15 +173,30 @@ class Nucleus():
         gradients = self.optimizer.compute_gradients(loss=self.output,
                                                      grad_loss=self.output_grad)
 
-        # Build gradient placeholders for the Learn step.
+        # Build gradient placeholders for the Learn step. Gradients of
+        # embedding lookups only touch the looked up rows, they are fed as
+        # row indices and values and applied with a sparse update.
         self.gradient_values = []
+        self.gradient_feeds = []
         self.placeholder_gradients = []
-        for gradient_variable in gradients:
-            grad_placeholder = tf.placeholder(
-                'float', shape=gradient_variable[1].get_shape())
-            self.gradient_values.append(gradient_variable[1])
-            self.placeholder_gradients.append(
-                (grad_placeholder, gradient_variable[1]))
+        for gradient, variable in gradients:
+            self.gradient_values.append(gradient)
+            if isinstance(gradient, tf.IndexedSlices):
+                indices_placeholder = tf.placeholder(gradient.indices.dtype,
+                                                     shape=[None])
+                values_placeholder = tf.placeholder(
+                    'float', shape=[None] + variable.get_shape().as_list()[1:])
+                self.gradient_feeds.append(
+                    (indices_placeholder, values_placeholder))
+                self.placeholder_gradients.append((tf.IndexedSlices(
+                    values_placeholder, indices_placeholder,
+                    tf.shape(variable, out_type=gradient.indices.dtype)),
+                                                   variable))
+            else:
+                grad_placeholder = tf.placeholder('float',
+                                                  shape=variable.get_shape())
+                self.gradient_feeds.append(grad_placeholder)
+                self.placeholder_gradients.append((grad_placeholder, variable))
 
         self.step = self.optimizer.apply_gradients(self.placeholder_gradients)
 
@@ -178,15 +214,8 @@ class Nucleus():
         """
 
         # Read textfile.
-        f = zipfile.ZipFile(self.filename)
-        for name in f.namelist():
-            self.words = tf.compat.as_str(f.read(name)).split()
-        f.close()
-
-        counts = [('UNK', -1)]
-        counts.extend(
-            collections.Counter(self.words).most_common(self.vocabulary_size -
-                                                        2))
-        self.string_map = [c[0] for c in counts]
+        self.words = bittensor.vocabulary.read_corpus(self.filename)
+        self.vocabulary = bittensor.vocabulary.Vocabulary.from_words(
+            self.words, self.vocabulary_size)
 
         logger.debug('Built Nucleus vocabulary.')
@@ -15,6 +15,8 @@ flags.DEFINE_string("eosurl", "http://0.0.0.0:8888", "EOS Url.")
 flags.DEFINE_string("logdir", "/tmp/", "logginf directory.")
 flags.DEFINE_integer("k", 3, "Out edge degree.")
 flags.DEFINE_float("alpha", 0.01, "Learning rate.")
+flags.DEFINE_integer("spike_workers", 2, "Incoming Spikes run through the model at once.")
+flags.DEFINE_integer("spike_queue", 32, "Incoming Spikes waiting before the lowest priority is shed.")
 
 
 class Config():
@@ -28,6 +30,8 @@ class Config():
         self.logdir = FLAGS.logdir
         self.k = FLAGS.k
         self.alpha = FLAGS.alpha
+        self.spike_workers = FLAGS.spike_workers
+        self.spike_queue = FLAGS.spike_queue
 
     def __repr__(self):
         return self.__str__()
@@ -6,7 +6,6 @@ from concurrent import futures
 import grpc
 from loguru import logger
 import numpy
-import pickle
 
 import time
 import tensorflow as tf
@@ -15,7 +14,7 @@ import tensorflow_hub as hub
 EMBEDDING_SIZE = 128
 
 
-class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
+class Neuron(bittensor.streams.StreamingServicer):
 
     def __init__(self, config):
         self.config = config
@@ -28,9 +27,18 @@ class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
         self.embed = hub.KerasLayer(module_url)
         logger.info('done.')
 
+        # Embedding passes of incoming Spikes. This neuron has no metagraph,
+        # so parents are served in arrival order and the latest are shed.
+        self.scheduler = bittensor.scheduler.Scheduler(self.config.spike_workers,
+                                                       self.config.spike_queue)
+
         # Init server.
         self.server_address = self.config.bind_address + ":" + self.config.port
-        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+        # Each open SpikeStream or GradeStream holds a worker, up to
+        # bittensor.streams.MAX_STREAMS of them.
+        self.server = grpc.server(
+            futures.ThreadPoolExecutor(max_workers=50),
+            options=bittensor.channel_pool.SERVER_OPTIONS)
         bittensor.proto.bittensor_pb2_grpc.add_BittensorServicer_to_server(
             self, self.server)
         self.server.add_insecure_port(self.server_address)
@@ -45,23 +53,28 @@ class Neuron(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
 
     def Spike(self, request, context):
         # Unpack message.
-        version = request.version
+        version = bittensor.serializer.negotiate(request.version)
         source_id = request.source_id
         parent_id = request.parent_id
         message_id = request.message_id
-        inputs = numpy.asarray(pickle.loads(request.payload))
+        inputs = bittensor.serializer.unpack(request)
         logger.info('s {}', parent_id)
 
         # Inference through EMLO.
-        embeddings = numpy.array(self.embed(inputs.flatten())).reshape(
-            EMBEDDING_SIZE, -1)
+        try:
+            embeddings = self.scheduler.run([parent_id], self.embed,
+                                            inputs.flatten())
+        except bittensor.scheduler.Overloaded:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                          'Spike queue full.')
+        embeddings = numpy.array(embeddings).reshape(-1, EMBEDDING_SIZE)
 
         # Pack response.
-        response_payload = pickle.dumps(embeddings, protocol=0)
         response = bittensor.proto.bittensor_pb2.SpikeResponse(
+            version=version,
             child_id=self.config.identity,
             message_id=message_id,
-            payload=response_payload)
+            **bittensor.serializer.pack(embeddings, version, request.precision))
 
         return response
 
@@ -15,6 +15,17 @@ flags.DEFINE_string("eosurl", "http://0.0.0.0:8888", "EOS Url.")
 flags.DEFINE_string("logdir", "/tmp/", "logginf directory.")
 flags.DEFINE_integer("k", 3, "Out edge degree.")
 flags.DEFINE_float("alpha", 0.01, "Learning rate.")
+flags.DEFINE_string("transport_precision", "float32", "Precision of tensors sent to children: float32, float16 or int8.")
+flags.DEFINE_string("peer_precisions", "", "Per child precision overrides, comma separated identity:precision pairs.")
+flags.DEFINE_float("spike_timeout", 1.0, "Deadline in seconds of Spike calls to children.")
+flags.DEFINE_float("grade_timeout", 5.0, "Deadline in seconds of Grade calls to children.")
+flags.DEFINE_integer("max_inflight_grades", 10, "Grade calls in flight per child before further grades are dropped.")
+flags.DEFINE_integer("breaker_threshold", 5, "Consecutive failed calls after which a child is skipped.")
+flags.DEFINE_float("breaker_reset", 10.0, "Seconds a failing child is skipped before it is probed again.")
+flags.DEFINE_float("admission_rate", 50.0, "Spike and Grade calls per second allowed per parent, 0 disables rate limiting.")
+flags.DEFINE_integer("admission_burst", 100, "Spike and Grade calls a parent may make at once.")
+flags.DEFINE_integer("max_inflight", 8, "Spike and Grade calls handled at once, further calls are rejected. 0 disables the cap.")
+flags.DEFINE_bool("stake_weighted", False, "Scale parent rate limits by their stake over the mean stake.")
 
 
 class Config():
@@ -28,6 +39,17 @@ class Config():
         self.logdir = FLAGS.logdir
         self.k = FLAGS.k
         self.alpha = FLAGS.alpha
+        self.transport_precision = FLAGS.transport_precision
+        self.peer_precisions = FLAGS.peer_precisions
+        self.spike_timeout = FLAGS.spike_timeout
+        self.grade_timeout = FLAGS.grade_timeout
+        self.max_inflight_grades = FLAGS.max_inflight_grades
+        self.breaker_threshold = FLAGS.breaker_threshold
+        self.breaker_reset = FLAGS.breaker_reset
+        self.admission_rate = FLAGS.admission_rate
+        self.admission_burst = FLAGS.admission_burst
+        self.max_inflight = FLAGS.max_inflight
+        self.stake_weighted = FLAGS.stake_weighted
 
     def __repr__(self):
         return self.__str__()
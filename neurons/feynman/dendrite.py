@@ -1,14 +1,13 @@
 import bittensor
 
-from Crypto.Hash import SHA256
+import asyncio
 import grpc
 from loguru import logger
-import pickle
 import numpy as np
-import random
 import struct
 import tensorflow as tf
 from tensorflow.python.framework import ops
+import threading
 import time
 
 # TODO (const): Negotiate channels with upstream nodes.
@@ -23,26 +22,67 @@ class Dendrite():
         self.metagraph = metagraph
         self.channels = [None for _ in range(self.config.k)]
         self.channel_nodes = [None for _ in range(self.config.k)]
+        self.stubs = [None for _ in range(self.config.k)]
+        # Pool of the aio channels, only used on the loop.
+        self.pool = bittensor.channel_pool.ChannelPool(aio=True)
+        # Grade calls in flight on each channel, and their tasks. The loop
+        # only keeps weak references to tasks.
+        self.inflight_grades = [0 for _ in range(self.config.k)]
+        self._grade_tasks = set()
+        self.negotiator = bittensor.serializer.Negotiator()
+        # Spike and grad calls of a step derive the same id from its spikes.
+        self.message_ids = bittensor.identifiers.MessageIds(
+            self.config.identity)
+        # Set by the Nucleus once built.
+        self.vocabulary = None
+        self.precisions = bittensor.serializer.Precisions(
+            self.config.transport_precision, self.config.peer_precisions)
+        self.peer_stats = bittensor.peer_stats.PeerStats()
+        # Children failing repeatedly are skipped, their spikes count as
+        # zeros, until a periodic probe succeeds.
+        self.breaker = bittensor.circuit_breaker.CircuitBreaker(
+            self.config.breaker_threshold, self.config.breaker_reset)
+
+        # All RPCs run on an asyncio loop on its own thread. Tensorflow's
+        # py_functions hand their calls to the loop and wait on futures.
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        daemon=True)
+        self._thread.start()
         self.reselect_channels()
 
     def reselect_channels(self):
+        self._run(self._reselect_channels()).result()
+        logger.debug(self.__str__())
+        logger.debug('Peers: {}', self.peer_stats.summary())
+        logger.debug('Breakers: {}', self.breaker.stats())
+
+    async def _reselect_channels(self):
+        # Fill free slots and replace failing children with the best ranked
+        # nodes. aio channels are bound to the loop they are created on.
         nodes = self.metagraph.nodes
-        for i in range(self.config.k):
-            if self.channels[i] != None:
+        candidates = [
+            identity for identity in nodes if identity != self.config.identity
+        ]
+        channel_ids = [node.identity if node else None for node in self.channel_nodes]
+        selected = self.peer_stats.select(channel_ids, candidates)
+        for i, identity in enumerate(selected):
+            if identity == channel_ids[i]:
                 continue
 
-            selected_node = None
-            for node in nodes.values():
-                if node not in self.channel_nodes and node.identity != self.config.identity:
-                    selected_node = node
-                    break
-
-            if selected_node:
-                address = selected_node.address + ':' + selected_node.port
-                self.channels[i] = grpc.insecure_channel(address)
-                self.channel_nodes[i] = selected_node
-
-        logger.debug(self.__str__())
+            if self.channels[i] != None:
+                logger.info('Replacing child {} with {}.', channel_ids[i],
+                            identity)
+                old_node = self.channel_nodes[i]
+                self.pool.release(old_node.address + ':' + old_node.port)
+
+            selected_node = nodes[identity]
+            address = selected_node.address + ':' + selected_node.port
+            self.channels[i] = self.pool.acquire(address)
+            self.channel_nodes[i] = selected_node
+            self.stubs[i] = bittensor.proto.bittensor_pb2_grpc.BittensorStub(
+                self.channels[i])
+        self.pool.evict_idle()
 
     def __repr__(self):
         return self.__str__()
@@ -59,89 +99,145 @@ class Dendrite():
         str_rep += "}."
         return str_rep
 
-    def _gradrpc(self, channel, spikes, grad):
-        if channel is None:
+    def _run(self, coroutine):
+        # Schedules coroutine on the loop, returns a concurrent future.
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def _send_grade(self, i, request):
+        # Runs on the loop. Grades are fire-and-forget and dropped while the
+        # channel already has max_inflight_grades in flight.
+        if self.inflight_grades[i] >= self.config.max_inflight_grades:
+            logger.debug('Dropped grade to {}, {} in flight.',
+                         self.channel_nodes[i].identity,
+                         self.inflight_grades[i])
             return
-
+        self.inflight_grades[i] += 1
+        task = self._loop.create_task(self._gradrpc(i, request))
+        self._grade_tasks.add(task)
+        task.add_done_callback(self._grade_tasks.discard)
+
+    async def _gradrpc(self, i, request):
+        peer_id = self.channel_nodes[i].identity
+        start = time.time()
         try:
-            # Build Stub.
-            stub = bittensor.proto.bittensor_pb2_grpc.BittensorStub(channel)
-
-            # Build message hash
-            identity_bytes = self.config.identity.encode()
-            grad_bytes = pickle.dumps(grad.numpy(), protocol=0)
-            spike_bytes = pickle.dumps(spikes.numpy(), protocol=0)
-
-            # Create hash from self.id and spikes.
-            hash = SHA256.new()
-            hash.update(identity_bytes)
-            hash.update(spike_bytes)
-            message_hash = hash.digest()
-
-            # Create request proto.
-            request = bittensor.proto.bittensor_pb2.GradeRequest(
-                parent_id=self.config.identity,
-                message_id=message_hash,
-                payload=grad_bytes)
-
             # Send Grade request.
-            stub.Grade(request)
-
-            # Pass.
+            response = await self.stubs[i].Grade(
+                request, timeout=self.config.grade_timeout)
+            self.peer_stats.record(peer_id, time.time() - start, True,
+                                   request.ByteSize(), response.ByteSize())
 
         except Exception as error:
             #logger.info('failed call {}', error)
-            pass
+            self.peer_stats.record(peer_id, time.time() - start, False,
+                                   request.ByteSize())
 
-    def _spikerpc(self, channel, spikes):
-        #logger.info('dendrite._spikerpc')
-        if channel is None:
-            return None
+        finally:
+            self.inflight_grades[i] -= 1
 
+    async def _spikerpc(self, stub, node, request):
+        #logger.info('dendrite._spikerpc')
+        start = time.time()
         try:
-            # Build Stub and request proto.
-            stub = bittensor.proto.bittensor_pb2_grpc.BittensorStub(channel)
-
-            # Build message hash
-            identity_bytes = self.config.identity.encode()
-            spike_bytes = pickle.dumps(spikes.numpy(), protocol=0)
-
-            # Create hash from self.identity and spikes.
-            hash = SHA256.new()
-            hash.update(identity_bytes)
-            hash.update(spike_bytes)
-            message_hash = hash.digest()
-
-            # Build request proto.
-            request = bittensor.proto.bittensor_pb2.SpikeRequest(
-                parent_id=self.config.identity,
-                message_id=message_hash,
-                payload=spike_bytes)
-
             # Send spike request.
-            response = stub.Spike(request)
+            response = await stub.Spike(request,
+                                        timeout=self.config.spike_timeout)
+            self.peer_stats.record(node.identity, time.time() - start, True,
+                                   request.ByteSize(), response.ByteSize())
+            self.breaker.record(node.identity, True)
+            self.negotiator.on_response(node.identity, response,
+                                        request.version)
 
             # Deserialize response as numpy.
-            return pickle.loads(response.payload).reshape(EMBEDDING_SIZE, -1)
+            return bittensor.serializer.unpack(response,
+                                               shape=(None, EMBEDDING_SIZE))
+
+        except grpc.RpcError as error:
+            self.peer_stats.record(node.identity, time.time() - start, False,
+                                   request.ByteSize())
+            self.breaker.record(node.identity, False)
+            self.negotiator.on_error(node.identity, error, request.version)
+            return None
 
         except Exception as error:
             #logger.info('failed call {}', error)
             return None
 
+    async def _spikecast(self, requests):
+        # Spikes all channels concurrently, step latency is that of the
+        # slowest child, bounded by spike_timeout. Requests to children
+        # skipped by their breaker are None.
+        calls = []
+        for i, request in enumerate(requests):
+            if request is None:
+                continue
+            calls.append(
+                self._spikerpc(self.stubs[i], self.channel_nodes[i], request))
+        results = iter(await asyncio.gather(*calls))
+        return [None if request is None else next(results) for request in requests]
+
     def _grad(self, spikes, *grads):
+        # The message id is hashed once and shared by all children.
+        message_id = self.message_ids.content(spikes.numpy())
         for i in range(self.config.k):
-            channel = self.channels[i]
-            grad_i = grads[i]
-            if channel:
-                self._gradrpc(channel, spikes, grad_i)
+            if self.stubs[i] is None:
+                continue
+            node = self.channel_nodes[i]
+            if self.breaker.state(
+                    node.identity) == bittensor.circuit_breaker.OPEN:
+                continue
+            try:
+                # Create request proto.
+                version = self.negotiator.version(node.identity)
+                precision = self.precisions.precision(node.identity)
+                request = bittensor.proto.bittensor_pb2.GradeRequest(
+                    version=version,
+                    parent_id=self.config.identity,
+                    message_id=message_id,
+                    **bittensor.serializer.pack(grads[i].numpy(), version,
+                                                precision))
+                self._loop.call_soon_threadsafe(self._send_grade, i, request)
+
+            except Exception as error:
+                #logger.info('failed call {}', error)
+                pass
 
     def _spike(self, spikes):
         #logger.info('dendrite._spikecast')
-        # TODO(const) Currently this function is syncronous. Calls to the
-        # dendrite nodes should be async to save on time.
-        result = []
+        # The message id is hashed once and shared by all children.
+        spikes = spikes.numpy()
+        message_id = self.message_ids.content(spikes)
+
+        # Build request protos. Words are sent as token ids to children
+        # sharing our vocabulary. Children asking for the same encoding
+        # share one request.
+        built = {}
+        requests = []
         for i in range(self.config.k):
-            res = self._spikerpc(self.channels[i], spikes)
+            node = self.channel_nodes[i]
+            if self.stubs[i] is None or not self.breaker.allow(node.identity):
+                requests.append(None)
+                continue
+            version = self.negotiator.version(node.identity)
+            vocabulary_hash = self.negotiator.vocabulary_hash(node.identity)
+            precision = self.precisions.precision(node.identity)
+            key = (version, vocabulary_hash, precision)
+            if key not in built:
+                if self.vocabulary:
+                    fields = self.vocabulary.pack(spikes, version,
+                                                  vocabulary_hash)
+                else:
+                    fields = bittensor.serializer.pack(spikes, version)
+                built[key] = bittensor.proto.bittensor_pb2.SpikeRequest(
+                    version=version,
+                    parent_id=self.config.identity,
+                    message_id=message_id,
+                    precision=precision,
+                    **fields)
+            requests.append(built[key])
+
+        # Wait on the loop for all children.
+        result = []
+        for res in self._run(self._spikecast(requests)).result():
             if res is None:
                 result.append(
                     np.zeros((len(spikes), EMBEDDING_SIZE), dtype=np.float32))
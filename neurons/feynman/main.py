@@ -72,7 +72,16 @@ def serve():
 
     # Serve the synapse on a grpc server.
     server_address = config.bind_address + ":" + config.port
-    grpc_server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    # Each open SpikeStream or GradeStream holds a worker, up to
+    # bittensor.streams.MAX_STREAMS of them. Parents are rate limited and
+    # calls handled at once are capped, so parents cannot starve training.
+    admission = bittensor.admission.Admission(
+        config.admission_rate, config.admission_burst, config.max_inflight,
+        bittensor.admission.stake_weights(metagraph)
+        if config.stake_weighted else None)
+    grpc_server = grpc.server(futures.ThreadPoolExecutor(max_workers=50),
+                              interceptors=[admission],
+                              options=bittensor.channel_pool.SERVER_OPTIONS)
     bittensor.proto.bittensor_pb2_grpc.add_BittensorServicer_to_server(
         synapse, grpc_server)
     grpc_server.add_insecure_port(server_address)
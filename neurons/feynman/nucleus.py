@@ -1,4 +1,5 @@
-import collections
+import bittensor
+
 import copy
 from loguru import logger
 import math
@@ -7,7 +8,6 @@ import random
 import tensorflow as tf
 import time
 import threading
-import zipfile
 
 import visualization
 
@@ -67,6 +67,7 @@ class Nucleus():
 
         # Build Dataset.
         self.build_vocabulary()
+        self.dendrite.vocabulary = self.vocabulary
 
         # Build Graph.
         self.graph = tf.Graph()
@@ -83,8 +84,9 @@ class Nucleus():
         self.session.run(self.var_init)
         self.session.run(self.table_init)
 
-        # Save the initial graph.
+        # Save the initial graph and the vocabulary it was built with.
         self.saver.save(self.session, self.model_checkpoint_dir)
+        self.vocabulary.save('data/' + self.config.identity + '/vocabulary.txt')
         logger.info('Saved initial inference graph to {}.',
                     self.model_checkpoint_dir)
 
@@ -94,16 +96,9 @@ class Nucleus():
         for each word in the corpus.
         """
         # Read textfile.
-        f = zipfile.ZipFile(self.filename)
-        for name in f.namelist():
-            self.words = tf.compat.as_str(f.read(name)).split()
-        f.close()
-
-        counts = [('UNK', -1)]
-        counts.extend(
-            collections.Counter(self.words).most_common(self.vocabulary_size -
-                                                        2))
-        self.string_map = [c[0] for c in counts]
+        self.words = bittensor.vocabulary.read_corpus(self.filename)
+        self.vocabulary = bittensor.vocabulary.Vocabulary.from_words(
+            self.words, self.vocabulary_size)
 
         logger.debug('Built Nucleus vocabulary.')
 
@@ -137,7 +132,7 @@ class Nucleus():
                                           [self.batch_size])
 
         vocabulary_table = tf.contrib.lookup.index_table_from_tensor(
-            mapping=tf.constant(self.string_map),
+            mapping=tf.constant(self.vocabulary.string_map),
             num_oov_buckets=1,
             default_value=0)
         word_ids = vocabulary_table.lookup(train_batch_words_rs)
@@ -177,7 +172,10 @@ class Nucleus():
         self.inference_batch_words = tf.compat.v1.placeholder(
             tf.string, shape=[None, 1], name="inference_batch_words")
         inference_batch_words_rs = tf.reshape(self.inference_batch_words, [-1])
-        inference_word_ids = vocabulary_table.lookup(inference_batch_words_rs)
+        # Token ids from peers sharing our vocabulary are fed directly.
+        inference_word_ids = tf.compat.v1.placeholder_with_default(
+            vocabulary_table.lookup(inference_batch_words_rs), [None],
+            name="inference_word_ids")
         inference_inputs = [self.inference_batch_words] + [
             inference_word_ids
         ] + [tf.zeros([1], dtype=tf.int64)] + [
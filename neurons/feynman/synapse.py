@@ -1,15 +1,16 @@
 import bittensor
 
+import grpc
 from loguru import logger
 import numpy as np
-import pickle
 import sys
 import time
 import tensorflow as tf
 
 
-# TODO (const): Rate limit and block ip.
-class BoltServicer(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
+# NOTE: Parents are rate limited by the server's bittensor.admission
+# interceptor.
+class BoltServicer(bittensor.streams.StreamingServicer):
 
     def __init__(self, config, metagraph):
         """ Serves the inference graph for use by the network.
@@ -60,12 +61,15 @@ class BoltServicer(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
                         "inference_batch_words:0": [['UNK']],  # Inference.
                         'is_training:0': False
                     })
+            next_vocabulary = bittensor.vocabulary.Vocabulary.load(
+                'data/' + self.identity + '/vocabulary.txt')
         except Exception as e:
             logger.error('Failed to server new graph. Exception {}', e)
             raise Exception(e)
 
         logger.debug('Served graph on Synapse.')
         self.session = next_session
+        self.vocabulary = next_vocabulary
 
     def Spike(self, request, context):
         """ GRPC request handler for message Spike; Runs tensor request through the graph.
@@ -81,18 +85,32 @@ class BoltServicer(bittensor.proto.bittensor_pb2_grpc.BittensorServicer):
         """
         # TODO (const) The synapse should be competitively selecting which nodes
         # are allowed to query us based on the Metagraph information.
-        batch_words = pickle.loads(request.payload)
-        embeddings = self.session.run(
-            "embedding_output:0",
-            feed_dict={
-                "inference_batch_words:0": batch_words.tolist(),  # Inference.
+        version = bittensor.serializer.negotiate(request.version)
+        vocabulary = self.vocabulary
+        try:
+            tokens = vocabulary.unpack(request)
+        except bittensor.vocabulary.TokenIdError as error:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(error))
+        except bittensor.vocabulary.VocabularyError as error:
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(error))
+        if bittensor.vocabulary.is_ids(tokens):
+            feed_dict = {
+                "inference_word_ids:0": tokens.reshape(-1),
+                "inference_batch_words:0": [['UNK']],  # Unused with ids.
+                'is_training:0': False
+            }
+        else:
+            feed_dict = {
+                "inference_batch_words:0": tokens.tolist(),  # Inference.
                 'is_training:0': False
-            })
-        payload = pickle.dumps(embeddings, protocol=0)
-        response = bittensor.proto.bolt_pb2.SpikeResponse(
+            }
+        embeddings = self.session.run("embedding_output:0", feed_dict=feed_dict)
+        response = bittensor.proto.bittensor_pb2.SpikeResponse(
+            version=version,
             child_id=self.config.identity,
             message_id=request.message_id,
-            payload=payload)
+            vocabulary_hash=vocabulary.hash,
+            **bittensor.serializer.pack(embeddings, version, request.precision))
         return response
 
     def Grade(self, request, context):
@@ -0,0 +1,84 @@
+# Benchmarks message id schemes.
+#
+# Times one step's worth of message ids for a batch of words:
+#   sha256_pickle:   SHA256 over nounce + source + protocol-0 pickle, the
+#                    original scheme.
+#   sha256_binary:   the same over the binary payload codec.
+#   counter:         MessageIds.next(), source prefix + counter.
+#   content:         MessageIds.content(), keyed BLAKE2b of the payload.
+# Each scheme runs n_hashes times per step, e.g. once per child for the
+# feynman dendrite before ids were shared.
+#
+# Usage: python scripts/benchmark_message_ids.py --batch_size 50
+
+import argparse
+import pickle
+import random
+import timeit
+
+from Crypto.Hash import SHA256
+import numpy as np
+
+import bittensor
+
+
+def _sha256(nounce, source_id, payload_bytes):
+    hash = SHA256.new()
+    hash.update(bytes(nounce, 'utf-8'))
+    hash.update(bytes(source_id, 'utf-8'))
+    hash.update(payload_bytes)
+    return hash.digest()
+
+
+def main(args):
+    source_id = 'benchmark'
+    words = np.array(
+        ['word{}'.format(random.randint(0, 50000)) for _ in range(args.batch_size)])
+    message_ids = bittensor.identifiers.MessageIds(source_id)
+
+    def sha256_pickle():
+        nounce = str(random.randint(0, 1000000000))
+        for _ in range(args.n_hashes):
+            _sha256(nounce, source_id, pickle.dumps(words, protocol=0))
+
+    def sha256_binary():
+        nounce = str(random.randint(0, 1000000000))
+        for _ in range(args.n_hashes):
+            _sha256(nounce, source_id, bittensor.serializer.serialize(words))
+
+    def counter():
+        message_ids.next()
+
+    def content():
+        message_ids.content(words)
+
+    schemes = [sha256_pickle, sha256_binary, counter, content]
+    baseline = None
+    print('{:>14} {:>12} {:>8}'.format('scheme', 'usecs/step', 'speedup'))
+    for scheme in schemes:
+        secs = min(timeit.repeat(scheme, number=args.n_steps, repeat=3))
+        usecs = 1e6 * secs / args.n_steps
+        baseline = baseline or usecs
+        print('{:>14} {:>12.2f} {:>8.1f}'.format(scheme.__name__, usecs,
+                                                 baseline / usecs))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Message id benchmark.')
+    parser.add_argument(
+        '--batch_size',
+        default=50,
+        type=int,
+        help='Words per message. Default batch_size=50')
+    parser.add_argument(
+        '--n_hashes',
+        default=1,
+        type=int,
+        help='Payload hashes per step of the SHA256 schemes. Default n_hashes=1')
+    parser.add_argument(
+        '--n_steps',
+        default=10000,
+        type=int,
+        help='Timed steps per scheme. Default n_steps=10000')
+    args = parser.parse_args()
+    main(args)
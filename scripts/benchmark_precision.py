@@ -0,0 +1,140 @@
+# Benchmarks transport precision on the Mach text8 task.
+#
+# Trains a parent Mach Nucleus against local child Nuclei. Child spikes and
+# parent gradients take the same path as over the wire, i.e. pack ->
+# SerializeToString -> FromString -> unpack, at each transport precision.
+# Reports the bytes sent per step and the parent target loss.
+#
+# Usage: python scripts/benchmark_precision.py --corpus_path neurons/Mach/data/text8.zip
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+from loguru import logger
+import numpy as np
+
+import bittensor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'neurons', 'Mach'))
+from nucleus import Nucleus
+
+SpikeResponse = bittensor.proto.bittensor_pb2.SpikeResponse
+GradeRequest = bittensor.proto.bittensor_pb2.GradeRequest
+
+
+def _wire(message_type, array, precision, n_embedding):
+    message = message_type(version=bittensor.serializer.VERSION,
+                           **bittensor.serializer.pack(array,
+                                                       precision=precision))
+    payload = message.SerializeToString()
+    received = message_type.FromString(payload)
+    return bittensor.serializer.unpack(received,
+                                       shape=(None, n_embedding)), len(payload)
+
+
+def run(args, name):
+    precision = bittensor.serializer.precision(name)
+    np.random.seed(args.seed)
+
+    # Children are leaves: they answer from their synthetic model and are
+    # fed zero downstream spikes, as in Neuron.Spike.
+    child_hparams = copy.copy(args)
+    child_hparams.n_children = 1
+    parent = Nucleus(args)
+    children = [Nucleus(child_hparams) for _ in range(args.n_children)]
+
+    losses = []
+    total_bytes = 0
+    start = time.time()
+    for step in range(args.n_steps):
+        spikes, targets = parent.next_batch(args.batch_size)
+        spikes = np.array(spikes)
+        zeros = [np.zeros((len(spikes), args.n_embedding), dtype=np.float32)]
+
+        # Children spike and respond at precision.
+        dspikes = []
+        for child in children:
+            lspikes = child.spike(spikes, zeros, use_synthetic=True)
+            received, n_bytes = _wire(SpikeResponse, lspikes, precision,
+                                      args.n_embedding)
+            dspikes.append(received)
+            total_bytes += n_bytes
+
+        # Parent trains and grades children at precision.
+        dgrads, loss, _ = parent.train(spikes, dspikes, targets)
+        for child, dgrad in zip(children, dgrads):
+            received, n_bytes = _wire(GradeRequest, dgrad[0], precision,
+                                      args.n_embedding)
+            child.grade(received, spikes, zeros)
+            total_bytes += n_bytes
+        losses.append(loss)
+
+    tail = losses[-args.n_average:]
+    return {
+        'precision': name,
+        'bytes_per_step': total_bytes / args.n_steps,
+        'loss': sum(tail) / len(tail),
+        'secs': time.time() - start,
+    }
+
+
+def main(args):
+    results = [run(args, name) for name in args.precisions.split(',')]
+    baseline = results[0]['bytes_per_step']
+    print('{:>10} {:>14} {:>8} {:>10} {:>8}'.format('precision',
+                                                     'bytes/step', 'ratio',
+                                                     'loss', 'secs'))
+    for result in results:
+        print('{:>10} {:>14.0f} {:>8.2f} {:>10.4f} {:>8.1f}'.format(
+            result['precision'], result['bytes_per_step'],
+            result['bytes_per_step'] / baseline, result['loss'],
+            result['secs']))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Transport precision benchmark.')
+    parser.add_argument(
+        '--precisions',
+        default='float32,float16,int8',
+        type=str,
+        help='Comma separated precisions to compare. Default precisions=float32,float16,int8')
+    parser.add_argument(
+        '--n_steps',
+        default=2000,
+        type=int,
+        help='Training steps per precision. Default n_steps=2000')
+    parser.add_argument(
+        '--n_average',
+        default=200,
+        type=int,
+        help='Number of final steps the loss is averaged over. Default n_average=200')
+    parser.add_argument(
+        '--seed',
+        default=0,
+        type=int,
+        help='Numpy random seed. Default seed=0')
+
+    # Mach Nucleus parameters.
+    parser.add_argument('--corpus_path',
+                        default='neurons/Mach/data/text8.zip',
+                        type=str)
+    parser.add_argument('--n_vocabulary', default=50000, type=int)
+    parser.add_argument('--n_sampled', default=64, type=int)
+    parser.add_argument('--batch_size', default=50, type=int)
+    parser.add_argument('--learning_rate', default=1e-4, type=float)
+    parser.add_argument('--n_targets', default=1, type=int)
+    parser.add_argument('--n_embedding', default=128, type=int)
+    parser.add_argument('--n_children', default=3, type=int)
+    parser.add_argument('--n_hidden1', default=512, type=int)
+    parser.add_argument('--n_hidden2', default=512, type=int)
+    parser.add_argument('--n_shidden1', default=512, type=int)
+    parser.add_argument('--n_shidden2', default=512, type=int)
+    parser.add_argument('--use_joiner_network', default=False, type=bool)
+    parser.add_argument('--n_jhidden1', default=512, type=int)
+    parser.add_argument('--n_jhidden2', default=512, type=int)
+    args = parser.parse_args()
+    logger.info(args)
+    main(args)
@@ -0,0 +1,169 @@
+# Benchmarks keeping versus recomputing the activations of answered spikes.
+#
+# A neuron remembers each Spike it answers until the Grade arrives, to feed
+# the same downstream spikes to the nucleus again. It can keep them in its
+# slab, or keep only the tokens and rebuild them when the Grade arrives:
+# as zeros, as Mach answers Spikes, or by unpacking the SpikeResponses of
+# its children, at their transport precision, as boltzmann does with
+# grade_recompute. Reports the bytes remembered per message and the time
+# to keep and grade a message in each mode.
+#
+# Usage: python scripts/benchmark_recompute.py --corpus_path neurons/Mach/data/text8.zip
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+from loguru import logger
+import numpy as np
+
+import bittensor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'neurons', 'Mach'))
+from nucleus import Nucleus
+
+SpikeResponse = bittensor.proto.bittensor_pb2.SpikeResponse
+
+
+def _messages(args, parent, children):
+    # Token ids and children's SpikeResponses, per precision, of n_messages
+    # messages.
+    messages = []
+    for _ in range(args.n_messages):
+        spikes, _ = parent.next_batch(args.batch_size)
+        spikes = np.array(spikes)
+        zeros = [np.zeros((len(spikes), args.n_embedding), dtype=np.float32)]
+        dspikes = [
+            child.spike(spikes, zeros, use_synthetic=True)
+            for child in children
+        ]
+        responses = {}
+        for name in args.precisions.split(','):
+            precision = bittensor.serializer.precision(name)
+            responses[name] = [
+                SpikeResponse(version=bittensor.serializer.VERSION,
+                              **bittensor.serializer.pack(
+                                  x, precision=precision)) for x in dspikes
+            ]
+        messages.append((parent.vocabulary.encode(spikes), dspikes, responses))
+    return messages
+
+
+def _unpack(args, responses):
+    return [
+        bittensor.serializer.unpack(response, shape=(None, args.n_embedding))
+        for response in responses
+    ]
+
+
+def run(args, parent, messages, mode):
+    slab = bittensor.slab.Slab(args.n_messages, args.batch_size,
+                               args.n_embedding, args.n_children + 1)
+    ugrades = np.random.normal(
+        size=(args.batch_size, args.n_embedding)).astype(np.float32)
+
+    # Keep each message as the neuron does when answering its Spike.
+    kept = []
+    n_bytes = 0
+    start = time.time()
+    for ids, dspikes, responses in messages:
+        n_bytes += ids.nbytes
+        if mode == 'store':
+            # The local spikes plane is kept alongside, unused by the grade.
+            lspikes = np.zeros_like(dspikes[0])
+            kept.append(slab.store([lspikes] + dspikes))
+            n_bytes += lspikes.nbytes + sum(x.nbytes for x in dspikes)
+        elif mode == 'zeros':
+            kept.append(None)
+        else:
+            kept.append(responses[mode])
+            n_bytes += sum(r.ByteSize() for r in responses[mode])
+    keep_secs = time.time() - start
+
+    # Grade each message from what was kept.
+    start = time.time()
+    for (ids, _, _), item in zip(messages, kept):
+        if mode == 'store':
+            dspikes = slab.load(item, len(ids))[1:]
+        elif mode == 'zeros':
+            dspikes = [
+                np.zeros((len(ids), args.n_embedding), dtype=np.float32)
+                for _ in range(args.n_children)
+            ]
+        else:
+            dspikes = _unpack(args, item)
+        parent.grade(ugrades, ids, dspikes)
+    grade_secs = time.time() - start
+
+    return {
+        'mode': mode,
+        'bytes': n_bytes / args.n_messages,
+        'keep_ms': 1000 * keep_secs / args.n_messages,
+        'grade_ms': 1000 * grade_secs / args.n_messages,
+    }
+
+
+def main(args):
+    np.random.seed(args.seed)
+    child_hparams = copy.copy(args)
+    child_hparams.n_children = 1
+    parent = Nucleus(args)
+    children = [Nucleus(child_hparams) for _ in range(args.n_children)]
+    messages = _messages(args, parent, children)
+
+    # Warm up the session before timing.
+    run(args, parent, messages[:1], 'zeros')
+
+    modes = ['store', 'zeros'] + args.precisions.split(',')
+    results = [run(args, parent, messages, mode) for mode in modes]
+    baseline = results[0]
+    print('{:>10} {:>12} {:>8} {:>10} {:>10} {:>10}'.format(
+        'mode', 'bytes/msg', 'ratio', 'keep ms', 'grade ms', 'extra ms'))
+    for result in results:
+        print('{:>10} {:>12.0f} {:>8.3f} {:>10.3f} {:>10.3f} {:>10.3f}'.format(
+            result['mode'], result['bytes'],
+            result['bytes'] / baseline['bytes'], result['keep_ms'],
+            result['grade_ms'], result['grade_ms'] - baseline['grade_ms']))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Grade recompute benchmark.')
+    parser.add_argument(
+        '--precisions',
+        default='float32,float16,int8',
+        type=str,
+        help='Comma separated precisions of the kept child responses. Default precisions=float32,float16,int8')
+    parser.add_argument(
+        '--n_messages',
+        default=500,
+        type=int,
+        help='Messages kept and graded per mode. Default n_messages=500')
+    parser.add_argument(
+        '--seed',
+        default=0,
+        type=int,
+        help='Numpy random seed. Default seed=0')
+
+    # Mach Nucleus parameters.
+    parser.add_argument('--corpus_path',
+                        default='neurons/Mach/data/text8.zip',
+                        type=str)
+    parser.add_argument('--n_vocabulary', default=50000, type=int)
+    parser.add_argument('--n_sampled', default=64, type=int)
+    parser.add_argument('--batch_size', default=50, type=int)
+    parser.add_argument('--learning_rate', default=1e-4, type=float)
+    parser.add_argument('--n_targets', default=1, type=int)
+    parser.add_argument('--n_embedding', default=128, type=int)
+    parser.add_argument('--n_children', default=5, type=int)
+    parser.add_argument('--n_hidden1', default=512, type=int)
+    parser.add_argument('--n_hidden2', default=512, type=int)
+    parser.add_argument('--n_shidden1', default=512, type=int)
+    parser.add_argument('--n_shidden2', default=512, type=int)
+    parser.add_argument('--use_joiner_network', default=False, type=bool)
+    parser.add_argument('--n_jhidden1', default=512, type=int)
+    parser.add_argument('--n_jhidden2', default=512, type=int)
+    args = parser.parse_args()
+    logger.info(args)
+    main(args)
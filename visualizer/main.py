@@ -2,7 +2,7 @@
 import visualizer
 
 import argparse
-import grpc
+import bittensor
 import json
 import pickle
 import requests
@@ -25,8 +25,11 @@ class NodeStatsListener():
         # Map from node_id to node attr dict.
         self._nodes = {}
 
-        # Map of node_id to channels.
+        # Map of node_id to the address of its pooled channel.
         self._channels = {}
+        # Map of node_id to its Visualizer stub, holding the channel's ref.
+        self._stubs = {}
+        self._pool = bittensor.channel_pool.get_pool()
 
         # Map from node_id to logger.
         self._tbloggers = {}
@@ -65,11 +68,10 @@ class NodeStatsListener():
             self._global_step += 1
             for node_id in self._nodes.keys():
                 tblogger = self._tbloggers[node_id]
-                channel = self._channels[node_id]
 
                 # Try to query node.
                 try:
-                    response = self._query_node(node_id, channel)
+                    response = self._query_node(node_id)
                 except Exception as e:
                     logger.info("Failed to query node: {}", node_id)
                     continue
@@ -110,15 +112,17 @@ class NodeStatsListener():
     def _refresh_all_channels(self):
         for node_id in list(self._channels.keys()):
             if node_id not in self._nodes:
-                self._channels[node_id].close()
+                self._pool.release(self._channels[node_id])
                 del self._channels[node_id]
+                del self._stubs[node_id]
 
         # Add new node channels.
         for node in self._nodes.values():
             if node['identity'] not in self._channels:
                 node_url = "{}:{}".format(node['url'], node['port'])
-                new_channel = grpc.insecure_channel(node_url)
-                self._channels[node['identity']] = new_channel
+                self._stubs[node['identity']] = self._pool.stub(
+                    node_url, visualizer.visualizer_pb2_grpc.VisualizerStub)
+                self._channels[node['identity']] = node_url
 
     def _refresh_all_tbloggers(self):
         for node_id in list(self._tbloggers.keys()):
@@ -131,8 +135,8 @@ class NodeStatsListener():
                 log_dir = self._config.logdir + "/" + node_id
                 self._tbloggers[node_id] = TBLogger(log_dir)
 
-    def _query_node(self, node_id, channel):
-        stub = visualizer.visualizer_pb2_grpc.VisualizerStub(channel)
+    def _query_node(self, node_id):
+        stub = self._stubs[node_id]
         request_payload_bytes = pickle.dumps("tb_metrics", protocol=0)
         response = stub.Report(
             visualizer.visualizer_pb2.ReportRequest(
@@ -162,6 +166,13 @@ class NodeStatsListener():
             for idn, score in scores:
                 tblogger.log_scalar(idn, score, self._global_step)
 
+        # Circuit breaker state changes and skipped calls.
+        breakers = response.get('breakers')
+        if breakers:
+            for state, count in breakers['transitions'].items():
+                tblogger.log_scalar('breaker_' + state, count, self._global_step)
+            tblogger.log_scalar('breaker_rejected', breakers['rejected'], self._global_step)
+
         logger.info('Logging: node {}: step {} gs {} mem {} loss {} scores {}'.format(node_id, response['step'], response['gs'], response['mem'], response['loss'], scores))
 
 